@@ -1,6 +1,13 @@
-﻿import argparse, os, sys, json, time, datetime, re, math, traceback
+﻿import argparse, os, sys, json, time, datetime, re, math, traceback, threading
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from model_cache import PIPES, ov_pipeline, hf_model
+from hf_batcher import get_batcher
+from cancel import call_with_deadline
+from result_cache import ResultCache, make_key, text_hash
+from prefix_cache import template_prefix, prepare as prepare_prefix
+from qa_scorer import qa_score
+from part_tree import find_all
 
 SCHEMA_VERSION = "3"
 
@@ -32,8 +39,8 @@ def sanitize(txt:str)->str:
         lines.append(ln)
     s="\n".join(lines).strip()
 
-    # 보정: part_tree 없으면 최소 골격 주입
-    need_pt = ("```" not in s) or ("part_tree" not in s)
+    # 보정: 파싱 가능한 part_tree 없으면 최소 골격 주입
+    need_pt = not find_all(s)
     if need_pt:
         skeleton = {
           "id":"root","name":"assembly","qty":1,"material":"AM-alloy",
@@ -47,25 +54,24 @@ def sanitize(txt:str)->str:
     s = re.sub(r"(\n+#\s*Design Brief[^\n]*\n)", r"\n", s, flags=re.I)
     return s.strip()
 
-NEED_SECTIONS = [
- "Design Brief","Part Tree","Interfaces","Geometry","Manufacturing",
- "Test Plan","Top 5 risks","Verification plan","Verification results","Final"
-]
-
-def qa_score(txt:str):
-    found=[k for k in NEED_SECTIONS if re.search(rf"{re.escape(k)}",txt,re.I)]
-    has_pt = ("```" in txt) and ("part_tree" in txt)
-    dedup = len(re.findall(r"Design Brief",txt,re.I))<=2
-    pass_ = (len(found)>=8) and has_pt and dedup
-    return {"pass":pass_,"sections":len(found),"part_tree":has_pt,"dedup":dedup}
-
 # ----- OV/XPU inference -----
-def ov_generate(model_dir, device, sys_txt, usr_txt, max_new_tokens, stops):
-    from openvino_genai import LLMPipeline, GenerationConfig
+def ov_generate(model_dir, device, sys_txt, usr_txt, max_new_tokens, stops, stats=None, deadline=None, prefix_cache=False):
+    from openvino_genai import GenerationConfig
     prompt = f"System: {sys_txt}\nUser: {usr_txt}\nAssistant:"
     cfg = GenerationConfig(max_new_tokens=max_new_tokens, stop_strings=stops)
-    pipe = LLMPipeline(model_dir, device)
-    return pipe.generate(prompt, generation_config=cfg)
+    # CPU/GPU 는 GenAI prefix caching(SchedulerConfig) 사용, NPU 는 미지원
+    pc = bool(prefix_cache) and str(device).upper() != "NPU"
+    ent, cold = ov_pipeline(model_dir, device, prefix_cache=pc)
+    with ent.lock:
+        # lock 획득 + 컴파일 후부터 제한 시간, 지나면 streamer 콜백이 다음 토큰에서 중지 → NPU 반환
+        if deadline is not None: deadline.arm()
+        t0 = time.perf_counter()
+        kw = {"streamer": deadline.ov_streamer()} if deadline is not None else {}
+        out = ent.obj.generate(prompt, generation_config=cfg, **kw)
+        gen_sec = round(time.perf_counter()-t0, 3)
+    if stats is not None:
+        stats.update(cold=cold or stats.get("cold",False), load_sec=ent.load_sec if cold else stats.get("load_sec",0.0), gen_sec=gen_sec, prefix_cache=pc)
+    return str(out)
 
 def hf_apply_chat(tokenizer, sys_txt, usr_txt):
     if hasattr(tokenizer, "apply_chat_template"):
@@ -83,64 +89,159 @@ def pick_hf_device(name):
     if n.startswith("cuda") and torch.cuda.is_available(): return "cuda"
     return "cpu"
 
-def hf_generate(repo, device_name, sys_txt, usr_txt, max_new_tokens, temp, top_p, top_k, rep_pen):
+def hf_generate(repo, device_name, sys_txt, usr_txt, max_new_tokens, temp, top_p, top_k, rep_pen, stats=None, batch=1, window_ms=20, deadline=None, prefix=None):
     import torch
-    from transformers import AutoModelForCausalLM, AutoTokenizer
-    dev = pick_hf_device(device_name)
-    tok = AutoTokenizer.from_pretrained(repo, trust_remote_code=True)
-    model = AutoModelForCausalLM.from_pretrained(repo, trust_remote_code=True)
-    model.to(dev)
-    if tok.pad_token_id is None and tok.eos_token_id is not None:
-        tok.pad_token_id = tok.eos_token_id
+    ent, cold = hf_model(repo, pick_hf_device(device_name))
+    tok, model, dev = ent.obj
     prompt = hf_apply_chat(tok, sys_txt, usr_txt)
-    ids = tok(prompt, return_tensors="pt").to(dev)
-    with torch.inference_mode():
-        out = model.generate(
-            **ids, do_sample=True, temperature=temp, top_p=top_p, top_k=top_k,
-            repetition_penalty=rep_pen, max_new_tokens=max_new_tokens,
-            pad_token_id=tok.pad_token_id
-        )
-    return tok.decode(out[0], skip_special_tokens=True)
+    # temp<=0 → greedy(결정적, 결과 캐시 대상)
+    gen_kw = dict(do_sample=temp > 0, repetition_penalty=rep_pen, max_new_tokens=max_new_tokens)
+    if temp > 0: gen_kw.update(temperature=temp, top_p=top_p, top_k=top_k)
+    if batch > 1:
+        # 동시 워커들의 프롬프트를 모아 한 번에 generate
+        res = get_batcher(tok, model, dev, batch, window_ms, lock=ent.lock).submit(prompt, deadline=deadline, **gen_kw).result()
+        text, gen_sec, n_new = res["text"], res["gen_sec"], res["new_tokens"]
+    else:
+        # prefix: 공통 접두부(sys 템플릿) KV 를 재사용해 토픽 부분만 prefill
+        pfx_text = template_prefix(lambda t: hf_apply_chat(tok, sys_txt, prefix.replace("{topic}", t))) if prefix else ""
+        ids, pinfo = prepare_prefix(tok, model, dev, prompt, pfx_text, lock=ent.lock)
+        if deadline is not None: gen_kw["stopping_criteria"] = deadline.hf_criteria()
+        with ent.lock, torch.inference_mode():
+            if deadline is not None: deadline.arm()
+            t0 = time.perf_counter()
+            out = model.generate(**ids, pad_token_id=tok.pad_token_id, **gen_kw)
+            gen_sec = round(time.perf_counter()-t0, 3)
+        text = tok.decode(out[0], skip_special_tokens=True)
+        n_new = int(out.shape[-1] - ids["input_ids"].shape[-1]); res = {"batch": 1}
+        if stats is not None and prefix: stats.update(pinfo)
+    if stats is not None:
+        stats.update(cold=cold or stats.get("cold",False), load_sec=ent.load_sec if cold else stats.get("load_sec",0.0), gen_sec=gen_sec, batch=res["batch"],
+                     new_tokens=n_new, tok_per_sec=round(n_new/gen_sec, 2) if gen_sec else 0.0)
+    return text
 
 # ----- worker with retry/timeout -----
-def run_with_timeout(fn, timeout_s, retries=0):
-    last_err=None
+def run_with_timeout(fn, timeout_s, retries=0, backoff_s=0.0, stats=None, grace_s=5.0):
+    """fn(deadline) 실행. deadline 은 OV streamer / HF StoppingCriteria 로 생성을 실제로 중단시킴.
+    제한 시간은 모델 lock 획득 + 로드/컴파일 뒤부터(cancel.call_with_deadline). 협조적 중단 후 grace_s 안에도 안 끝나면
+    중지 신호를 남기고 포기(abort) → 생성 구간 wall time ≤ timeout_s+grace_s, 재시도는 이전 생성이 lock 을 놓은 뒤 시작.
+    재시도 사이 대기 = backoff_s * 2**시도"""
+    last_err=None; st = stats if stats is not None else {}
+    st.setdefault("attempts",0); st.setdefault("timeouts",0); st.setdefault("aborts",0); st.setdefault("errors",0)
     for t in range(retries+1):
-        with ThreadPoolExecutor(max_workers=1) as ex:
-            fut=ex.submit(fn)
-            try:
-                return fut.result(timeout=timeout_s)
-            except TimeoutError:
-                last_err=f"[TIMEOUT {timeout_s}s]"
-            except Exception as e:
-                last_err=f"[ERR] {e}"
+        st["attempts"] += 1
+        status, val = call_with_deadline(fn, timeout_s, grace=grace_s)
+        if status == "ok":
+            st["status"] = "ok"; return val
+        if status == "timeout":
+            st["timeouts"] += 1; last_err=f"[TIMEOUT {timeout_s}s]"
+        elif status == "abort":
+            st["aborts"] += 1; last_err=f"[TIMEOUT {timeout_s}s, aborted]"
+        else:
+            st["errors"] += 1; last_err=f"[ERR] {val}"
+        st["status"] = status
+        if t < retries and backoff_s > 0: time.sleep(backoff_s * (2**t))
     return last_err
 
-def make_worker(ov_dir, hf_id, sys_txt, usr_template, args):
-    stops=["Topic:","Do not repeat","XPU(","NPU("]
-    def worker(topic:str):
-        usr_txt = usr_template.replace("{topic}", topic)
-        t0=time.time()
-        def _ov(): return ov_generate(os.path.abspath(ov_dir), args.ov_device, sys_txt, usr_txt, args.max_new_tokens, stops)
-        def _hf(): return hf_generate(hf_id, args.hf_device, sys_txt, usr_txt, args.max_new_tokens, args.temp, args.top_p, args.top_k, args.rep_pen)
+class DeviceScheduler:
+    """장치별 전용 큐(executor). 각 장치는 독립적으로 최대 속도로 소화하고 토픽 단위로 합류"""
+    def __init__(self, workers):
+        self.pools = {k: ThreadPoolExecutor(max_workers=max(1,n), thread_name_prefix=f"dev-{k}") for k,n in workers.items()}
 
-        ov_raw = run_with_timeout(_ov, args.timeout_sec, retries=args.retries)
-        hf_raw = run_with_timeout(_hf, args.timeout_sec, retries=args.retries)
+    def submit(self, tasks):
+        """tasks={장치: fn} -> Future[{장치: (fn 결과, t_start, t_end)}] (모든 장치가 끝나면 완료)"""
+        joined = Future(); res = {}; lock = threading.Lock()
+        def run(fn):
+            t0 = time.time(); r = fn(); return r, t0, time.time()
+        def done(k, f):
+            try: out = f.result()
+            except Exception as e: out = ((f"[ERR] {e}", {}), time.time(), time.time())
+            with lock:
+                res[k] = out; last = len(res) == len(tasks)
+            if last: joined.set_result(res)
+        for k, fn in tasks.items():
+            self.pools[k].submit(run, fn).add_done_callback(lambda f, k=k: done(k, f))
+        return joined
+
+    def shutdown(self):
+        for p in self.pools.values(): p.shutdown(wait=True)
+
+def make_worker(ov_dir, hf_id, sys_txt, usr_template, args, cache=None):
+    """-> (tasks(topic) -> {장치: fn}, finish(topic, joined) -> record)"""
+    stops=["Topic:","Do not repeat","XPU(","NPU("]
+    # 결과 캐시 키 공통부. auto: OV(greedy)는 항상, HF 는 temp<=0(결정적)일 때만
+    base = dict(sys=text_hash(sys_txt), usr=text_hash(usr_template), max_new_tokens=args.max_new_tokens)
+    use = {"ov": cache is not None, "hf": cache is not None and (args.cache=="on" or args.temp<=0)}
+    ckey = {
+        "ov": lambda topic: make_key(backend="ov", key=args.ov_key, path=ov_dir, device=args.ov_device, stops=stops, topic=topic, **base),
+        "hf": lambda topic: make_key(backend="hf", key=args.hf_key, path=hf_id, device=args.hf_device, temp=args.temp, top_p=args.top_p,
+                                     top_k=args.top_k, rep_pen=args.rep_pen, topic=topic, **base),
+    }
+    def cached(k, topic, stats, run):
+        if not use[k]: return run(), stats
+        key = ckey[k](topic); hit = cache.get(key)
+        if hit is not None:
+            # 원래 timing 은 orig 로만 보관(cold/load_sec/gen_sec 가 이번 실행 통계에 섞이지 않게)
+            stats.update(status="ok", cached=True, orig=hit.get("timing") or {})
+            return hit["out"], stats
+        out = run()
+        if stats.get("status") == "ok" and isinstance(out, str):
+            cache.put(key, {"out": out, "timing": dict(stats)}, meta={"backend": k, "topic": topic})
+        return out, stats
 
-        ov_txt = sanitize(ov_raw) if isinstance(ov_raw,str) else str(ov_raw)
-        hf_txt = sanitize(hf_raw) if isinstance(hf_raw,str) else str(hf_raw)
+    def tasks(topic:str):
+        usr_txt = usr_template.replace("{topic}", topic)
+        ov_stats={}; hf_stats={}
+        retry = dict(retries=args.retries, backoff_s=args.retry_backoff_sec, grace_s=args.abort_grace_sec)
+        def _ov(): return cached("ov", topic, ov_stats, lambda: run_with_timeout(lambda dl: ov_generate(os.path.abspath(ov_dir), args.ov_device, sys_txt, usr_txt, args.max_new_tokens, stops, stats=ov_stats, deadline=dl, prefix_cache=args.prefix_cache=="on"), args.timeout_sec, stats=ov_stats, **retry))
+        def _hf(): return cached("hf", topic, hf_stats, lambda: run_with_timeout(lambda dl: hf_generate(hf_id, args.hf_device, sys_txt, usr_txt, args.max_new_tokens, args.temp, args.top_p, args.top_k, args.rep_pen, stats=hf_stats, batch=args.hf_batch, window_ms=args.hf_batch_window_ms, deadline=dl, prefix=usr_template if args.prefix_cache=="on" else None), args.timeout_sec, stats=hf_stats, **retry))
+        return {"ov":_ov, "hf":_hf}
 
-        dt=round(time.time()-t0,3)
-        qa = {"ov":qa_score(ov_txt), "hf":qa_score(hf_txt)}
+    def finish(topic, joined):
+        out = {}
+        for k in ("ov","hf"):
+            (raw, st), t0, t1 = joined[k]
+            txt = sanitize(raw) if isinstance(raw,str) else str(raw)
+            out[k] = (txt, st, round(t1-t0,3))
+        t_start = min(v[1] for v in joined.values()); t_end = max(v[2] for v in joined.values())
+        qa = {"ov":qa_score(out["ov"][0]), "hf":qa_score(out["hf"][0])}
         rec = {
             "schema":SCHEMA_VERSION, "ts":datetime.datetime.now().isoformat(timespec="seconds"),
-            "topic":topic, "elapsed_sec":dt,
-            "ov":{"key":args.ov_key,"device":args.ov_device,"out":ov_txt},
-            "hf":{"key":args.hf_key,"device":args.hf_device,"out":hf_txt},
+            "topic":topic, "elapsed_sec":round(t_end-t_start,3),
+            "ov":{"key":args.ov_key,"device":args.ov_device,"out":out["ov"][0],"elapsed_sec":out["ov"][2],"timing":out["ov"][1]},
+            "hf":{"key":args.hf_key,"device":args.hf_device,"out":out["hf"][0],"elapsed_sec":out["hf"][2],"timing":out["hf"][1]},
             "qa":qa
         }
         return rec
-    return worker
+    return tasks, finish
+
+def succeeded(rec, ov_key, hf_key):
+    """이어하기에서 건너뛸 레코드: 두 장치 모두 성공 + 같은 모델 키"""
+    for k, key in (("ov", ov_key), ("hf", hf_key)):
+        r = rec.get(k) or {}
+        if r.get("key") != key: return False
+        st = (r.get("timing") or {}).get("status")
+        ok = st == "ok" if st else not str(r.get("out", "")).startswith(("[TIMEOUT", "[ERR]"))   # status 없는 예전 레코드
+        if not ok: return False
+    return True
+
+def resume_session(jpath, topics, ov_key, hf_key):
+    """run.jsonl 이어하기 -> (유지할 레코드, 실행할 토픽, 건너뛴 토픽, 대체될 레코드).
+    실패(TIMEOUT/ERR)·다른 모델 키 레코드 중 다시 돌릴 토픽은 run.replaced.jsonl 로 옮기고, run.jsonl 은 유지분만 남겨 다시 씀"""
+    jpath = Path(jpath); prev = []
+    with open(jpath, encoding="utf-8") as f:
+        for ln in f:
+            try: r = json.loads(ln)
+            except ValueError: continue   # 중단 시 잘린 마지막 줄
+            if isinstance(r, dict): prev.append(r)
+    done = {r.get("topic") for r in prev if succeeded(r, ov_key, hf_key)}
+    redo = [r for r in prev if r.get("topic") not in done and r.get("topic") in topics]
+    prev = [r for r in prev if r.get("topic") in done or r.get("topic") not in topics]
+    if redo:
+        with open(jpath.parent/"run.replaced.jsonl", "a", encoding="utf-8") as f:
+            for r in redo: f.write(json.dumps(r, ensure_ascii=False)+"\n")
+    with open(jpath, "w", encoding="utf-8") as f:
+        for r in prev: f.write(json.dumps(r, ensure_ascii=False)+"\n")
+    return prev, [t for t in topics if t not in done], [t for t in topics if t in done], redo
 
 def main():
     ap = argparse.ArgumentParser()
@@ -152,7 +253,8 @@ def main():
     ap.add_argument("--topics", default="prompts/prompts_topics.txt")
     ap.add_argument("--outdir", default="save/sessions")
     ap.add_argument("--limit", type=int, default=50)
-    ap.add_argument("--jobs", type=int, default=1)
+    ap.add_argument("--jobs", type=int, default=1, help="HF 장치 큐 동시 작업 수")
+    ap.add_argument("--ov_jobs", type=int, default=1, help="OV 장치 큐 동시 작업 수")
     ap.add_argument("--ov_device", default=os.getenv("OV_DEVICE","NPU"))
     ap.add_argument("--hf_device", default="xpu")
     ap.add_argument("--max_new_tokens", type=int, default=256)
@@ -162,7 +264,18 @@ def main():
     ap.add_argument("--rep_pen", type=float, default=1.1)
     ap.add_argument("--timeout_sec", type=float, default=90)
     ap.add_argument("--retries", type=int, default=0)
+    ap.add_argument("--retry_backoff_sec", type=float, default=2.0, help="재시도 대기(지수 증가)")
+    ap.add_argument("--abort_grace_sec", type=float, default=5.0, help="타임아웃 후 생성이 멈추길 기다리는 시간, 넘으면 포기")
+    ap.add_argument("--resume", default="", help="이어서 실행할 세션 폴더(또는 outdir 아래 이름)")
+    ap.add_argument("--cache", choices=["auto","on","off"], default="auto", help="결과 캐시: auto=결정적 설정(OV greedy, HF temp<=0)만")
+    ap.add_argument("--cache_dir", default="save/cache/results")
+    ap.add_argument("--prefix_cache", choices=["on","off"], default="on", help="공통 sys 접두부 KV 재사용(HF 단일 경로) / OV prefix caching(CPU/GPU)")
+    ap.add_argument("--pipe_cache_max", type=int, default=2, help="OV 파이프라인 캐시 최대 개수")
+    ap.add_argument("--pipe_cache_mb", type=float, default=0, help="OV 파이프라인 캐시 메모리 예산(MB, 0=무제한)")
+    ap.add_argument("--hf_batch", type=int, default=1, help="HF 동적 배치 최대 크기(>1 이면 동시 워커 프롬프트를 묶음, --jobs 와 함께)")
+    ap.add_argument("--hf_batch_window_ms", type=float, default=20)
     args = ap.parse_args()
+    PIPES.configure(max_items=args.pipe_cache_max, max_mb=args.pipe_cache_mb)
 
     mp = load_map(args.models_txt)
     ov_dir = mp.get(args.ov_key, ""); hf_id = mp.get(args.hf_key, "")
@@ -179,39 +292,75 @@ def main():
             if s: topics.append(s)
     topics = topics[:max(0,min(args.limit,len(topics)))]
 
-    stamp=time.strftime("%Y%m%d_%H%M%S")
-    outdir=Path(args.outdir)/f"{stamp}_dual_batch_v3"
+    if args.resume:
+        # 기존 세션에 이어쓰기: run.jsonl 에서 성공한(같은 모델 키) 토픽만 건너뜀
+        outdir=Path(args.resume)
+        if not outdir.is_dir(): outdir=Path(args.outdir)/args.resume
+        if not outdir.is_dir(): sys.exit(f"[ERR] resume session not found: {args.resume}")
+    else:
+        stamp=time.strftime("%Y%m%d_%H%M%S")
+        outdir=Path(args.outdir)/f"{stamp}_dual_batch_v3"
     outdir.mkdir(parents=True, exist_ok=True)
     jpath=outdir/"run.jsonl"; mpath=outdir/"run.md"; qapath=outdir/"run.qa.md"; cpath=outdir/"run.csv"
 
-    worker = make_worker(ov_dir, hf_id, sys_txt, usr_template, args)
+    prev=[]
+    if args.resume and jpath.exists():
+        prev, topics, skipped, redo = resume_session(jpath, topics, args.ov_key, args.hf_key)
+        print(f"[resume] {outdir}: {len(prev)+len(redo)} records, skip {len(skipped)} topics, retry {len(redo)} records, {len(topics)} to run")
+
+    # HF 모델은 시작 시 1회 로드 → 워커들이 공유, tok/s 에 로드 시간 미포함
+    try:
+        ent,_ = hf_model(hf_id, pick_hf_device(args.hf_device))
+        print(f"[hf] loaded {hf_id} on {ent.obj[2]} in {ent.load_sec}s")
+    except Exception as e:
+        print(f"[hf] preload failed: {e}")
+
+    cache = ResultCache(args.cache_dir) if args.cache != "off" else None
+    tasks, finish = make_worker(ov_dir, hf_id, sys_txt, usr_template, args, cache=cache)
 
-    rows=[]
-    with ThreadPoolExecutor(max_workers=max(1,args.jobs)) as ex, open(jpath,"a",encoding="utf-8") as jf:
-        futs={ ex.submit(worker, t): t for t in topics }
+    # OV/HF 는 서로 다른 장치 → 장치별 큐로 동시에 진행, 같은 토픽 결과는 둘 다 끝나면 합침
+    sched = DeviceScheduler({"ov":args.ov_jobs, "hf":args.jobs})
+    rows=list(prev)
+    with open(jpath,"a",encoding="utf-8") as jf:
+        futs={ sched.submit(tasks(t)): t for t in topics }
         for n,f in enumerate(as_completed(futs),1):
-            rec=f.result()
+            rec=finish(futs[f], f.result())
             jf.write(json.dumps(rec,ensure_ascii=False)+"\n"); jf.flush()
             rows.append(rec)
-            print(f"[{n}/{len(topics)}] {rec['topic']}  {rec['elapsed_sec']}s  qa(ov={int(rec['qa']['ov']['pass'])},hf={int(rec['qa']['hf']['pass'])})")
+            print(f"[{n}/{len(topics)}] {rec['topic']}  {rec['elapsed_sec']}s (ov {rec['ov']['elapsed_sec']}s, hf {rec['hf']['elapsed_sec']}s)  qa(ov={int(rec['qa']['ov']['pass'])},hf={int(rec['qa']['hf']['pass'])})")
+    sched.shutdown()
 
     # MD 요약
     def trunc(s,n=240): 
         s=s.replace("\n"," "); 
         return s if len(s)<=n else s[:n]+"…"
     with open(mpath,"w",encoding="utf-8") as mf:
-        mf.write(f"# Dual Batch v3  \n- time: {now()}  \n- cnt: {len(rows)}  \n- ov={args.ov_key}({args.ov_device})  hf={args.hf_key}({args.hf_device})  \n- schema={SCHEMA_VERSION}\n\n")
-        mf.write("|#|topic|ov_pass|hf_pass|elapsed(s)|ov_out|hf_out|\n|:-:|:-|:-:|:-:|:-:|:-|:-|\n")
+        mf.write(f"# Dual Batch v3  \n- time: {now()}  \n- cnt: {len(rows)}  \n- ov={args.ov_key}({args.ov_device})  hf={args.hf_key}({args.hf_device})  \n- schema={SCHEMA_VERSION}\n")
+        # 결과 캐시 히트(timing.cached)는 생성하지 않았으므로 시간 통계에서 제외
+        ovt=[r["ov"].get("timing") or {} for r in rows]; ovt=[t for t in ovt if t and not t.get("cached")]
+        cold=[t for t in ovt if t.get("cold")]
+        warm=[t for t in ovt if not t.get("cold")]
+        avg=lambda xs,k: round(sum(x.get(k,0) for x in xs)/len(xs),3) if xs else 0
+        mf.write(f"- ov_pipe: cold={len(cold)} (load {avg(cold,'load_sec')}s, gen {avg(cold,'gen_sec')}s)  warm={len(warm)} (gen {avg(warm,'gen_sec')}s)\n")
+        for k in ("ov","hf"):
+            ts=[r[k].get("timing",{}) for r in rows]
+            mf.write(f"- {k}_timeouts: {sum(t.get('timeouts',0) for t in ts)}  aborts: {sum(t.get('aborts',0) for t in ts)}  errors: {sum(t.get('errors',0) for t in ts)}  retried: {sum(1 for t in ts if t.get('attempts',1)>1)}\n")
+        hft=[r["hf"]["timing"] for r in rows if r["hf"].get("timing",{}).get("gen_sec") and not r["hf"]["timing"].get("cached")]
+        mf.write(f"- cached: ov {sum(1 for r in rows if (r['ov'].get('timing') or {}).get('cached'))}  hf {sum(1 for r in rows if (r['hf'].get('timing') or {}).get('cached'))} (시간 통계 제외)\n")
+        mf.write(f"- hf_prefix: reused {sum(1 for t in hft if t.get('prefix_tokens'))}/{len(hft)}  prefill saved {round(sum(t.get('prefill_saved_sec',0) for t in hft),3)}s\n")
+        mf.write(f"- hf: n={len(hft)}  gen {avg(hft,'gen_sec')}s  {avg(hft,'tok_per_sec')} tok/s (load excluded)\n\n")
+        mf.write("|#|topic|ov_pass|hf_pass|elapsed(s)|cached|ov_out|hf_out|\n|:-:|:-|:-:|:-:|:-:|:-:|:-|:-|\n")
         for i,r in enumerate(rows,1):
-            mf.write(f"|{i}|{r['topic']}|{int(r['qa']['ov']['pass'])}|{int(r['qa']['hf']['pass'])}|{r['elapsed_sec']}|{trunc(r['ov']['out'])}|{trunc(r['hf']['out'])}|\n")
+            ch="/".join(k for k in ("ov","hf") if (r[k].get("timing") or {}).get("cached"))
+            mf.write(f"|{i}|{r['topic']}|{int(r['qa']['ov']['pass'])}|{int(r['qa']['hf']['pass'])}|{r['elapsed_sec']}|{ch}|{trunc(r['ov']['out'])}|{trunc(r['hf']['out'])}|\n")
 
     # CSV
     import csv
     with open(cpath,"w",newline="",encoding="utf-8") as cf:
         w=csv.writer(cf)
-        w.writerow(["idx","topic","elapsed_sec","ov_key","ov_device","ov_pass","hf_key","hf_device","hf_pass"])
+        w.writerow(["idx","topic","elapsed_sec","ov_key","ov_device","ov_pass","hf_key","hf_device","hf_pass","ov_elapsed_sec","hf_elapsed_sec"])
         for i,r in enumerate(rows,1):
-            w.writerow([i,r["topic"],r["elapsed_sec"],r["ov"]["key"],r["ov"]["device"],int(r["qa"]["ov"]["pass"]),r["hf"]["key"],r["hf"]["device"],int(r["qa"]["hf"]["pass"])])
+            w.writerow([i,r["topic"],r["elapsed_sec"],r["ov"]["key"],r["ov"]["device"],int(r["qa"]["ov"]["pass"]),r["hf"]["key"],r["hf"]["device"],int(r["qa"]["hf"]["pass"]),r["ov"].get("elapsed_sec",""),r["hf"].get("elapsed_sec","")])
 
     # QA 표
     with open(qapath,"w",encoding="utf-8") as qf:
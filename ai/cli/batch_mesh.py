@@ -0,0 +1,111 @@
+import os, csv, json, time, hashlib
+from pathlib import Path
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from mesh3d import mesh_node, shape_of, params_of, write_stl
+
+# 세션 part_tree → leaf 부품 STL 일괄 생성(프로세스 풀) + <session>/meshes/manifest.json.
+# 입력: export_blueprints 결과(blueprints/<idx_topic>/<src>/part_tree.json, blueprints/PRINT_QUEUE.csv).
+# 캐시: STL 파일명 = (형상, 파라미터, 분할 수, MESH_VERSION) 해시 → 파라미터가 같으면 다시 만들지 않음(레코드 간 동일 부품도 1회).
+# 예) python ai/cli/batch_mesh.py save/sessions/<session> --workers 8
+
+MESH_VERSION = "2"   # mesh3d 형상 규칙이 바뀌면 올림
+POOL_MIN = 16        # 이보다 적으면 현재 프로세스에서 생성
+
+def _slug(s):
+    return "".join(c for c in str(s) if c.isalnum() or c in "-_ ")[:40].strip().replace(" ", "_") or "part"
+
+def _hash(shape, params, segments):
+    return hashlib.sha256(json.dumps([MESH_VERSION, shape, params, segments], sort_keys=True).encode()).hexdigest()
+
+def _eff_qty(pack_dir):
+    """PRINT_QUEUE.csv → {(path, id): eff_qty} (없으면 빈 dict)"""
+    try:
+        with open(pack_dir/"PRINT_QUEUE.csv", encoding="utf-8", newline="") as f:
+            return {(r["path"], r["id"]): r["eff_qty"] for r in csv.DictReader(f)}
+    except (OSError, KeyError):
+        return {}
+
+def collect(pack_dir, segments=128):
+    """blueprints 폴더 → leaf 노드 작업 목록 [{key, path, id, name, material, process, eff_qty, shape, params, hash}]"""
+    pack_dir = Path(pack_dir); eq = _eff_qty(pack_dir); jobs = []
+    for pt in sorted(pack_dir.rglob("part_tree.json")):
+        rel = pt.parent.relative_to(pack_dir).as_posix()
+        try: tree = json.loads(pt.read_text(encoding="utf-8"))
+        except ValueError: continue
+        stack = [tree] if isinstance(tree, dict) else []
+        while stack:   # 반복 순회(깊은 트리 안전)
+            node = stack.pop(); kids = [c for c in (node.get("children") or []) if isinstance(c, dict)]
+            if kids: stack.extend(reversed(kids)); continue
+            nid = str(node.get("id", "")); shape = shape_of(node); params = params_of(node)
+            jobs.append({"key": f"{rel}#{nid}", "path": rel, "id": nid, "name": str(node.get("name", "")),
+                         "material": str(node.get("material", "")), "process": str(node.get("process", "")),
+                         "eff_qty": eq.get((rel, nid), node.get("qty", 1)), "shape": shape, "params": params,
+                         "hash": _hash(shape, params, segments), "node": node})
+    return jobs
+
+def mesh_one(args):
+    """(node, stl 경로, segments) → {triangles, bbox, volume(mm³), sec} 또는 {error, sec}. 프로세스 풀 워커
+    파라미터가 LLM 출력이라 형상 생성 실패는 예외 대신 error 로 돌려줌 → 나머지 leaf 는 계속"""
+    node, out, segments = args
+    t0 = time.perf_counter()
+    try:
+        _, tris = mesh_node(node, segments)
+        if not len(tris) or not np.isfinite(tris).all(): raise ValueError("빈 메시 또는 NaN 좌표")
+        t = tris.astype(np.float64); vol = float(np.einsum("ij,ij->i", t[:, 0], np.cross(t[:, 1], t[:, 2])).sum()) / 6.0
+        if not vol > 0: raise ValueError(f"부피 {vol:.3g} mm³ (치수 모순)")
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}", "sec": round(time.perf_counter() - t0, 4)}
+    n = write_stl(out, tris, str(node.get("name", "part")))
+    lo = tris.reshape(-1, 3).min(0); hi = tris.reshape(-1, 3).max(0)
+    return {"triangles": n, "bbox": [[round(float(x), 3) for x in lo], [round(float(x), 3) for x in hi]],
+            "volume": round(vol, 3), "sec": round(time.perf_counter() - t0, 4)}
+
+def mesh_session(session_root, workers=0, segments=128):
+    """-> (manifest 경로, 통계 {leaves, unique, meshed, cached, sec}). workers=0 → 코어 수(작업이 POOL_MIN 이상일 때만 풀)"""
+    t0 = time.perf_counter()
+    root = Path(session_root); pack_dir = root/"blueprints"; out_dir = root/"meshes"
+    man_p = out_dir/"manifest.json"
+    try:
+        with man_p.open(encoding="utf-8") as f: old = json.load(f).get("meshes", {})
+    except (OSError, ValueError): old = {}
+    jobs = collect(pack_dir, segments)
+    # 해시별 1회: 같은 형상/파라미터의 leaf 는 STL 공유
+    uniq = {}
+    for j in jobs: uniq.setdefault(j["hash"], j)
+    meshes = {}; todo = []
+    for h, j in uniq.items():
+        fn = f"{_slug(j['name'])}_{h[:12]}.stl"
+        if h in old and "error" not in old[h] and (out_dir/old[h]["stl"]).exists(): meshes[h] = old[h]; continue
+        meshes[h] = {"stl": fn, "shape": j["shape"], "params": j["params"]}
+        todo.append((h, (j["node"], str(out_dir/fn), segments)))
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if len(todo) >= POOL_MIN and (workers or os.cpu_count() or 1) > 1:
+        with ProcessPoolExecutor(max_workers=workers or None) as ex:
+            for (h, _), res in zip(todo, ex.map(mesh_one, [a for _, a in todo], chunksize=4)): meshes[h].update(res)
+    else:
+        for h, a in todo: meshes[h].update(mesh_one(a))
+    # 더 이상 쓰지 않는 STL 정리
+    for h, m in old.items():
+        if h not in meshes and m.get("stl"): (out_dir/m["stl"]).unlink(missing_ok=True)
+    # 실패한 형상은 stl 없음 + error 기록
+    for m in meshes.values():
+        if "error" in m: m.pop("stl", None)
+    parts = [{k: j[k] for k in ("key","path","id","name","material","process","eff_qty","shape","hash")}
+             | {k: meshes[j["hash"]][k] for k in ("stl", "error") if k in meshes[j["hash"]]} for j in jobs]
+    tmp = man_p.with_suffix(".json.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump({"version": MESH_VERSION, "segments": segments, "parts": parts, "meshes": meshes}, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, man_p)
+    return str(man_p), {"leaves": len(jobs), "unique": len(uniq), "meshed": len(todo), "cached": len(uniq)-len(todo),
+                        "errors": sum("error" in m for m in meshes.values()), "sec": round(time.perf_counter()-t0, 3)}
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser()
+    ap.add_argument("session", help="세션 폴더(blueprints/ 가 있는 곳, 먼저 export_blueprints 실행)")
+    ap.add_argument("--workers", type=int, default=0)
+    ap.add_argument("--segments", type=int, default=128, help="회전체 둘레 분할 수")
+    a = ap.parse_args()
+    p, st = mesh_session(a.session, a.workers, a.segments)
+    print(f"[batch_mesh] {st} -> {p}")
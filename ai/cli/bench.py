@@ -0,0 +1,203 @@
+import argparse, os, sys, json, time, platform, threading, gc
+from pathlib import Path
+from model_cache import PIPES, HF_MODELS, ov_pipeline, hf_model
+from streaming import stream_ov, stream_hf, Timed, pct
+from genai_run import load_map, norm
+from batch_dual_v3 import hf_apply_chat, pick_hf_device
+
+# 생성 벤치마크: (모델, 장치, max_new_tokens) 조합마다 고정 프롬프트 세트를 돌려
+# 로드 시간 / TTFT / tok/s / 지연 p50·p95 / 최대 RSS 를 JSON 으로 저장, --compare 로 이전 결과와 비교.
+# 예) python ai\cli\bench.py --models llama1b,phi4mini --devices NPU,CPU --max_new_tokens 64,256
+#     python ai\cli\bench.py --backend hf --models hf-internal-testing/tiny-random-LlamaForCausalLM --devices cpu
+
+BENCH_SCHEMA = "bench/1"
+
+PROMPTS = [
+    "Summarize the main failure modes of a regeneratively cooled rocket nozzle in three bullet points.",
+    "List five design rules for additive manufacturing of thin-walled metal parts.",
+    "Explain combustion instability in liquid rocket engines to a new engineer.",
+    "Give a short checklist for verifying a 3D-printed propeller before flight.",
+    "드론 프로펠러 소음을 줄이는 설계 방법을 세 가지 설명해줘.",
+]
+
+def read_prompts(p):
+    if not p: return list(PROMPTS)
+    with open(p, encoding="utf-8-sig") as f:
+        return [s.strip() for s in f if s.strip()]
+
+def backend_of(spec):
+    """openvino_model.xml 이 있으면 OV, 아니면 HF(로컬 폴더 또는 허브 repo id)"""
+    return "ov" if os.path.isfile(os.path.join(spec, "openvino_model.xml")) else "hf"
+
+class PeakRSS:
+    """구간 최대 RSS(MB). psutil 이 있으면 샘플링, 없으면 getrusage(프로세스 누적 최대)"""
+    def __init__(self, every=0.02):
+        self.every = every; self.peak = 0; self.source = None; self._stop = threading.Event(); self._th = None
+    def _sample(self, proc):
+        while not self._stop.is_set():
+            try: self.peak = max(self.peak, proc.memory_info().rss)
+            except Exception: return
+            self._stop.wait(self.every)
+    def __enter__(self):
+        try:
+            import psutil
+            self.source = "psutil"
+            self._th = threading.Thread(target=self._sample, args=(psutil.Process(),), daemon=True); self._th.start()
+        except ImportError:
+            self.source = "getrusage"
+        return self
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._th: self._th.join()
+        if self.source == "getrusage":
+            try:
+                import resource
+                r = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                self.peak = r if sys.platform == "darwin" else r*1024   # linux 는 KB
+            except ImportError:
+                self.source = None
+        return False
+    def mb(self):
+        return round(self.peak/2**20, 1) if self.peak else None
+
+def _count_hf(tok, text):
+    return len(tok(text, add_special_tokens=False)["input_ids"])
+
+def _count_ov(pipe, text, chunks):
+    try: return int(pipe.get_tokenizer().encode(text).input_ids.shape[-1])
+    except Exception: return chunks   # OV streamer 콜백 ≈ 토큰 1개
+
+def open_model(backend, spec, device):
+    """-> (entry, cold, run(prompt, max_new_tokens) -> (Timed, 새 토큰 수))"""
+    if backend == "ov":
+        from openvino_genai import GenerationConfig
+        ent, cold = ov_pipeline(norm(spec), device)
+        def run(prompt, n):
+            tg = Timed(stream_ov(ent.obj, prompt, GenerationConfig(max_new_tokens=n), lock=ent.lock))
+            text = "".join(tg)
+            return tg, _count_ov(ent.obj, text, tg.n)
+        return ent, cold, run
+    ent, cold = hf_model(spec, pick_hf_device(device))
+    tok, model, dev = ent.obj
+    def run(prompt, n):
+        tg = Timed(stream_hf(tok, model, dev, hf_apply_chat(tok, "You are a helpful engineering assistant.", prompt), lock=ent.lock,
+                             max_new_tokens=n, do_sample=False))
+        text = "".join(tg)
+        return tg, _count_hf(tok, text)
+    return ent, cold, run
+
+def bench_one(backend, spec, device, max_tokens, prompts, repeat=1, warmup=1):
+    """(모델, 장치) 1회 로드 후 max_new_tokens 마다 결과 행 1개"""
+    rows = []
+    PIPES.clear(); HF_MODELS.clear(); gc.collect()   # 이전 모델 메모리가 RSS 에 섞이지 않게
+    with PeakRSS() as rss_load:
+        ent, cold, run = open_model(backend, spec, device)
+    for n in max_tokens:
+        with PeakRSS() as rss:
+            for p in prompts[:max(0, warmup)]: run(p, n)
+            ttft, lat, tps, toks = [], [], [], []
+            for _ in range(max(1, repeat)):
+                for p in prompts:
+                    tg, n_new = run(p, n)
+                    ttft.append(tg.ttft or 0.0); lat.append(tg.total); toks.append(n_new)
+                    tps.append(n_new/tg.total if tg.total else 0.0)
+        peak = max(x for x in (rss.mb(), rss_load.mb(), 0) if x is not None) or None
+        rows.append({"model": spec, "backend": backend, "device": device, "max_new_tokens": n,
+                     "load_sec": ent.load_sec, "cold": cold, "runs": len(lat),
+                     "ttft_sec_p50": round(pct(ttft, 50), 4), "ttft_sec_p95": round(pct(ttft, 95), 4),
+                     "latency_sec_p50": round(pct(lat, 50), 4), "latency_sec_p95": round(pct(lat, 95), 4),
+                     "tok_per_sec": round(sum(toks)/sum(lat), 2) if sum(lat) else 0.0,
+                     "tok_per_sec_p50": round(pct(tps, 50), 2), "new_tokens_avg": round(sum(toks)/len(toks), 1),
+                     "peak_rss_mb": peak, "rss_source": rss.source})
+        cold = False
+    return rows
+
+def row_key(r):
+    return (r["model"], r["backend"], str(r["device"]).upper(), int(r["max_new_tokens"]))
+
+# 비교 지표: (필드, 클수록 좋은가)
+METRICS = [("tok_per_sec", True), ("ttft_sec_p50", False), ("latency_sec_p50", False), ("latency_sec_p95", False), ("load_sec", False), ("peak_rss_mb", False)]
+
+def compare(cur, prev, tol=0.10):
+    """-> (markdown 줄 목록, 회귀 개수). tol = 허용 악화 비율"""
+    old = {row_key(r): r for r in prev.get("results", [])}
+    lines = ["| model | device | max_new | metric | prev | cur | Δ% |", "|---|---|---:|---|---:|---:|---:|"]
+    bad = 0
+    for r in cur.get("results", []):
+        o = old.get(row_key(r))
+        if o is None or o.get("error"): continue
+        if r.get("error"):   # 이전엔 돌던 조합이 이번엔 실패 → 회귀
+            bad += 1
+            lines.append(f"| {Path(r['model']).name} | {r['device']} | {r['max_new_tokens']} | error | ok | {r['error']} | ⚠ |"); continue
+        for m, up in METRICS:
+            a, b = o.get(m), r.get(m)
+            if not a or b is None: continue
+            d = (b-a)/a
+            worse = (d < -tol) if up else (d > tol)
+            bad += worse
+            lines.append(f"| {Path(r['model']).name} | {r['device']} | {r['max_new_tokens']} | {m} | {a} | {b} | {d*100:+.1f}{' ⚠' if worse else ''} |")
+    return lines, bad
+
+def table(rows):
+    lines = ["| model | backend | device | max_new | load_s | ttft_p50 | tok/s | lat_p50 | lat_p95 | rss_MB |", "|---|---|---|---:|---:|---:|---:|---:|---:|---:|"]
+    for r in rows:
+        if r.get("error"):
+            lines.append(f"| {Path(r['model']).name} | {r['backend']} | {r['device']} | {r['max_new_tokens']} | [ERR] {r['error']} |||||| "); continue
+        lines.append(f"| {Path(r['model']).name} | {r['backend']} | {r['device']} | {r['max_new_tokens']} | {r['load_sec']} | {r['ttft_sec_p50']} | "
+                     f"{r['tok_per_sec']} | {r['latency_sec_p50']} | {r['latency_sec_p95']} | {r['peak_rss_mb']} |")
+    return lines
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--models", required=True, help="쉼표 구분: configs/models.txt 키, 모델 폴더, 또는 HF repo id")
+    ap.add_argument("--models_txt", default="configs/models.txt")
+    ap.add_argument("--backend", choices=["auto","ov","hf"], default="auto", help="auto = openvino_model.xml 있으면 ov")
+    ap.add_argument("--devices", default=os.getenv("OV_DEVICE","CPU"), help="쉼표 구분(OV: NPU,GPU,CPU / HF: cpu,xpu,cuda)")
+    ap.add_argument("--max_new_tokens", default="64", help="쉼표 구분 목록")
+    ap.add_argument("--prompts", default="", help="한 줄 1프롬프트 파일(기본 = 내장 고정 세트)")
+    ap.add_argument("--limit", type=int, default=0, help="앞에서 N개 프롬프트만")
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--warmup", type=int, default=1, help="측정 전 워밍업 프롬프트 수")
+    ap.add_argument("--out", default="", help="결과 JSON(기본 save/bench/<stamp>_bench.json)")
+    ap.add_argument("--compare", default="", help="이전 결과 JSON 과 비교")
+    ap.add_argument("--tolerance", type=float, default=0.10, help="회귀로 볼 악화 비율")
+    ap.add_argument("--fail_on_regress", action="store_true", help="회귀가 있으면 종료코드 1")
+    a = ap.parse_args()
+
+    mp = load_map(a.models_txt)
+    prompts = read_prompts(a.prompts)
+    if a.limit > 0: prompts = prompts[:a.limit]
+    if not prompts: sys.exit("[ERR] no prompts")
+    max_tokens = [int(x) for x in a.max_new_tokens.split(",") if x.strip()]
+    devices = [d.strip() for d in a.devices.split(",") if d.strip()]
+
+    rows = []
+    for key in [k.strip() for k in a.models.split(",") if k.strip()]:
+        spec = mp.get(key, key)
+        backend = backend_of(spec) if a.backend == "auto" else a.backend
+        for dev in devices:
+            print(f"[bench] {key} ({backend}) on {dev} ...", file=sys.stderr)
+            try:
+                rows += bench_one(backend, spec, dev, max_tokens, prompts, a.repeat, a.warmup)
+            except Exception as e:
+                rows += [{"model": spec, "backend": backend, "device": dev, "max_new_tokens": n, "error": f"{type(e).__name__}: {e}"} for n in max_tokens]
+
+    res = {"schema": BENCH_SCHEMA, "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+           "host": {"platform": platform.platform(), "python": platform.python_version(), "cpu_count": os.cpu_count()},
+           "prompts": len(prompts), "repeat": a.repeat, "warmup": a.warmup, "results": rows}
+    out = Path(a.out or f"save/bench/{time.strftime('%Y%m%d_%H%M%S')}_bench.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f: json.dump(res, f, ensure_ascii=False, indent=2)
+    print("\n".join(table(rows)))
+    print(f"[OK] {out}")
+
+    if a.compare:
+        with open(a.compare, encoding="utf-8") as f: prev = json.load(f)
+        lines, bad = compare(res, prev, a.tolerance)
+        print(f"\n## vs {a.compare}\n" + "\n".join(lines))
+        print(f"[compare] regressions: {bad} (tolerance {a.tolerance*100:.0f}%)")
+        if bad and a.fail_on_regress: sys.exit(1)
+    if all(r.get("error") for r in rows): sys.exit(2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import os, io, csv, json, hashlib, zipfile
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from part_tree import extract as extract_part_tree
+from bom import BOM_COLS, PQ_COLS, PART_COLS, GROUP_COLS, flatten, queue_rows, rollup
+
+# BLUEPRINT / Print-Pack 내보내기 (blueprint_batch_ui 에서 사용)
+# 1패스: 레코드마다 blueprint.md / part_tree.json / BOM.csv 를 쓰면서 PRINT_QUEUE 행을 메모리에 모으고
+# (bom.py: eff_qty, PRINT_PARTS = 동일 부품 합계, PRINT_GROUPS = material/process 집계),
+# zip 은 메모리의 내용을 writestr 로 바로 기록(다시 읽지 않음).
+# 증분: blueprints/manifest.json 에 (내용 해시 → BOM 행) 저장, 해시가 같으면 파싱/쓰기 생략.
+
+EXPORT_VERSION = "3"   # 파서/BOM 규칙이 바뀌면 올려서 전체 재내보내기
+PRINT_TABLES = ("PRINT_QUEUE.csv", "PRINT_PARTS.csv", "PRINT_GROUPS.csv")
+POOL_MIN = 64          # 이보다 적으면 프로세스 풀 기동 비용이 파싱보다 큼 → 현재 프로세스에서 파싱
+
+def parse_one(txt):
+    """-> (part_tree dict 또는 None, BOM 행 목록). 프로세스 풀 워커"""
+    pt = extract_part_tree(txt)   # 두 펜스 형식 모두, 노드 스키마 정규화
+    return pt, flatten(pt) if pt else []
+
+def _slug(topic):
+    return "".join([c for c in topic if c.isalnum() or c in ("-","_"," ")])[:80].strip().replace(" ","_")
+
+def _hash(*parts):
+    h = hashlib.sha256(EXPORT_VERSION.encode())
+    for p in parts: h.update(b"\0"); h.update(str(p).encode("utf-8"))
+    return h.hexdigest()
+
+def _csv_text(header, rows):
+    buf = io.StringIO(); w = csv.writer(buf); w.writerow(header); w.writerows(rows)
+    return buf.getvalue()
+
+def _write(p, text):
+    p.parent.mkdir(parents=True, exist_ok=True)
+    with p.open("w", encoding="utf-8", newline="") as f: f.write(text)
+
+def plan(records, include_npu=True, include_xpu=True):
+    """-> [(rel_dir, src, txt)] 내보낼 항목(레코드 순서)"""
+    jobs = []
+    for r in records:
+        for src_key, txt in (("npu", r.get("npu")), ("xpu", r.get("xpu"))):
+            if (src_key=="npu" and not include_npu) or (src_key=="xpu" and not include_xpu): continue
+            if not txt: continue
+            jobs.append((f"{int(r['idx']):02d}_{_slug(r['topic'])}/{src_key}", src_key, txt))
+    return jobs
+
+def export_blueprints(session_root, records, include_npu=True, include_xpu=True, workers=0):
+    """-> (zip 경로, 통계 {items, parsed, skipped, zip}). workers=0 → 코어 수(항목이 POOL_MIN 이상일 때만 풀 사용)"""
+    root = Path(session_root); pack_dir = root/"blueprints"
+    man_p = pack_dir/"manifest.json"
+    try:
+        with man_p.open(encoding="utf-8") as f: old = json.load(f)
+    except (OSError, ValueError): old = {}
+    jobs = plan(records, include_npu, include_xpu)
+    hashes = [_hash(rel, txt) for rel, _, txt in jobs]
+    # 변경된 항목만 파싱
+    todo = [i for i, (rel, _, _) in enumerate(jobs)
+            if (old.get("items") or {}).get(rel, {}).get("hash") != hashes[i] or not (pack_dir/rel/"blueprint.md").exists()]
+    parsed = {}
+    if len(todo) >= POOL_MIN and (workers or os.cpu_count() or 1) > 1:
+        with ProcessPoolExecutor(max_workers=workers or None) as ex:
+            for i, res in zip(todo, ex.map(parse_one, [jobs[i][2] for i in todo], chunksize=16)): parsed[i] = res
+    else:
+        for i in todo: parsed[i] = parse_one(jobs[i][2])
+
+    items = {}; pts = {}
+    for i, (rel, _, txt) in enumerate(jobs):
+        d = pack_dir/rel
+        if i in parsed:
+            pt, rows = parsed[i]
+            _write(d/"blueprint.md", txt)
+            if pt:
+                pts[rel] = json.dumps(pt, ensure_ascii=False, indent=2)
+                _write(d/"part_tree.json", pts[rel])
+                _write(d/"BOM.csv", _csv_text(BOM_COLS, rows))
+            else:
+                for fn in ("part_tree.json", "BOM.csv"): (d/fn).unlink(missing_ok=True)
+            items[rel] = {"hash": hashes[i], "rows": rows, "has_pt": bool(pt)}
+        else:
+            items[rel] = old["items"][rel]
+    # PRINT_QUEUE(노드별, eff_qty) + 동일 부품 합계 + material/process 집계 — 메모리에서 바로
+    pq, recs = queue_rows((rel, items[rel]["rows"]) for rel, _, _ in jobs)
+
+    zip_path = root/"print_pack.zip"
+    digest = _hash(*[items[rel]["hash"] for rel, _, _ in jobs])
+    rezip = digest != old.get("zip") or not zip_path.exists()
+    if rezip:
+        parts, groups = rollup(recs)
+        tables = {"PRINT_QUEUE.csv": _csv_text(PQ_COLS, pq), "PRINT_PARTS.csv": _csv_text(PART_COLS, parts),
+                  "PRINT_GROUPS.csv": _csv_text(GROUP_COLS, groups)} if pq else {}
+        for fn in PRINT_TABLES:   # 이번에 행이 없으면 이전 내보내기의 표는 지움(오래된 PRINT_QUEUE 가 남지 않게)
+            if fn in tables: _write(pack_dir/fn, tables[fn])
+            else: (pack_dir/fn).unlink(missing_ok=True)
+        tmp = zip_path.with_suffix(".zip.tmp")
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as z:
+            for rel, _, txt in jobs:
+                ent = items[rel]; arc = f"blueprints/{rel}"
+                z.writestr(f"{arc}/blueprint.md", txt)
+                if ent["has_pt"]:
+                    # 이번에 파싱한 항목은 메모리 내용, 건너뛴 항목만 디스크에서
+                    z.writestr(f"{arc}/part_tree.json", pts[rel] if rel in pts else (pack_dir/rel/"part_tree.json").read_text(encoding="utf-8"))
+                    z.writestr(f"{arc}/BOM.csv", _csv_text(BOM_COLS, ent["rows"]))
+            for fn, text in tables.items(): z.writestr(f"blueprints/{fn}", text)
+        os.replace(tmp, zip_path)
+    if parsed or rezip:
+        _write(man_p, json.dumps({"version": EXPORT_VERSION, "zip": digest, "items": items}, ensure_ascii=False))
+    return str(zip_path), {"items": len(jobs), "parsed": len(parsed), "skipped": len(jobs)-len(parsed), "zip": rezip, "print_queue": len(pq)}
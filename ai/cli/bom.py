@@ -0,0 +1,112 @@
+import os, csv, math, time
+from collections import deque
+import numpy as np
+
+# BOM 엔진: part_tree → 노드 배열(BFS, 재귀 없음) → 유효 수량(eff_qty = 루트까지 qty 곱)을 깊이 구간 단위 벡터 연산으로.
+# 레코드 간 동일 부품(name+material+process) 합치기, PRINT_QUEUE 를 material/process 로 집계.
+# 예) python ai/cli/bom.py save/sessions/<session>/run.jsonl --out save/sessions/<session>/blueprints
+
+BOM_COLS = ["id","name","qty","eff_qty","material","process","parent","depth","leaf"]
+PQ_COLS = ["id","name","qty","eff_qty","material","process","path"]
+PART_COLS = ["name","material","process","total_qty","sources"]
+GROUP_COLS = ["material","process","parts","total_qty","sources"]
+
+def _num(v):
+    try:
+        q = float(v)
+        return q if q > 0 and math.isfinite(q) else 1.0
+    except (TypeError, ValueError):
+        return 1.0
+
+def _fmt(x):
+    return int(x) if float(x).is_integer() else round(float(x), 4)
+
+def flatten(tree):
+    """-> BOM 행 목록([id,name,qty,eff_qty,material,process,parent,depth,leaf]), 부모가 항상 자식보다 앞"""
+    if not isinstance(tree, dict): return []
+    nodes, parent, depth = [], [], []
+    q = deque([(tree, -1, 0)])
+    while q:
+        node, p, d = q.popleft()
+        i = len(nodes); nodes.append(node); parent.append(p); depth.append(d)
+        for ch in (node.get("children") or []):
+            if isinstance(ch, dict): q.append((ch, i, d+1))
+    n = len(nodes)
+    qty = np.fromiter((_num(x.get("qty", 1)) for x in nodes), dtype=np.float64, count=n)
+    par = np.asarray(parent, dtype=np.int64); dep = np.asarray(depth, dtype=np.int64)
+    eff = qty.copy()
+    # BFS 순서라 같은 깊이는 연속 구간 → 구간마다 eff = qty * eff[부모]
+    bounds = np.searchsorted(dep, np.arange(1, int(dep[-1])+2))
+    for s, e in zip(bounds[:-1], bounds[1:]):
+        eff[s:e] = qty[s:e] * eff[par[s:e]]
+    kids = np.bincount(par[1:], minlength=n) if n > 1 else np.zeros(n, dtype=np.int64)
+    ids = [str(x.get("id", "")) for x in nodes]
+    return [[ids[i], str(nodes[i].get("name","")), _fmt(qty[i]), _fmt(eff[i]), str(nodes[i].get("material","")),
+             str(nodes[i].get("process","")), ids[par[i]] if par[i] >= 0 else "", int(dep[i]), int(kids[i] == 0)]
+            for i in range(n)]
+
+def _norm(s):
+    return " ".join(str(s).split()).lower()
+
+def _first(inv, n):
+    """그룹마다 처음 등장한 행 번호(표시용 원래 표기)"""
+    f = np.full(n, len(inv)); np.minimum.at(f, inv, np.arange(len(inv)))   # 중복 인덱스 대입 순서는 보장되지 않음 → minimum.at
+    return f
+
+def _distinct(a, b, n):
+    """그룹 a 마다 서로 다른 b 의 개수"""
+    return np.bincount(np.unique(np.stack([a, b], 1), axis=0)[:, 0], minlength=n)
+
+def _inverse(keys):
+    u, inv = np.unique(np.array(keys, dtype=object), return_inverse=True)
+    return len(u), inv.reshape(-1)
+
+def rollup(rows, leaves_only=True):
+    """rows: [{name, material, process, eff_qty, path, leaf}] (여러 레코드)
+    -> (parts: 동일 부품(name+material+process, 대소문자/공백 무시) 합계, groups: material/process 별 합계).
+    조립체(자식 있는 노드)는 기본 제외"""
+    rows = [r for r in rows if not leaves_only or int(r.get("leaf", 1))]
+    if not rows: return [], []
+    qty = np.fromiter((float(r["eff_qty"]) for r in rows), dtype=np.float64, count=len(rows))
+    mp = [f"{_norm(r['material'])}\x1f{_norm(r['process'])}" for r in rows]
+    nk, inv = _inverse([f"{_norm(r['name'])}\x1f{m}" for r, m in zip(rows, mp)])
+    ng, ginv = _inverse(mp)
+    _, pinv = _inverse([r.get("path","") for r in rows])
+    tot = np.bincount(inv, weights=qty, minlength=nk); src = _distinct(inv, pinv, nk); f = _first(inv, nk)
+    parts = [[rows[f[k]]["name"], rows[f[k]]["material"], rows[f[k]]["process"], _fmt(tot[k]), int(src[k])] for k in range(nk)]
+    parts.sort(key=lambda p: (_norm(p[1]), _norm(p[2]), -float(p[3])))
+    gq = np.bincount(ginv, weights=qty, minlength=ng); gn = _distinct(ginv, inv, ng); gs = _distinct(ginv, pinv, ng); gf = _first(ginv, ng)
+    groups = [[rows[gf[g]]["material"], rows[gf[g]]["process"], int(gn[g]), _fmt(gq[g]), int(gs[g])] for g in range(ng)]
+    groups.sort(key=lambda g: -float(g[3]))
+    return parts, groups
+
+def queue_rows(items):
+    """items: [(path, BOM 행 목록)] → PRINT_QUEUE 행(PQ_COLS) + rollup 입력 dict"""
+    pq, recs = [], []
+    for path, rows in items:
+        for r in rows:
+            pq.append([r[0], r[1], r[2], r[3], r[4], r[5], path])
+            recs.append({"name": r[1], "material": r[4], "process": r[5], "eff_qty": r[3], "path": path, "leaf": r[8]})
+    return pq, recs
+
+def write_csv(p, header, rows):
+    with open(p, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f); w.writerow(header); w.writerows(rows)
+
+if __name__ == "__main__":
+    import argparse
+    from part_tree import parse_session
+    ap = argparse.ArgumentParser()
+    ap.add_argument("run_jsonl")
+    ap.add_argument("--out", default="", help="PRINT_QUEUE*.csv 저장 폴더(기본 run.jsonl 폴더)")
+    ap.add_argument("--all_nodes", action="store_true", help="조립체 노드도 집계에 포함")
+    a = ap.parse_args()
+    t0 = time.perf_counter()
+    items = [(f"{r['idx']}/{r['src']}", flatten(r["tree"])) for r in parse_session(a.run_jsonl) if r["tree"]]
+    pq, recs = queue_rows(items)
+    parts, groups = rollup(recs, leaves_only=not a.all_nodes)
+    out = a.out or os.path.dirname(os.path.abspath(a.run_jsonl)); os.makedirs(out, exist_ok=True)
+    write_csv(os.path.join(out, "PRINT_QUEUE.csv"), PQ_COLS, pq)
+    write_csv(os.path.join(out, "PRINT_PARTS.csv"), PART_COLS, parts)
+    write_csv(os.path.join(out, "PRINT_GROUPS.csv"), GROUP_COLS, groups)
+    print(f"[bom] {len(items)} trees, {len(pq)} nodes → {len(parts)} parts, {len(groups)} material/process groups ({time.perf_counter()-t0:.3f}s) -> {out}")
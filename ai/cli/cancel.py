@@ -0,0 +1,78 @@
+import time, threading, queue
+
+# 생성 중단(타임아웃) 공통: OV streamer 콜백 / HF StoppingCriteria 가 Deadline 을 확인해 장치를 실제로 풀어줌
+# 중단은 토큰 경계에서만 가능: OV 는 streamer 콜백(토큰마다), HF 는 StoppingCriteria(스텝마다).
+# 긴 NPU prefill/컴파일, 첫 토큰 전 구간은 끊을 수 없음 → call_with_deadline 의 grace 후 abort.
+
+class Deadline:
+    def __init__(self, seconds=None, armed=True):
+        """armed=False 면 arm() 전까지 시간이 흐르지 않음(모델 lock 대기/컴파일은 제한 시간 밖)"""
+        self.seconds = float(seconds) if seconds and seconds > 0 else None
+        self.t_end = None
+        self.started = threading.Event()
+        self._ev = threading.Event()
+        self.aborted = False   # 생성 도중 중단되었으면 True
+        if armed: self.arm()
+
+    def arm(self):
+        """생성 직전(lock 획득 + 로드 후) 호출 → 여기서부터 제한 시간. 두 번째 호출은 무시"""
+        if self.started.is_set(): return
+        if self.seconds is not None: self.t_end = time.monotonic()+self.seconds
+        self.started.set()
+
+    def cancel(self): self._ev.set(); self.started.set()
+
+    def expired(self):
+        if self._ev.is_set(): return True
+        if self.t_end is not None and time.monotonic() >= self.t_end:
+            self._ev.set(); return True
+        return False
+
+    def left(self):
+        return None if self.t_end is None else max(0.0, self.t_end-time.monotonic())
+
+    def ov_streamer(self, inner=None):
+        """openvino_genai streamer 콜백: True 반환 = 생성 중지"""
+        def cb(sub):
+            if self.expired():
+                self.aborted = True; return True
+            return bool(inner(sub)) if inner else False
+        return cb
+
+    def hf_criteria(self):
+        from transformers import StoppingCriteriaList
+        return StoppingCriteriaList([DeadlineCriteria([self])])
+
+class DeadlineCriteria:
+    """HF StoppingCriteria: 배치 행마다 자기 Deadline 이 지나면 해당 행만 종료"""
+    def __init__(self, deadlines):
+        self.deadlines = deadlines
+    def __call__(self, input_ids, scores, **kw):
+        import torch
+        flags = []
+        for d in self.deadlines:
+            e = d is not None and d.expired()
+            if e: d.aborted = True
+            flags.append(e)
+        return torch.tensor(flags, dtype=torch.bool, device=input_ids.device)
+
+def call_with_deadline(fn, seconds, grace=5.0):
+    """fn(deadline) 를 데몬 스레드에서 실행. fn 은 모델 lock 을 잡고 로드가 끝난 뒤 deadline.arm() 을 호출하고,
+    제한 시간은 그때부터 잼(이전 시도가 lock 을 쥐고 있어도 대기 시간은 제한 시간에 포함되지 않음).
+    협조적 중단 후에도 grace 초 안에 안 끝나면 중지 신호(cancel)를 남기고 포기(abort) → 스레드는 다음 토큰 경계에서
+    끝나며 lock 을 놓고, 같은 모델의 다음 시도는 그 lock 을 얻은 뒤에야 arm() 하므로 사실상 이전 작업을 기다림(join).
+    -> ("ok"|"timeout"|"abort"|"error", 결과 또는 예외문자열)"""
+    dl = Deadline(seconds, armed=False); q = queue.Queue(maxsize=1)
+    def _t():
+        try: q.put(("ok", fn(dl)))
+        except Exception as e: q.put(("error", f"{type(e).__name__}: {e}"))
+        finally: dl.started.set()   # arm() 없이 끝난 경우
+    threading.Thread(target=_t, daemon=True).start()
+    dl.started.wait()   # lock 대기/컴파일: 제한 없음
+    try:
+        st, val = q.get(timeout=None if dl.t_end is None else dl.left()+grace)
+    except queue.Empty:
+        dl.cancel()
+        return "abort", None
+    if st == "ok" and dl.aborted: return "timeout", val
+    return st, val
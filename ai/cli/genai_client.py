@@ -0,0 +1,141 @@
+import os, sys, json, queue, atexit, itertools, threading, subprocess
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+# genai_run.py --serve 상주 프로세스 클라이언트.
+# 프롬프트마다 인터프리터/openvino_genai import/모델 컴파일을 반복하지 않도록 프로세스 1개를 재사용.
+
+class GenaiClient:
+    def __init__(self, py, gen, env=None):
+        self.cmd = [py, "-X", "utf8", gen, "--serve"]
+        self.env = env
+        self.proc = None
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.stderr_tail = deque(maxlen=50)
+
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self):
+        with self._lock: return self._start()
+
+    def _start(self):
+        """self._lock 안에서 호출 → 현재 프로세스(없거나 죽었으면 새로 띄움)"""
+        if self.alive(): return self.proc
+        self.proc = subprocess.Popen(self.cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                     text=True, encoding="utf-8", errors="replace", env=self.env, bufsize=1)
+        threading.Thread(target=self._read_out, args=(self.proc,), daemon=True).start()
+        threading.Thread(target=self._read_err, args=(self.proc,), daemon=True).start()
+        return self.proc
+
+    def _read_out(self, proc):
+        for ln in proc.stdout:
+            try: res = json.loads(ln)
+            except Exception: continue
+            rid = res.get("id")
+            with self._lock:
+                tgt = self._pending.get(rid)
+                if tgt is not None and "ok" in res: self._pending.pop(rid, None)
+            tgt = tgt[1] if tgt is not None and tgt[0] is proc else None
+            if isinstance(tgt, queue.Queue): tgt.put(res)        # 스트림: delta/최종 모두 전달
+            elif tgt is not None and "ok" in res: tgt.set_result(res)
+        # 프로세스 종료(stdout EOF): poll() 이 아직 None 일 수 있어 여기서 버림 → 다음 요청은 새 프로세스로.
+        # 이 프로세스에 보낸 요청만 실패 처리(이미 새 프로세스로 간 요청은 그대로)
+        try: code = proc.wait(timeout=5)
+        except subprocess.TimeoutExpired: code = None
+        with self._lock:
+            if self.proc is proc: self.proc = None
+            mine = [k for k, v in self._pending.items() if v[0] is proc]
+            pend = [self._pending.pop(k)[1] for k in mine]
+        tail = "\n".join(list(self.stderr_tail)[-5:])
+        err = {"ok": False, "error": f"genai_run server exited ({code})\n{tail}"}
+        for tgt in pend:
+            if isinstance(tgt, queue.Queue): tgt.put(err)
+            else: tgt.set_result(err)
+
+    def _read_err(self, proc):
+        for ln in proc.stderr:
+            self.stderr_tail.append(ln.rstrip("\n"))
+
+    def submit(self, model_dir, device, prompt, max_new_tokens=64, _sink=None, **extra):
+        rid = next(self._ids); fut = _sink if _sink is not None else Future()
+        req = dict(extra, id=rid, model_dir=model_dir, device=device, prompt=prompt, max_new_tokens=int(max_new_tokens))
+        with self._lock:
+            try:
+                proc = self._start()
+                self._pending[rid] = (proc, fut)
+                proc.stdin.write(json.dumps(req, ensure_ascii=False)+"\n"); proc.stdin.flush()
+            except Exception as e:
+                self._pending.pop(rid, None)
+                err = {"ok": False, "error": f"send failed: {e}"}
+                fut.put(err) if isinstance(fut, queue.Queue) else fut.set_result(err)
+        return fut
+
+    def _forget(self, sink):
+        """시간 초과/중단된 요청의 대기 항목 제거(늦게 온 응답은 버려짐)"""
+        with self._lock:
+            for rid in [k for k, v in self._pending.items() if v[1] is sink]: self._pending.pop(rid)
+
+    def generate(self, model_dir, device, prompt, max_new_tokens=64, timeout=None, **extra):
+        """-> 생성 텍스트. 실패 시 RuntimeError, timeout 초과 시 TimeoutError"""
+        fut = self.submit(model_dir, device, prompt, max_new_tokens, **extra)
+        try: res = fut.result(timeout=timeout)
+        except FutureTimeout:
+            self._forget(fut); raise
+        if not res.get("ok"): raise RuntimeError(res.get("error") or "unknown error")
+        return res.get("out", "")
+
+    def stream(self, model_dir, device, prompt, max_new_tokens=64, timeout=None, stats=None):
+        """텍스트 조각 제너레이터. 끝나면 stats(dict)에 ttft_sec 등 서버 측 측정값 기록.
+        조각 사이 timeout 초과(queue.Empty) 또는 소비 중단 시 대기 항목 제거"""
+        q = self.submit(model_dir, device, prompt, max_new_tokens, _sink=queue.Queue(), stream=True)
+        try:
+            while True:
+                res = q.get(timeout=timeout)
+                if "delta" in res: yield res["delta"]; continue
+                if not res.get("ok"): raise RuntimeError(res.get("error") or "unknown error")
+                if stats is not None: stats.update({k: v for k, v in res.items() if k not in ("id", "ok", "out")})
+                return
+        finally:
+            self._forget(q)
+
+    def close(self):
+        with self._lock:
+            proc, self.proc = self.proc, None
+        if proc is None: return
+        try:
+            proc.stdin.write(json.dumps({"cmd": "quit"})+"\n"); proc.stdin.flush()
+            proc.wait(timeout=5)
+        except Exception:
+            proc.kill()
+
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+_ENV_KEYS = ("HF_HUB_OFFLINE", "TRANSFORMERS_OFFLINE", "HF_DATASETS_OFFLINE")
+
+def get_client(py, gen, env=None, tag=""):
+    """(py, gen, 오프라인 설정, tag) 당 상주 프로세스 1개. tag 로 장치별 프로세스 분리 가능"""
+    env = dict(env if env is not None else os.environ)
+    key = (py, os.path.abspath(gen), tuple(env.get(k, "") for k in _ENV_KEYS), tag)
+    with _CLIENTS_LOCK:
+        c = _CLIENTS.get(key)
+        if c is None:
+            c = _CLIENTS[key] = GenaiClient(py, gen, env)
+    return c
+
+def close_all():
+    with _CLIENTS_LOCK:
+        cs = list(_CLIENTS.values()); _CLIENTS.clear()
+    for c in cs: c.close()
+atexit.register(close_all)
+
+def generate(py, gen, model_dir, device, prompt, max_new_tokens=64, env=None, timeout=None):
+    return get_client(py, gen, env, tag=str(device).upper()).generate(model_dir, device, prompt, max_new_tokens, timeout=timeout)
+
+if __name__ == "__main__":
+    # 간단 점검: python ai/cli/genai_client.py <model_dir> <device> <prompt>
+    here = os.path.dirname(os.path.abspath(__file__))
+    print(generate(sys.executable, os.path.join(here, "genai_run.py"), sys.argv[1], sys.argv[2], " ".join(sys.argv[3:]) or "테스트"))
+    close_all()
@@ -1,4 +1,5 @@
-﻿import argparse, os, sys
+﻿import argparse, os, sys, json, time, threading
+from concurrent.futures import ThreadPoolExecutor
 
 def load_map(p):
     d = {}
@@ -17,6 +18,50 @@ def load_map(p):
 def norm(p):
     return os.path.normpath(os.path.abspath(os.path.expanduser(os.path.expandvars(p))))
 
+def serve(workers=2):
+    """stdin/stdout JSON-lines 데몬. 파이프라인은 model_cache 에 상주.
+    req: {"id","model_dir","device","prompt","max_new_tokens","stream"?} | {"cmd":"ping"|"quit"}
+    res: {"id","ok","out","gen_sec","cold"} | {"id","ok":false,"error"}
+    stream=true 이면 최종 응답 전에 {"id","delta"} 조각을 연속 전송"""
+    from model_cache import ov_pipeline
+    from streaming import stream_ov, Timed
+    # 프로토콜 전용 fd 확보 후 fd1 은 stderr 로 돌림(네이티브 로그가 응답에 섞이지 않게)
+    proto = os.fdopen(os.dup(1), "w", encoding="utf-8", buffering=1)
+    os.dup2(2, 1); sys.stdout = sys.stderr
+    wlock = threading.Lock()
+    def send(obj):
+        with wlock:
+            proto.write(json.dumps(obj, ensure_ascii=False)+"\n"); proto.flush()
+    def handle(req):
+        rid = req.get("id")
+        try:
+            from openvino_genai import GenerationConfig
+            ent, cold = ov_pipeline(norm(req["model_dir"]), req.get("device","AUTO"))
+            cfg = GenerationConfig(max_new_tokens=int(req.get("max_new_tokens",64)))
+            t0 = time.perf_counter()
+            if req.get("stream"):
+                tg = Timed(stream_ov(ent.obj, req.get("prompt",""), cfg, lock=ent.lock)); parts = []
+                for piece in tg:
+                    parts.append(piece); send({"id":rid,"delta":piece})
+                send(dict({"id":rid,"ok":True,"out":"".join(parts),"gen_sec":round(time.perf_counter()-t0,3),"cold":cold}, **tg.stats()))
+                return
+            with ent.lock:
+                out = ent.obj.generate(req.get("prompt",""), generation_config=cfg)
+            send({"id":rid,"ok":True,"out":str(out),"gen_sec":round(time.perf_counter()-t0,3),"cold":cold})
+        except Exception as e:
+            send({"id":rid,"ok":False,"error":f"{type(e).__name__}: {e}"})
+    with ThreadPoolExecutor(max_workers=max(1,workers)) as ex:
+        for ln in sys.stdin:
+            ln = ln.strip()
+            if not ln: continue
+            try: req = json.loads(ln)
+            except Exception as e:
+                send({"id":None,"ok":False,"error":f"bad request: {e}"}); continue
+            cmd = req.get("cmd")
+            if cmd == "quit": break
+            if cmd == "ping": send({"id":req.get("id"),"ok":True,"out":"pong"}); continue
+            ex.submit(handle, req)
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--model_dir", help="직접 경로 지정")
@@ -26,8 +71,14 @@ def main():
     ap.add_argument("--max_new_tokens", type=int, default=64)
     ap.add_argument("--prompt", default="테스트")
     ap.add_argument("--list", action="store_true", help="키 목록 출력 후 종료")
+    ap.add_argument("--stream", action="store_true", help="토큰 단위 출력 + TTFT/토큰 지연을 [LOG] 로 stderr 에 기록")
+    ap.add_argument("--serve", action="store_true", help="상주 모드(stdin/stdout JSON-lines), genai_client.py 참고")
+    ap.add_argument("--serve_workers", type=int, default=2)
     a = ap.parse_args()
 
+    if a.serve:
+        serve(a.serve_workers); sys.exit(0)
+
     m = load_map(a.models_txt)
     if a.list:
         if not m:
@@ -51,6 +102,13 @@ def main():
     from openvino_genai import LLMPipeline, GenerationConfig
     pipe = LLMPipeline(model_dir, a.device)
     cfg  = GenerationConfig(max_new_tokens=a.max_new_tokens)
+    if a.stream:
+        from streaming import stream_ov, Timed
+        tg = Timed(stream_ov(pipe, a.prompt, cfg))
+        for piece in tg: print(piece, end="", flush=True)
+        print()
+        print(f"[LOG] {json.dumps(tg.stats())}", file=sys.stderr)
+        return
     out  = pipe.generate(a.prompt, generation_config=cfg)
     print(out)
 
@@ -0,0 +1,123 @@
+import time, queue, weakref, threading
+from concurrent.futures import Future
+
+# HF generate 동적 배칭: 짧은 윈도우 동안 들어온 프롬프트를 모아 left-pad 후 1회 generate.
+# 배치가 끝나면 대기열을 즉시 다시 수거(유휴 없음) → 파이썬 왕복이 아니라 연산량이 병목이 되도록.
+# 모델은 약한 참조: 모델을 다시 로드하면 close_batcher(old) 또는 old 가 해제될 때 스레드 종료 → 가중치가 남지 않음.
+# 공유 토크나이저(padding_side/pad_token)는 바꾸지 않고 왼쪽 패딩은 직접 만듦.
+
+_STOP = object()
+
+class Batcher:
+    def __init__(self, tok, model, dev, max_batch=8, window_ms=20, lock=None):
+        self.tok, self.dev = tok, dev
+        self._model = weakref.ref(model)
+        self.max_batch = max(1, int(max_batch)); self.window = max(0.0, window_ms/1000.0)
+        self.lock = lock or threading.Lock()
+        self.q = queue.Queue(); self.closed = False
+        self.pad = tok.pad_token_id if tok.pad_token_id is not None else tok.eos_token_id
+        self.stats = {"batches": 0, "prompts": 0, "max_seen": 0}
+        self.thread = threading.Thread(target=self._loop, daemon=True); self.thread.start()
+
+    @property
+    def model(self):
+        return self._model()
+
+    def close(self, wait=False):
+        """스레드 종료(대기 중인 요청은 RuntimeError). wait=True 면 진행 중 배치가 끝날 때까지 기다림"""
+        if self.closed: return
+        self.closed = True; self.q.put(_STOP)
+        if wait and threading.current_thread() is not self.thread: self.thread.join()
+
+    def submit(self, prompt, deadline=None, **gen_kw):
+        """-> Future[{"text","new_text","new_tokens","gen_sec","batch"}]
+        deadline(cancel.Deadline) 이 지나면 배치 안에서 해당 행만 생성 중단"""
+        fut = Future()
+        if self.closed: fut.set_exception(RuntimeError("batcher closed")); return fut
+        self.q.put((prompt, gen_kw, fut, deadline))
+        return fut
+
+    def generate(self, prompt, **gen_kw):
+        return self.submit(prompt, **gen_kw).result()["text"]
+
+    def _collect(self):
+        items = [self.q.get()]
+        t_end = time.monotonic() + self.window
+        while len(items) < self.max_batch and items[-1] is not _STOP:
+            left = t_end - time.monotonic()
+            try: items.append(self.q.get(timeout=left) if left > 0 else self.q.get_nowait())
+            except queue.Empty: break
+        return items
+
+    def _fail_pending(self, items):
+        err = RuntimeError("batcher closed")
+        while True:
+            for it in items:
+                if it is not _STOP and not it[2].done(): it[2].set_exception(err)
+            try: items = [self.q.get_nowait()]
+            except queue.Empty: return
+
+    def _loop(self):
+        while True:
+            items = self._collect()
+            if items[-1] is _STOP:
+                self._fail_pending(items); return
+            groups = {}
+            for it in items:  # generate 인자가 같은 것끼리만 한 배치
+                groups.setdefault(tuple(sorted(it[1].items())), []).append(it)
+            for kw, grp in groups.items():
+                try: self._run(dict(kw), grp)
+                except Exception as e:
+                    for _, _, fut, _ in grp:
+                        if not fut.done(): fut.set_exception(e)
+
+    def _run(self, gen_kw, grp):
+        import torch
+        prompts = [p for p, _, _, _ in grp]
+        dls = [d for _, _, _, d in grp]
+        if any(d is not None for d in dls):
+            from cancel import DeadlineCriteria
+            from transformers import StoppingCriteriaList
+            gen_kw = dict(gen_kw, stopping_criteria=StoppingCriteriaList([DeadlineCriteria(dls)]))
+        model = self._model()
+        if model is None: raise RuntimeError("model released")
+        pad = self.pad
+        # decoder-only 배치 생성은 왼쪽 패딩(토크나이저 설정은 건드리지 않음)
+        ids = self.tok(prompts)["input_ids"]; n_in = max(len(x) for x in ids)
+        fill = pad if pad is not None else 0
+        enc = {"input_ids": torch.tensor([[fill]*(n_in-len(x)) + x for x in ids]),
+               "attention_mask": torch.tensor([[0]*(n_in-len(x)) + [1]*len(x) for x in ids])}
+        enc = {k: v.to(self.dev) for k, v in enc.items()}
+        with self.lock, torch.inference_mode():
+            for d in dls:   # 배치 생성 시작부터 각 행의 제한 시간
+                if d is not None: d.arm()
+            t0 = time.perf_counter()
+            out = model.generate(**enc, pad_token_id=pad, **gen_kw)
+            dt = round(time.perf_counter()-t0, 3)
+        del model
+        texts = self.tok.batch_decode(out, skip_special_tokens=True)
+        news = self.tok.batch_decode(out[:, n_in:], skip_special_tokens=True)
+        self.stats["batches"] += 1; self.stats["prompts"] += len(grp)
+        self.stats["max_seen"] = max(self.stats["max_seen"], len(grp))
+        for i, (_, _, fut, _) in enumerate(grp):
+            n_new = int((out[i, n_in:] != pad).sum()) if pad is not None else int(out.shape[-1]-n_in)
+            fut.set_result({"text": texts[i], "new_text": news[i], "new_tokens": n_new, "gen_sec": dt, "batch": len(grp)})
+
+_BATCHERS = weakref.WeakKeyDictionary()   # model → Batcher (모델이 해제되면 항목도 사라짐)
+_BLOCK = threading.Lock()
+
+def get_batcher(tok, model, dev, max_batch=8, window_ms=20, lock=None):
+    """같은 모델 객체에는 배처 1개"""
+    with _BLOCK:
+        b = _BATCHERS.get(model)
+        if b is None or b.closed:
+            b = _BATCHERS[model] = Batcher(tok, model, dev, max_batch, window_ms, lock)
+            weakref.finalize(model, b.close)
+        return b
+
+def close_batcher(model, wait=True):
+    """모델 재로드/해제 전에 호출: 배처 스레드 종료 + 등록 해제"""
+    if model is None: return
+    with _BLOCK:
+        b = _BATCHERS.pop(model, None)
+    if b is not None: b.close(wait)
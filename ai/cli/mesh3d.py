@@ -0,0 +1,220 @@
+import os, json, math
+import numpy as np
+
+# 파라메트릭 메시 엔진(NumPy): 회전체(노즐 벨 윤곽/챔버/탱크/링, 벽 두께) + 냉각 채널 배열 + 박스.
+# 삼각형 = (N,3,3) float 배열, 법선은 벡터 연산, 바이너리 STL 은 구조화 dtype 1회 tobytes() 로 기록.
+# 단위 mm. 닫힌 윤곽을 회전 → 수밀(watertight) 솔리드, 법선은 바깥 방향.
+# 예) python ai/cli/mesh3d.py nozzle --params '{"throat_r":20,"exit_r":60,"length":150,"wall":3,"channels":24}' --out out.stl
+
+STL_DTYPE = np.dtype([("normal", "<f4", (3,)), ("v", "<f4", (3, 3)), ("attr", "<u2")])   # 50바이트/삼각형
+
+def _cross(tris):
+    """변 벡터 외적(성분별 연산, np.cross 보다 메모리 이동 적음) → (N,3)"""
+    e1 = tris[:, 1] - tris[:, 0]; e2 = tris[:, 2] - tris[:, 0]
+    n = np.empty_like(e1)
+    n[:, 0] = e1[:, 1]*e2[:, 2] - e1[:, 2]*e2[:, 1]
+    n[:, 1] = e1[:, 2]*e2[:, 0] - e1[:, 0]*e2[:, 2]
+    n[:, 2] = e1[:, 0]*e2[:, 1] - e1[:, 1]*e2[:, 0]
+    return n
+
+def normals(tris):
+    """(N,3,3) → 단위 법선 (N,3), 넓이 0 이면 0 벡터"""
+    n = _cross(tris)
+    ln = np.sqrt(np.einsum("ij,ij->i", n, n))[:, None]
+    return np.divide(n, ln, out=np.zeros_like(n), where=ln > 0)
+
+def to_records(tris):
+    tris = np.asarray(tris, dtype=np.float32)
+    a = np.zeros(len(tris), dtype=STL_DTYPE)
+    a["v"] = tris; a["normal"] = normals(tris)
+    return a
+
+def write_stl(path, tris, name="mesh3d"):
+    """바이너리 STL: 80바이트 헤더 + 개수(uint32) + 구조화 배열 1회 기록 → 삼각형 수"""
+    a = to_records(tris)
+    d = os.path.dirname(os.path.abspath(path)); os.makedirs(d, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(name.encode("ascii", "replace")[:80].ljust(80, b"\0"))
+        f.write(np.uint32(len(a)).tobytes()); f.write(a.tobytes())
+    return len(a)
+
+def grid_faces(n, m, wrap_i=False, wrap_j=True):
+    """n×m 격자 정점 번호(i*m+j) → 사각형마다 삼각형 2개의 정점 번호 (F,3). i: 윤곽/경로, j: 둘레"""
+    i = np.arange(n if wrap_i else n - 1)[:, None]; j = np.arange(m if wrap_j else m - 1)[None, :]
+    i1 = (i + 1) % n; j1 = (j + 1) % m
+    a = i*m + j; b = i1*m + j; c = i1*m + j1; d = i*m + j1
+    return np.stack([np.stack([a, b, c], -1), np.stack([a, c, d], -1)], 2).reshape(-1, 3)
+
+def grid_tris(P, wrap_i=False, wrap_j=True):
+    """격자 점 P (n,m,3) → 삼각형 (F,3,3)"""
+    n, m = P.shape[:2]
+    return P.reshape(-1, 3)[grid_faces(n, m, wrap_i, wrap_j)]
+
+def revolve(rz, segments=128):
+    """닫힌 윤곽 [(r,z)] 을 z 축 회전 → 바깥 법선 삼각형 (float32). 윤곽 방향은 자동 보정"""
+    rz = np.asarray(rz, dtype=np.float64)
+    r, z = rz[:, 0], rz[:, 1]
+    if np.dot(r, np.roll(z, -1)) - np.dot(np.roll(r, -1), z) > 0: r, z = r[::-1], z[::-1]   # 신발끈 공식 부호(시계 방향으로 맞춤)
+    a = np.linspace(0.0, 2*np.pi, segments, endpoint=False)
+    P = np.empty((len(r), segments, 3), dtype=np.float32)
+    P[..., 0] = r[:, None]*np.cos(a); P[..., 1] = r[:, None]*np.sin(a); P[..., 2] = z[:, None]
+    f = grid_faces(len(r), segments, wrap_i=True, wrap_j=True)
+    # 축 위(r=0) 정점은 둘레 번호 0 으로 합친 뒤 번호가 겹치는(넓이 0) 삼각형 제거
+    on_axis = np.repeat(r <= 1e-12, segments)
+    f = np.where(on_axis[f], (f // segments) * segments, f)
+    f = f[(f[:, 0] != f[:, 1]) & (f[:, 1] != f[:, 2]) & (f[:, 0] != f[:, 2])]
+    return P.reshape(-1, 3)[f]
+
+def rotate_copies(tris, count, axis_offset=0.0):
+    """z 축 둘레 count 개 등간격 복제 (count,N,3,3) → (count*N,3,3)"""
+    a = axis_offset + np.arange(count) * 2*np.pi / count
+    c, s = np.cos(a), np.sin(a)
+    R = np.zeros((count, 3, 3)); R[:, 0, 0] = c; R[:, 0, 1] = -s; R[:, 1, 0] = s; R[:, 1, 1] = c; R[:, 2, 2] = 1
+    return np.einsum("kab,nvb->knva", R, tris).astype(np.float32).reshape(-1, 3, 3)
+
+# ----- 윤곽 -----
+def bell_contour(throat_r, exit_r, length, inlet_r=None, conv_len=None, theta_n=30.0, theta_e=8.0, n=64):
+    """노즐 내면 (r,z): 수축부(원뿔) + 목 + 확대부 벨(2차 베지어, 목 각 theta_n → 출구 각 theta_e). z=0 이 목"""
+    inlet_r = inlet_r or throat_r*2.0; conv_len = conv_len or (inlet_r - throat_r)*1.5
+    zc = np.linspace(-conv_len, 0.0, max(n//4, 2))
+    rc = throat_r + (inlet_r - throat_r) * (zc/-conv_len)**2   # 목에서 기울기 0 인 포물선 수축
+    tn, te = np.radians(theta_n), np.radians(theta_e)
+    p0 = np.array([throat_r, 0.0]); p2 = np.array([exit_r, length])
+    # 두 접선의 교점 = 베지어 제어점 (r = throat + z tan tn, r = exit - (L - z) tan te)
+    zq = (exit_r - throat_r - length*np.tan(te)) / (np.tan(tn) - np.tan(te))
+    zq = float(np.clip(zq, 0.05*length, 0.95*length))
+    p1 = np.array([throat_r + zq*np.tan(tn), zq])
+    t = np.linspace(0.0, 1.0, n)[1:, None]
+    bell = (1-t)**2*p0 + 2*(1-t)*t*p1 + t**2*p2
+    return np.vstack([np.stack([rc, zc], 1), bell])
+
+def line_normals(line):
+    """(r,z) 선의 점별 단위 법선 = 진행 방향의 오른쪽(z 증가 방향 선이면 +r 쪽)"""
+    d = np.gradient(np.asarray(line, dtype=np.float64), axis=0); d /= np.linalg.norm(d, axis=1, keepdims=True)
+    return np.stack([d[:, 1], -d[:, 0]], 1)
+
+def offset_line(line, dist):
+    return np.asarray(line, dtype=np.float64) + dist * line_normals(line)
+
+def shell_profile(inner, wall):
+    """내면 윤곽(열린 선, r>0) → 두께 wall 의 닫힌 단면(내면 + 법선 방향 외면 역순)"""
+    return np.vstack([inner, offset_line(inner, wall)[::-1]])
+
+# ----- 형상 -----
+def box(x=10.0, y=10.0, z=10.0, size=None, **_):
+    """원점 중심 직육면체 12삼각형 (size 주면 정육면체)"""
+    if size: x = y = z = size
+    v = np.array([[-1,-1,-1],[1,-1,-1],[1,1,-1],[-1,1,-1],[-1,-1,1],[1,-1,1],[1,1,1],[-1,1,1]], dtype=np.float64) * (np.array([x, y, z])/2)
+    f = np.array([[0,2,1],[0,3,2],[4,5,6],[4,6,7],[0,1,5],[0,5,4],[2,3,7],[2,7,6],[1,2,6],[1,6,5],[0,4,7],[0,7,3]])
+    return v[f].astype(np.float32)
+
+def channel_array(path_rz, count, width, depth, segments_offset=0.0):
+    """벽 안 냉각 채널: 경로 (r,z) 를 따라 폭 width(둘레) × 깊이 depth(법선) 사각 단면 스윕, 둘레 count 개 복제.
+    면은 안쪽을 향함(부호 부피 < 0) → 벽 메시와 합치면 빈 공간(cavity)"""
+    path = np.asarray(path_rz, dtype=np.float64); nrm = line_normals(path)
+    c = np.stack([path[:, 0], np.zeros(len(path)), path[:, 1]], 1)
+    nv = np.stack([nrm[:, 0], np.zeros(len(path)), nrm[:, 1]], 1)
+    y = np.array([0.0, 1.0, 0.0])
+    corners = [(-1, -1), (1, -1), (1, 1), (-1, 1)]
+    P = np.stack([c + sn*depth/2*nv + sy*width/2*y for sn, sy in corners], 1)   # (n,4,3)
+    side = grid_tris(P, wrap_i=False, wrap_j=True)
+    cap0 = P[0][[[0, 1, 2], [0, 2, 3]]]; cap1 = P[-1][[[0, 2, 1], [0, 3, 2]]]
+    one = np.concatenate([side, cap0, cap1])
+    if _signed_volume(one) > 0: one = one[:, ::-1]
+    return rotate_copies(one, count, segments_offset)
+
+def _signed_volume(tris):
+    t = np.asarray(tris, dtype=np.float64)
+    return float(np.einsum("ij,ij->i", t[:, 0], np.cross(t[:, 1], t[:, 2])).sum() / 6.0)
+
+def nozzle(throat_r=20.0, exit_r=60.0, length=150.0, wall=3.0, inlet_r=None, conv_len=None,
+           channels=0, channel_w=None, channel_d=None, n=64, segments=128, **_):
+    """벨 노즐 셸(+ 냉각 채널: 벽 중앙 경로의 빈 공간, 벽/둘레를 넘지 않게 폭·깊이 제한)"""
+    inner = bell_contour(throat_r, exit_r, length, inlet_r, conv_len, n=n)
+    tris = revolve(shell_profile(inner, wall), segments)
+    if channels:
+        mid = offset_line(inner, wall/2)
+        pitch = 2*np.pi*mid[:, 0].min()/channels   # 가장 좁은 둘레에서 채널 간격
+        w = min(channel_w or pitch*0.5, pitch*0.8); d = min(channel_d or wall*0.5, wall*0.8)
+        tris = np.concatenate([tris, channel_array(mid, int(channels), w, d, np.pi/channels)])
+    return tris
+
+def chamber(radius=40.0, length=120.0, wall=4.0, throat_r=None, conv_len=None, n=48, segments=128, **_):
+    """연소실: 원통 + 목까지 수축부(throat_r 있으면) 셸, 분사기 쪽(z=length) 평판으로 닫힘"""
+    z_top = length
+    if throat_r:
+        conv_len = conv_len or (radius - throat_r)*1.5
+        zc = np.linspace(0.0, conv_len, max(n//2, 2))
+        rc = throat_r + (radius - throat_r) * (zc/conv_len)**2
+        inner = np.vstack([np.stack([rc, zc], 1), [[radius, z_top]]])
+    else:
+        inner = np.array([[radius, 0.0], [radius, z_top]])
+    outer = offset_line(inner, wall)
+    # 내면(아래→위) → 축 위 상판 안쪽 → 상판 바깥 → 외면(위→아래)
+    prof = np.vstack([inner, [[0.0, z_top]], [[0.0, z_top+wall]], [[outer[-1, 0], z_top+wall]], outer[::-1]])
+    return revolve(prof, segments)
+
+def tank(radius=50.0, length=200.0, wall=2.0, n=32, segments=128, **_):
+    """캡슐형 탱크(원통 + 반구 두 개), 두께 wall 의 속 빈 솔리드. length = 원통부 길이"""
+    h = length/2
+    a = np.linspace(-np.pi/2, np.pi/2, n)
+    def capsule(R):
+        lo = np.stack([R*np.cos(a[:n//2]), -h + R*np.sin(a[:n//2])], 1)   # 아래 반구(극 → 적도)
+        hi = np.stack([R*np.cos(a[n//2:]), h + R*np.sin(a[n//2:])], 1)    # 위 반구(적도 → 극)
+        return np.vstack([[[0.0, -h-R]], lo[1:], [[R, -h]], [[R, h]], hi[:-1], [[0.0, h+R]]])
+    return revolve(np.vstack([capsule(radius+wall), capsule(radius)[::-1]]), segments)
+
+def ring(r_in=30.0, r_out=40.0, height=5.0, segments=128, **_):
+    """링/플랜지/개스킷: 사각 단면 회전"""
+    return revolve([(r_in, 0.0), (r_out, 0.0), (r_out, height), (r_in, height)], segments)
+
+SHAPES = {"nozzle": nozzle, "chamber": chamber, "tank": tank, "ring": ring, "box": box}
+KEYWORDS = {  # part_tree 노드 name/process → 형상
+    "nozzle": ("nozzle", "노즐", "bell", "벨"), "chamber": ("chamber", "챔버", "연소실", "combustor"),
+    "tank": ("tank", "탱크", "vessel", "용기"), "ring": ("ring", "링", "flange", "플랜지", "gasket", "개스킷", "seal", "씰"),
+}
+
+def shape_of(node):
+    """노드 → 형상 이름(geometry.shape 우선, 없으면 이름 키워드, 기본 box)"""
+    g = node.get("geometry") or node.get("params") or {}
+    if isinstance(g, dict) and g.get("shape") in SHAPES: return g["shape"]
+    s = f"{node.get('name','')} {node.get('process','')}".lower()
+    for k, kws in KEYWORDS.items():
+        if any(w in s for w in kws): return k
+    return "box"
+
+COUNT_LIMITS = {"n": (4, 1024), "segments": (8, 1024), "channels": (0, 512)}   # 정수 파라미터 범위
+
+def params_of(node):
+    """노드 geometry/params → 형상 인자. LLM 출력이라 유한한 양수 치수만 쓰고(나머지는 기본값), 개수는 COUNT_LIMITS 로 자름"""
+    g = node.get("geometry") or node.get("params") or {}
+    out = {}
+    for k, v in (g.items() if isinstance(g, dict) else ()):
+        if k == "shape": continue
+        try: x = float(v)
+        except (TypeError, ValueError): continue
+        if not math.isfinite(x): continue
+        if k in COUNT_LIMITS:
+            lo, hi = COUNT_LIMITS[k]; out[k] = float(min(max(int(x), lo), hi))
+        elif x > 0: out[k] = x
+    return out
+
+def mesh_node(node, segments=128):
+    """part_tree 노드 → (형상 이름, 삼각형 배열)"""
+    shape = shape_of(node); p = params_of(node)
+    p.setdefault("segments", segments)
+    for k in ("n", "channels", "segments"):
+        if k in p: p[k] = int(p[k])
+    return shape, SHAPES[shape](**p)
+
+if __name__ == "__main__":
+    import argparse, time
+    ap = argparse.ArgumentParser()
+    ap.add_argument("shape", choices=sorted(SHAPES))
+    ap.add_argument("--params", default="{}", help='JSON, 예 {"throat_r":20,"exit_r":60,"wall":3}')
+    ap.add_argument("--out", required=True)
+    a = ap.parse_args()
+    t0 = time.perf_counter()
+    tris = SHAPES[a.shape](**json.loads(a.params))
+    n = write_stl(a.out, tris, a.shape)
+    print(f"[mesh3d] {a.shape}: {n} triangles ({time.perf_counter()-t0:.3f}s) -> {a.out}")
@@ -0,0 +1,110 @@
+import os, time, json, hashlib, threading
+from collections import OrderedDict
+
+# 프로세스 전역 파이프라인 레지스트리: (model_dir, device, cfg_hash) -> 컴파일된 객체
+# LRU 축출 = 개수(max_items) 또는 메모리 예산(max_mb, 모델 디렉터리 용량 기준 추정)
+
+def cfg_hash(cfg):
+    s = json.dumps(cfg or {}, sort_keys=True, default=str)
+    return hashlib.sha1(s.encode("utf-8")).hexdigest()[:12]
+
+def dir_mb(p):
+    tot = 0
+    try:
+        for root, _, files in os.walk(p):
+            for fn in files:
+                if fn.endswith((".bin", ".safetensors", ".blob")):
+                    try: tot += os.path.getsize(os.path.join(root, fn))
+                    except OSError: pass
+    except Exception: pass
+    return tot / 2**20
+
+class Entry:
+    def __init__(self, key, obj, size_mb, load_sec):
+        self.key = key; self.obj = obj; self.size_mb = size_mb; self.load_sec = load_sec
+        self.lock = threading.Lock()   # 같은 파이프라인 동시 generate 방지
+        self.hits = 0
+
+class Registry:
+    def __init__(self, max_items=2, max_mb=0):
+        self.max_items = max_items; self.max_mb = max_mb
+        self._d = OrderedDict(); self._lock = threading.Lock(); self._loading = {}
+
+    def configure(self, max_items=None, max_mb=None):
+        with self._lock:
+            if max_items is not None: self.max_items = max(1, int(max_items))
+            if max_mb is not None: self.max_mb = max(0.0, float(max_mb))
+            self._evict()
+
+    def _evict(self, keep=None):
+        while self._d:
+            over_n  = len(self._d) > self.max_items
+            over_mb = self.max_mb and sum(e.size_mb for e in self._d.values()) > self.max_mb
+            if not (over_n or over_mb): break
+            k = next(iter(self._d))
+            if k == keep and len(self._d) == 1: break
+            if k == keep: self._d.move_to_end(k); continue
+            self._d.pop(k)
+
+    def get(self, key, loader, size_mb=0.0):
+        """-> (Entry, cold). cold=True 이면 이번 호출에서 로드/컴파일함"""
+        with self._lock:
+            e = self._d.get(key)
+            if e is not None:
+                self._d.move_to_end(key); e.hits += 1
+                return e, False
+            kl = self._loading.setdefault(key, threading.Lock())
+        with kl:  # 같은 키 중복 컴파일 방지
+            with self._lock:
+                e = self._d.get(key)
+                if e is not None:
+                    self._d.move_to_end(key); e.hits += 1
+                    return e, False
+            t0 = time.perf_counter()
+            obj = loader()
+            e = Entry(key, obj, size_mb, round(time.perf_counter()-t0, 3))
+            with self._lock:
+                self._d[key] = e
+                self._loading.pop(key, None)
+                self._evict(keep=key)
+            return e, True
+
+    def clear(self):
+        with self._lock: self._d.clear()
+
+    def stats(self):
+        with self._lock:
+            return [{"key": list(k), "size_mb": round(e.size_mb, 1), "load_sec": e.load_sec, "hits": e.hits} for k, e in self._d.items()]
+
+PIPES = Registry(max_items=int(os.getenv("OV_PIPE_CACHE_MAX", "2")), max_mb=float(os.getenv("OV_PIPE_CACHE_MB", "0")))
+
+def ov_pipeline(model_dir, device, prefix_cache=False, **props):
+    """openvino_genai.LLMPipeline 을 레지스트리에서 꺼내거나 새로 컴파일.
+    prefix_cache=True → SchedulerConfig(enable_prefix_caching) 로 공통 접두부 KV 재사용(CPU/GPU)"""
+    mdir = os.path.normpath(os.path.abspath(model_dir))
+    key = (mdir, str(device).upper(), cfg_hash(dict(props, prefix_cache=bool(prefix_cache))))
+    def _load():
+        from openvino_genai import LLMPipeline
+        kw = dict(props)
+        if prefix_cache:
+            from openvino_genai import SchedulerConfig
+            sc = SchedulerConfig(); sc.enable_prefix_caching = True
+            kw["scheduler_config"] = sc
+        return LLMPipeline(mdir, device, **kw)
+    return PIPES.get(key, _load, size_mb=dir_mb(mdir))
+
+# HF 모델/토크나이저: 워커 수와 무관하게 (repo, device, dtype) 당 1벌만 상주
+HF_MODELS = Registry(max_items=int(os.getenv("HF_MODEL_CACHE_MAX", "1")))
+
+def hf_model(repo, device, dtype=None, **kw):
+    """-> (Entry(obj=(tok, model, dev)), cold)"""
+    key = (str(repo), str(device), str(dtype or ""), cfg_hash(kw))
+    def _load():
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+        tok = AutoTokenizer.from_pretrained(repo, trust_remote_code=True, **kw)
+        model = AutoModelForCausalLM.from_pretrained(repo, trust_remote_code=True, torch_dtype=dtype, **kw).eval()
+        model.to(device)
+        if tok.pad_token_id is None and tok.eos_token_id is not None:
+            tok.pad_token_id = tok.eos_token_id
+        return tok, model, device
+    return HF_MODELS.get(key, _load, size_mb=dir_mb(repo) if os.path.isdir(str(repo)) else 0.0)
@@ -0,0 +1,207 @@
+import os, sys, json, time, shutil, hashlib, fnmatch
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from genai_run import load_map
+
+# configs/models.txt(키 = 로컬 경로) + configs/model_repos.txt(키 = repo id) → 모델 폴더 병렬 다운로드/검증.
+# 폴더마다 model_manifest.json {repo, allow, complete, files:{rel: {size, sha256, mtime_ns}}, damaged:[rel]}:
+#   크기/mtime 이 기록과 같으면 검증된 파일로 보고 건너뜀 → 전부 검증되면 네트워크 조회 없이 끝.
+#   --verify 는 오프라인으로 sha256 재계산, 깨진 파일은 manifest 에서 빼서 다음 pull 때 다시 받음.
+# 소스: HubSource(huggingface_hub) 또는 LocalSource(<dir>/<repo id>/..., 테스트/사내 미러용)
+# 예) python ai/cli/model_store.py --workers 6
+#     python ai/cli/model_store.py phi4mini --verify
+
+MANIFEST = "model_manifest.json"
+ALLOW = [
+  "openvino_model.xml","openvino_model.bin",
+  "openvino_tokenizer.xml","openvino_tokenizer.bin",
+  "openvino_detokenizer.xml","openvino_detokenizer.bin",
+  "tokenizer.json","tokenizer.model","*tokenizer*.json",
+  "vocab.json","merges.txt","generation_config.json","config.json"
+]
+CHUNK = 1 << 20
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for b in iter(lambda: f.read(CHUNK), b""): h.update(b)
+    return h.hexdigest()
+
+def allowed(rel, allow):
+    return any(fnmatch.fnmatch(rel, p) or fnmatch.fnmatch(rel.rsplit("/", 1)[-1], p) for p in allow)
+
+class HubSource:
+    """Hugging Face Hub. sha256 은 LFS 파일만 제공(나머지는 None → 받은 뒤 계산)"""
+    def __init__(self, revision=None, token=None):
+        from huggingface_hub import HfApi
+        self.api = HfApi(token=token); self.revision = revision; self.token = token
+    def list_files(self, repo):
+        info = self.api.model_info(repo, revision=self.revision, files_metadata=True)
+        return {s.rfilename: (s.size, s.lfs.sha256 if s.lfs else None) for s in info.siblings}
+    def fetch(self, repo, rel, dest_dir):
+        from huggingface_hub import hf_hub_download
+        return hf_hub_download(repo_id=repo, filename=rel, local_dir=str(dest_dir), revision=self.revision, token=self.token)
+
+class LocalSource:
+    """<root>/<repo id>/<파일> 를 허브처럼 사용(sha256 미제공)"""
+    def __init__(self, root):
+        self.root = Path(root)
+    def list_files(self, repo):
+        base = self.root/repo
+        if not base.is_dir(): raise FileNotFoundError(f"repo 없음: {base}")
+        return {p.relative_to(base).as_posix(): (p.stat().st_size, None) for p in base.rglob("*") if p.is_file()}
+    def fetch(self, repo, rel, dest_dir):
+        dest = Path(dest_dir)/rel; dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dest.with_name(dest.name + ".part")
+        shutil.copyfile(self.root/repo/rel, tmp); os.replace(tmp, dest)
+        return str(dest)
+
+def load_manifest(model_dir):
+    try:
+        with open(Path(model_dir)/MANIFEST, encoding="utf-8") as f: return json.load(f)
+    except (OSError, ValueError):
+        return {"files": {}}
+
+def save_manifest(model_dir, man):
+    p = Path(model_dir)/MANIFEST; p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(".json.tmp")
+    with tmp.open("w", encoding="utf-8") as f: json.dump(man, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, p)
+
+def _entry(path, sha=None):
+    st = os.stat(path)
+    return {"size": st.st_size, "sha256": sha or sha256_file(path), "mtime_ns": st.st_mtime_ns}
+
+def _fresh(model_dir, rel, ent):
+    """manifest 기록과 크기/mtime 이 같으면 검증된 파일(해시 재계산 없음)"""
+    try: st = os.stat(Path(model_dir)/rel)
+    except OSError: return False
+    return bool(ent) and st.st_size == ent.get("size") and st.st_mtime_ns == ent.get("mtime_ns")
+
+def models(models_txt="configs/models.txt", repos_txt="configs/model_repos.txt", keys=None):
+    """-> [(key, repo id, 로컬 폴더)] (repo 가 없는 키는 건너뜀)"""
+    dirs, repos = load_map(models_txt), load_map(repos_txt)
+    return [(k, repos[k], dirs[k]) for k in (keys or dirs) if k in dirs and k in repos]
+
+def _pull_file(src, repo, model_dir, rel, size, sha):
+    path = src.fetch(repo, rel, model_dir)
+    ent = _entry(path)
+    if size is not None and ent["size"] != size: raise IOError(f"{rel}: 크기 불일치 {ent['size']} != {size}")
+    if sha and ent["sha256"] != sha: raise IOError(f"{rel}: sha256 불일치")
+    return ent
+
+def _adopt(model_dir, rel, size, sha):
+    """manifest 없이 이미 받아 둔 파일(예전 snapshot_download) → 크기/해시가 맞으면 그대로 등록"""
+    p = Path(model_dir)/rel
+    if not p.is_file() or (size is not None and p.stat().st_size != size): return None
+    ent = _entry(p)
+    return ent if not sha or ent["sha256"] == sha else None
+
+def pull(items, src, allow=ALLOW, workers=4, refresh=False, log=print):
+    """items: [(key, repo, 폴더)] → {key: {fetched, skipped, bytes, error?}}. 파일 단위 병렬(저장소 간 공유 풀)"""
+    stats = {k: {"fetched": 0, "skipped": 0, "bytes": 0} for k, _, _ in items}
+    mans = {k: load_manifest(d) for k, _, d in items}
+    todo = []
+    for k, repo, d in items:
+        man = mans[k]
+        if (not refresh and man.get("complete") and man.get("repo") == repo and man.get("allow") == list(allow)
+                and all(_fresh(d, rel, e) for rel, e in man["files"].items())):
+            stats[k]["skipped"] = len(man["files"]); log(f"## {k}: 검증됨({len(man['files'])} files), 네트워크 생략"); continue
+        todo.append((k, repo, d))
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        # 1) 원격 목록(저장소별 병렬)
+        lists = {ex.submit(src.list_files, repo): (k, repo, d) for k, repo, d in todo}
+        jobs = {}
+        for fu in as_completed(lists):
+            k, repo, d = lists[fu]
+            try: remote = {r: v for r, v in fu.result().items() if allowed(r, allow)}
+            except Exception as e:
+                stats[k]["error"] = f"{type(e).__name__}: {e}"; log(f"## {k}: 목록 실패 {stats[k]['error']}"); continue
+            man = mans[k]
+            if man.get("repo") != repo: man["files"] = {}
+            man.update({"repo": repo, "allow": list(allow), "complete": False})
+            man["files"] = {r: e for r, e in man["files"].items() if r in remote}
+            damaged = set(man.get("damaged", []))
+            log(f"## pull {repo} -> {d} ({len(remote)} files)")
+            for rel, (size, sha) in remote.items():
+                ent = man["files"].get(rel)
+                if _fresh(d, rel, ent) and (size is None or ent["size"] == size) and (not sha or ent["sha256"] == sha):
+                    stats[k]["skipped"] += 1; continue
+                if rel in damaged:   # --verify 에서 깨진 파일 → 무조건 다시 받음
+                    jobs[ex.submit(_pull_file, src, repo, d, rel, size, sha)] = ("fetch", k, repo, d, rel, size, sha); continue
+                # 기록이 있으면(mtime 만 바뀐 경우) 기록된 해시로 확인
+                jobs[ex.submit(_adopt, d, rel, size, sha or (ent or {}).get("sha256"))] = ("adopt", k, repo, d, rel, size, sha)
+        # 2) 파일 다운로드(+ 기존 파일 등록 시도), 끝날 때마다 manifest 저장 → 중단돼도 이어받기
+        while jobs:
+            fu = next(as_completed(jobs)); kind, k, repo, d, rel, size, sha = jobs.pop(fu)
+            try: ent = fu.result()
+            except Exception as e:
+                stats[k]["error"] = f"{rel}: {type(e).__name__}: {e}"; log(f"## {k}: {stats[k]['error']}"); continue
+            if ent is None:
+                jobs[ex.submit(_pull_file, src, repo, d, rel, size, sha)] = ("fetch", k, repo, d, rel, size, sha); continue
+            mans[k]["files"][rel] = ent
+            if rel in mans[k].get("damaged", []): mans[k]["damaged"].remove(rel)
+            save_manifest(d, mans[k])
+            if kind == "fetch": stats[k]["fetched"] += 1; stats[k]["bytes"] += ent["size"]
+            else: stats[k]["skipped"] += 1
+    for k, repo, d in todo:
+        if "error" not in stats[k]:
+            mans[k]["complete"] = True; save_manifest(d, mans[k])
+    return stats
+
+def verify(items, workers=4, log=print):
+    """오프라인 sha256 재검사 → {key: {ok, damaged:[...], missing:[...], unverified?}}. 깨진 항목은 manifest 에서 제거"""
+    out = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        for k, repo, d in items:
+            man = load_manifest(d); files = man.get("files", {})
+            if not files:
+                out[k] = {"ok": 0, "damaged": [], "missing": [], "unverified": True}; log(f"## {k}: manifest 없음 ({d})"); continue
+            def check(rel, e, d=d):
+                p = Path(d)/rel
+                if not p.is_file(): return "missing"
+                return "ok" if p.stat().st_size == e["size"] and sha256_file(p) == e["sha256"] else "damaged"
+            res = dict(zip(files, ex.map(lambda kv: check(*kv), list(files.items()))))
+            bad = [r for r, v in res.items() if v != "ok"]
+            out[k] = {"ok": len(res)-len(bad), "damaged": [r for r in bad if res[r] == "damaged"], "missing": [r for r in bad if res[r] == "missing"]}
+            if bad:
+                for r in bad: files.pop(r)
+                man["damaged"] = sorted(set(man.get("damaged", [])) | set(bad))
+                man["complete"] = False; save_manifest(d, man)
+            else:
+                # 해시가 맞으면 mtime 만 바뀐 파일도 다시 검증된 상태로
+                for rel in files: files[rel]["mtime_ns"] = os.stat(Path(d)/rel).st_mtime_ns
+                save_manifest(d, man)
+            log(f"## {k}: ok={out[k]['ok']} damaged={out[k]['damaged']} missing={out[k]['missing']}")
+    return out
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser()
+    ap.add_argument("keys", nargs="*", help="configs/models.txt 키(생략 시 repo 가 지정된 전부)")
+    ap.add_argument("--models_txt", default="configs/models.txt")
+    ap.add_argument("--repos_txt", default="configs/model_repos.txt", help="키 = HF repo id")
+    ap.add_argument("--source", default="hub", help="hub 또는 로컬 미러 폴더(<dir>/<repo id>/...)")
+    ap.add_argument("--revision", default=None)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--allow", nargs="*", default=None, help="받을 파일 패턴(기본 OpenVINO IR + 토크나이저/설정)")
+    ap.add_argument("--refresh", action="store_true", help="검증된 모델도 원격 목록을 다시 확인")
+    ap.add_argument("--verify", action="store_true", help="오프라인 검사만(다운로드 안 함)")
+    a = ap.parse_args(argv)
+    items = models(a.models_txt, a.repos_txt, a.keys)
+    if not items:
+        print(f"[model_store] 대상 없음: {a.models_txt} / {a.repos_txt} 키 확인"); return 2
+    t0 = time.perf_counter()
+    if a.verify:
+        res = verify(items, a.workers)
+        bad = any(r["damaged"] or r["missing"] or r.get("unverified") for r in res.values())
+    else:
+        src = HubSource(a.revision) if a.source == "hub" else LocalSource(a.source)
+        res = pull(items, src, a.allow or ALLOW, a.workers, a.refresh)
+        bad = any("error" in r for r in res.values())
+    print(f"[model_store] {json.dumps(res, ensure_ascii=False)} ({time.perf_counter()-t0:.2f}s)")
+    print("FAIL" if bad else "OK")
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
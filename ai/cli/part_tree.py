@@ -0,0 +1,142 @@
+import os, re, json, math
+from concurrent.futures import ProcessPoolExecutor
+
+# part_tree 추출/검증 공용 모듈.
+# 지원 형식: ```part_tree {..}```  /  ```json\npart_tree: {..}```(batch_dual_v3.sanitize 주입)  /  {"part_tree": {..}}
+# 정규식 .*? 대신 "part_tree" 위치에서 괄호 짝 맞추기 스캐너로 JSON 끝을 찾음(문자열/이스케이프 인식, 선형 시간).
+
+NODE_KEYS = ("id","name","qty","material","process","children")
+_SPECIAL = re.compile(r'[{}"\\]')   # 스캐너가 멈출 문자만(역추적 없음)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+def match_brace(text, start):
+    """text[start] == '{' 에서 짝이 맞는 '}' 다음 위치. 닫히지 않으면 -1"""
+    depth = 0; in_str = False; esc = -2   # esc = 문자열 안 마지막 역슬래시 위치
+    for m in _SPECIAL.finditer(text, start):
+        c = m.group(); i = m.start()
+        if in_str:
+            if i == esc+1: esc = -2          # 바로 앞이 역슬래시 → 이스케이프된 문자
+            elif c == "\\": esc = i
+            elif c == '"': in_str = False
+            continue
+        if c == '"': in_str = True
+        elif c == "{": depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0: return m.end()
+    return -1
+
+def _after_label(text, i):
+    """'part_tree' 다음 구분자(따옴표, :, =, 공백) 건너뛰고 '{' 위치, 없으면 -1"""
+    n = len(text)
+    while i < n and text[i] in ' \t\r\n"\':=': i += 1
+    return i if i < n and text[i] == "{" else -1
+
+def _loads(s):
+    try: return json.loads(s)
+    except RecursionError: return None
+    except ValueError:
+        try: return json.loads(_TRAILING_COMMA.sub(r"\1", s))   # LLM 이 흔히 남기는 끝 쉼표
+        except (ValueError, RecursionError): return None
+
+def find_all(text):
+    """본문의 모든 part_tree 객체(dict) 목록, 등장 순서"""
+    text = text or ""; low = text.lower(); out = []; i = 0
+    while True:
+        i = low.find("part_tree", i)
+        if i < 0: return out
+        j = _after_label(text, i+9)
+        if j < 0: i += 9; continue
+        k = match_brace(text, j)
+        if k < 0: i += 9; continue   # 잘린 출력
+        obj = _loads(text[j:k])
+        if isinstance(obj, dict):
+            out.append(obj.get("part_tree") if isinstance(obj.get("part_tree"), dict) else obj)
+        i = k
+
+def _qty(v):
+    if isinstance(v, bool): raise ValueError
+    q = float(v)
+    if not (q > 0 and math.isfinite(q)): raise ValueError   # 0/음수/NaN/inf(1e999) 거부
+    return int(q) if q == int(q) else q
+
+def validate(tree):
+    """노드 스키마(id, name, qty, material, process, children) 검사 + 정규화(반복 순회, 재귀 없음)
+    -> (정규화된 트리, 오류 목록 ["root.children[1].qty: ..."])"""
+    if not isinstance(tree, dict): return None, ["root: not an object"]
+    errs = []; ids = set()
+    root = {}
+    stack = [(tree, root, "root", "")]
+    while stack:
+        src, dst, path, parent_id = stack.pop()
+        dst.update({k: v for k, v in src.items() if k not in NODE_KEYS})
+        nid = src.get("id")
+        if nid in (None, ""):
+            nid = f"{parent_id}.{path.rsplit('[',1)[-1].rstrip(']')}" if parent_id else "root"
+            errs.append(f"{path}.id: missing → {nid}")
+        nid = str(nid)
+        if nid in ids: errs.append(f"{path}.id: duplicate '{nid}'")
+        ids.add(nid); dst["id"] = nid
+        for k in ("name","material","process"):
+            v = src.get(k, "")
+            if not isinstance(v, str):
+                errs.append(f"{path}.{k}: not a string"); v = "" if v is None else str(v)
+            dst[k] = v
+        try: dst["qty"] = _qty(src.get("qty", 1))
+        except (TypeError, ValueError):
+            errs.append(f"{path}.qty: invalid {src.get('qty')!r} → 1"); dst["qty"] = 1
+        kids = src.get("children") or []
+        if not isinstance(kids, list):
+            errs.append(f"{path}.children: not a list"); kids = []
+        dst["children"] = []
+        for n, ch in enumerate(kids):
+            if not isinstance(ch, dict):
+                errs.append(f"{path}.children[{n}]: not an object"); continue
+            nd = {}; dst["children"].append(nd)
+            stack.append((ch, nd, f"{path}.children[{n}]", nid))
+    return root, errs
+
+def parse(text):
+    """-> {"tree": 정규화 트리 또는 None, "errors": [...], "found": 찾은 part_tree 수}. 첫 번째 트리 사용"""
+    trees = find_all(text)
+    if not trees: return {"tree": None, "errors": [], "found": 0}
+    tree, errs = validate(trees[0])
+    return {"tree": tree, "errors": errs, "found": len(trees)}
+
+def extract(text):
+    """첫 part_tree (정규화) 또는 None"""
+    return parse(text)["tree"]
+
+# ----- 배치 -----
+def parse_many(texts, workers=0, chunksize=16):
+    """여러 본문 → parse 결과 목록(순서 유지). workers>1 이면 프로세스 풀"""
+    texts = list(texts)
+    if workers and workers > 1 and len(texts) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            return list(ex.map(parse, texts, chunksize=chunksize))
+    return [parse(t) for t in texts]
+
+def session_texts(path):
+    """run.jsonl(v3: ov/hf.out, blueprint UI: npu/xpu) → (번호, topic, src, 본문)"""
+    with open(path, encoding="utf-8-sig") as f:
+        for n, ln in enumerate(f, 1):
+            try: r = json.loads(ln)
+            except ValueError: continue
+            for src in ("ov","hf","npu","xpu"):
+                v = r.get(src)
+                txt = v.get("out") if isinstance(v, dict) else v
+                if isinstance(txt, str) and txt: yield r.get("idx", n), r.get("topic",""), src, txt
+
+def parse_session(path, workers=0):
+    """세션 run.jsonl 전체 → [{idx, topic, src, tree, errors, found}]"""
+    meta = list(session_texts(path))
+    res = parse_many([m[3] for m in meta], workers=workers)
+    return [dict(r, idx=m[0], topic=m[1], src=m[2]) for m, r in zip(meta, res)]
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 2: sys.exit("usage: python ai/cli/part_tree.py <run.jsonl>")
+    rs = parse_session(sys.argv[1], workers=os.cpu_count() or 1)
+    for r in rs:
+        print(f"{r['idx']}\t{r['src']}\t{'tree' if r['tree'] else '-'}\t{len(r['errors'])} err\t{r['topic'][:60]}")
+    print(f"[part_tree] {sum(1 for r in rs if r['tree'])}/{len(rs)} outputs with a tree")
@@ -0,0 +1,62 @@
+import os, copy, time, threading, weakref
+
+# 공통 프롬프트 접두부(sys 템플릿, WRAP_BASE 등)의 KV 캐시를 1회 prefill 후 재사용.
+# 매 생성은 접두부 이후(토픽 부분)만 prefill → 절약한 prefill 시간을 기록.
+# HF 단일 프롬프트 경로 전용(left-pad 배치는 위치가 달라 재사용 불가).
+
+class _Prefix:
+    def __init__(self, ids, pkv, sec):
+        self.ids = ids; self.pkv = pkv; self.sec = sec; self.n = int(ids.shape[-1])
+
+_CACHE = weakref.WeakKeyDictionary()   # model -> {prefix_text: _Prefix}. id(model) 는 모델 재로드 후 재사용될 수 있어 약참조로 묶음
+_LOCK = threading.Lock()
+
+def common_prefix(*texts):
+    return os.path.commonprefix(list(texts))
+
+def template_prefix(render):
+    """render(토픽) -> 프롬프트. 서로 다른 두 토픽의 공통 접두 문자열 = 재사용 가능한 접두부"""
+    return common_prefix(render("\x00A"), render("\x01B"))
+
+def get_prefix(tok, model, dev, prefix_text, lock=None):
+    import torch
+    with _LOCK:
+        ent = _CACHE.get(model, {}).get(prefix_text)
+    if ent is not None: return ent
+    ids = tok(prefix_text, return_tensors="pt")["input_ids"].to(dev)
+    ctx = lock if lock is not None else threading.Lock()
+    with ctx, torch.inference_mode():
+        t0 = time.perf_counter()
+        out = model(input_ids=ids, use_cache=True)
+        sec = time.perf_counter()-t0
+    ent = _Prefix(ids, out.past_key_values, sec)
+    with _LOCK:
+        _CACHE.setdefault(model, {})[prefix_text] = ent
+    return ent
+
+def prepare(tok, model, dev, prompt, prefix_text, lock=None):
+    """-> (generate kwargs, info). 접두부가 맞지 않으면 캐시 없이 일반 입력 반환"""
+    import torch
+    enc = tok(prompt, return_tensors="pt").to(dev)
+    info = {"prefix_tokens": 0, "prefill_saved_sec": 0.0}
+    if not prefix_text: return dict(enc), info
+    try:
+        ent = get_prefix(tok, model, dev, prefix_text, lock=lock)
+    except Exception:
+        return dict(enc), info
+    ids = enc["input_ids"][0]
+    n = min(ent.n, int(ids.shape[-1])-1)   # generate 는 최소 1토큰은 새로 넣어야 함
+    if n <= 0: return dict(enc), info
+    # 토큰 경계가 접두 문자열 끝에서 달라질 수 있어 실제 일치 길이만큼만 사용
+    same = (ent.ids[0, :n] == ids[:n]).to(torch.int64)
+    m = int(same.cumprod(0).sum())
+    if m <= 0: return dict(enc), info
+    pkv = copy.deepcopy(ent.pkv)   # generate 가 캐시를 덧붙이므로 복사본 사용
+    if m < ent.n:
+        if not hasattr(pkv, "crop"): return dict(enc), info
+        pkv.crop(m)
+    info.update(prefix_tokens=m, prefill_saved_sec=round(ent.sec*m/ent.n, 4))
+    return dict(enc, past_key_values=pkv), info
+
+def clear():
+    with _LOCK: _CACHE.clear()
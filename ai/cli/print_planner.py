@@ -0,0 +1,139 @@
+import re, csv, json, math, time
+from pathlib import Path
+from bom import write_csv
+
+# PRINT_QUEUE + 메시 bbox → 빌드 플레이트 배치 + 층 수/빌드 시간 추정.
+# material/process 그룹마다 인스턴스(eff_qty 올림)를 바닥 면적 큰 순으로 선반(shelf) 배치(FFDH, XY 90° 회전 허용),
+# 분말 소결(SLS/MJF)은 선반 층을 Z 로 쌓아 한 빌드에 여러 단(3D), 나머지는 플레이트 1장 = 빌드 1회.
+# 예) python ai/cli/print_planner.py save/sessions/<session> --build_vol "400×400×450 mm" --layer_um 40
+
+PLAN_COLS = ["job","level","material","process","key","name","x","y","z","w","d","h","rotated"]
+JOB_COLS = ["job","material","process","levels","parts","height_mm","layers","volume_cm3","hours"]
+NEST_3D = ("sls", "mjf", "multi jet", "powder bed fusion - polymer")
+# 공정별 (층당 리코팅 초, 조형 속도 cm³/h) — 대략값, --recoat_s/--rate_cm3h 로 덮어씀
+PROC_RATES = {"slm": (9.0, 12.0), "dmls": (9.0, 12.0), "lpbf": (9.0, 12.0), "ebm": (12.0, 60.0),
+              "sls": (10.0, 120.0), "mjf": (8.0, 300.0), "fdm": (2.0, 15.0), "fff": (2.0, 15.0),
+              "sla": (6.0, 40.0), "dlp": (4.0, 80.0), "binder": (10.0, 400.0)}
+DEFAULT_RATE = (8.0, 20.0)
+_UNITS = {"mm": 1.0, "cm": 10.0, "m": 1000.0, "in": 25.4, "inch": 25.4}
+
+def parse_build_vol(s):
+    """"400×400×450 mm" / "250x250x300" / "25 x 25 x 30 cm" → (x, y, z) mm"""
+    nums = [float(x) for x in re.findall(r"\d+(?:\.\d+)?", str(s))]
+    if len(nums) < 3: raise ValueError(f"build_vol: 숫자 3개 필요 ({s!r})")
+    unit = re.search(r"(mm|cm|inch|in|m)\b", str(s).lower())
+    k = _UNITS[unit.group(1)] if unit else 1.0
+    return tuple(v*k for v in nums[:3])
+
+def rates(process, recoat_s=None, rate_cm3h=None):
+    p = str(process).lower()
+    base = next((v for k, v in PROC_RATES.items() if k in p), DEFAULT_RATE)
+    return (recoat_s if recoat_s is not None else base[0], rate_cm3h if rate_cm3h is not None else base[1])
+
+def _norm(s):
+    return " ".join(str(s).split()).lower()
+
+def load_parts(session_root, default_size=50.0):
+    """세션 → 부품 목록 [{key, name, material, process, qty, size:(w,d,h), volume(mm³)}]
+    meshes/manifest.json 이 있으면 leaf + 메시 bbox/부피, 없으면 PRINT_QUEUE 전 행을 default_size 정육면체로"""
+    root = Path(session_root)
+    try:
+        with (root/"meshes"/"manifest.json").open(encoding="utf-8") as f: man = json.load(f)
+    except (OSError, ValueError): man = None
+    parts = []
+    if man:
+        for p in man["parts"]:
+            m = man["meshes"].get(p["hash"], {}); bb = m.get("bbox")
+            size = tuple(hi-lo for lo, hi in zip(*bb)) if bb else (default_size,)*3
+            parts.append({"key": p["key"], "name": p["name"], "material": p["material"], "process": p["process"],
+                          "qty": p["eff_qty"], "size": size, "volume": m.get("volume")})
+        return parts
+    with open(root/"blueprints"/"PRINT_QUEUE.csv", encoding="utf-8", newline="") as f:
+        for r in csv.DictReader(f):
+            parts.append({"key": f"{r['path']}#{r['id']}", "name": r["name"], "material": r["material"], "process": r["process"],
+                          "qty": r["eff_qty"], "size": (default_size,)*3, "volume": None})
+    return parts
+
+def _orient(size, vol):
+    """빌드 부피 안에 들어가는 자세(원래 Z 우선, 다음은 높이가 낮은 순) → (w, d, h, rotated) 또는 None"""
+    w, d, h = size
+    cands = [(w, d, h), (d, w, h)] + sorted([(w, h, d), (h, w, d), (d, h, w), (h, d, w)], key=lambda s: s[2])
+    for i, (a, b, c) in enumerate(cands):
+        if a <= vol[0] and b <= vol[1] and c <= vol[2]: return a, b, c, i > 0
+    return None
+
+def shelf_pack(items, plate, gap=5.0):
+    """items: [(w, d, h, payload)] → 플레이트(단) 목록 [{h, parts:[(x, y, w, d, h, payload)]}]. FFDH: 깊이 큰 순, 선반마다 왼쪽부터"""
+    W, D = plate; levels = []
+    for w, d, h, pl in sorted(items, key=lambda t: (-t[1], -t[0])):
+        placed = False
+        for lv in levels:
+            for sh in lv["shelves"]:
+                if d <= sh["d"] and sh["x"] + w <= W:
+                    lv["parts"].append((sh["x"], sh["y"], w, d, h, pl)); sh["x"] += w + gap; lv["h"] = max(lv["h"], h)
+                    placed = True; break
+            if not placed and lv["y"] + d <= D:
+                sh = {"y": lv["y"], "d": d, "x": w + gap}; lv["shelves"].append(sh); lv["y"] += d + gap
+                lv["parts"].append((0.0, sh["y"], w, d, h, pl)); lv["h"] = max(lv["h"], h); placed = True
+            if placed: break
+        if not placed:
+            levels.append({"shelves": [{"y": 0.0, "d": d, "x": w + gap}], "y": d + gap, "h": h, "parts": [(0.0, 0.0, w, d, h, pl)]})
+    return [{"h": lv["h"], "parts": lv["parts"]} for lv in levels]
+
+def plan(parts, build_vol=(400.0, 400.0, 450.0), layer_um=40.0, gap=5.0, recoat_s=None, rate_cm3h=None):
+    """-> {"jobs": [...JOB_COLS], "placements": [...PLAN_COLS], "oversize": [...]}"""
+    groups = {}; oversize = []
+    for p in parts:
+        o = _orient(p["size"], build_vol)
+        if o is None: oversize.append({"key": p["key"], "name": p["name"], "size": [round(x, 2) for x in p["size"]]}); continue
+        n = max(1, math.ceil(float(p["qty"] or 1) - 1e-9))
+        g = groups.setdefault((_norm(p["material"]), _norm(p["process"])), {"material": p["material"], "process": p["process"], "items": []})
+        g["items"] += [(o[0], o[1], o[2], (p, o[3]))] * n
+    jobs, rows = [], []
+    for (_, proc), g in sorted(groups.items()):
+        levels = shelf_pack(g["items"], build_vol[:2], gap)
+        # 3D 적층 공정은 단을 Z 로 쌓음(단 사이 gap), 나머지는 단 1개 = 빌드 1회
+        builds = []
+        if any(k in proc for k in NEST_3D):
+            for lv in sorted(levels, key=lambda l: -l["h"]):
+                b = next((b for b in builds if b["z"] + lv["h"] <= build_vol[2]), None)
+                if b is None: b = {"z": 0.0, "levels": []}; builds.append(b)
+                b["levels"].append((b["z"], lv)); b["z"] += lv["h"] + gap
+        else:
+            builds = [{"z": lv["h"], "levels": [(0.0, lv)]} for lv in levels]
+        rc, rate = rates(g["process"], recoat_s, rate_cm3h)
+        for b in builds:
+            job = len(jobs) + 1; vol = 0.0; n = 0; height = 0.0
+            for li, (z0, lv) in enumerate(b["levels"], 1):
+                for x, y, w, d, h, (p, rot) in lv["parts"]:
+                    rows.append([job, li, g["material"], g["process"], p["key"], p["name"], round(x, 2), round(y, 2), round(z0, 2),
+                                 round(w, 2), round(d, 2), round(h, 2), int(rot)])
+                    vol += p["volume"] if p["volume"] else w*d*h*0.3   # 메시 부피 없으면 bbox 30%
+                    n += 1; height = max(height, z0 + h)
+            layers = math.ceil(height*1000.0/layer_um)
+            hours = layers*rc/3600.0 + vol/1000.0/rate
+            jobs.append([job, g["material"], g["process"], len(b["levels"]), n, round(height, 2), layers, round(vol/1000.0, 2), round(hours, 2)])
+    return {"jobs": jobs, "placements": rows, "oversize": oversize}
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser()
+    ap.add_argument("session", help="세션 폴더(blueprints/PRINT_QUEUE.csv, 있으면 meshes/manifest.json)")
+    ap.add_argument("--build_vol", default="400×400×450 mm")
+    ap.add_argument("--layer_um", type=float, default=40.0)
+    ap.add_argument("--gap", type=float, default=5.0, help="부품 간격(mm)")
+    ap.add_argument("--default_size", type=float, default=50.0, help="메시가 없을 때 부품 크기(mm)")
+    ap.add_argument("--recoat_s", type=float, default=None); ap.add_argument("--rate_cm3h", type=float, default=None)
+    a = ap.parse_args()
+    t0 = time.perf_counter()
+    res = plan(load_parts(a.session, a.default_size), parse_build_vol(a.build_vol), a.layer_um, a.gap, a.recoat_s, a.rate_cm3h)
+    out = Path(a.session)/"blueprints"; out.mkdir(parents=True, exist_ok=True)
+    write_csv(out/"PRINT_PLAN.csv", PLAN_COLS, res["placements"])
+    write_csv(out/"PRINT_JOBS.csv", JOB_COLS, res["jobs"])
+    with open(out/"print_plan.json", "w", encoding="utf-8") as f:
+        json.dump({"build_vol": a.build_vol, "layer_um": a.layer_um, "jobs": [dict(zip(JOB_COLS, j)) for j in res["jobs"]],
+                   "oversize": res["oversize"]}, f, ensure_ascii=False, indent=1)
+    for j in res["jobs"]:
+        print(f"job {j[0]}: {j[1]}/{j[2]}  {j[4]} parts, {j[3]} level(s), {j[5]} mm, {j[6]} layers, ~{j[8]} h")
+    if res["oversize"]: print(f"[plan] oversize (빌드 부피 초과): {len(res['oversize'])}")
+    print(f"[plan] {len(res['placements'])} placements → {len(res['jobs'])} jobs ({time.perf_counter()-t0:.3f}s) -> {out}")
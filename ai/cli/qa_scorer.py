@@ -0,0 +1,118 @@
+import os, re, json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# 공용 QA 채점: 섹션/part_tree/중복 헤더/숫자/지시문 흔적을 정규식 1개(이름 있는 그룹 alternation)로 한 번에 스캔.
+# batch_dual_v3.qa_score, tools/validate_outputs.py, blueprint_batch_ui.score_block 이 공유.
+
+NEED_SECTIONS = [
+ "Design Brief","Part Tree","Interfaces","Geometry","Manufacturing",
+ "Test Plan","Top 5 risks","Verification plan","Verification results","Final"
+]
+INSTR_HINTS = [
+    "You are a propulsion","당신은 추진","Add a 'BLUEPRINT'","Add a 'PROPOSAL'",
+    "Format: Section headings","Constraints:"
+]
+
+HINT_RE = re.compile("|".join(map(re.escape, INSTR_HINTS)))   # 줄 단위 지시문 제거용
+
+_NUM = r"\d+(?:\.\d+)?"
+_num_re = re.compile(_NUM)
+# 섹션·part_tree 는 대소문자 무시, 지시문 흔적은 원문 그대로(?-i:), 숫자/펜스/이중공백은 위치 겹침 없음
+_PARTS = [(f"s{i}", re.escape(k)) for i, k in enumerate(NEED_SECTIONS)] + \
+         [(f"h{i}", f"(?-i:{re.escape(h)})") for i, h in enumerate(INSTR_HINTS)] + \
+         [("pt", "part_tree"), ("fence", "```"), ("num", _NUM), ("sp", "  "), ("bench", "벤치")]
+SCAN_RE = re.compile("|".join(f"(?P<{g}>{p})" for g, p in _PARTS), re.I)
+# 섹션 이름 안의 숫자(Top 5 risks)는 alternation 에 먹히므로 따로 더함
+_SEC_NUMS = {f"s{i}": len(_num_re.findall(k)) for i, k in enumerate(NEED_SECTIONS)}
+
+def scan(txt):
+    """1회 스캔 → 카운트 dict"""
+    txt = txt if isinstance(txt, str) else str(txt or "")
+    found = set(); c = {"design_brief": 0, "part_tree": 0, "part_tree_ci": 0, "fences": 0, "numbers": 0,
+                        "hints": set(), "double_spaces": 0, "test_plan_cs": False, "bench": False}
+    for m in SCAN_RE.finditer(txt):
+        g = m.lastgroup
+        if g == "num": c["numbers"] += 1
+        elif g in _SEC_NUMS:
+            found.add(g); c["numbers"] += _SEC_NUMS[g]
+            if g == "s0": c["design_brief"] += 1
+            elif g == "s5" and m.group() == "Test Plan": c["test_plan_cs"] = True
+        elif g == "pt":
+            c["part_tree_ci"] += 1
+            if m.group() == "part_tree": c["part_tree"] += 1
+        elif g == "fence": c["fences"] += 1
+        elif g == "sp": c["double_spaces"] += 1
+        elif g == "bench": c["bench"] = True
+        else: c["hints"].add(g)
+    c["sections"] = len(found); c["hints"] = len(c["hints"]); c["chars"] = len(txt)
+    return c
+
+def qa_score(txt, c=None):
+    """-> {pass, sections, part_tree, dedup, design_brief, numbers, num_density(숫자/1k자)}"""
+    c = c or scan(txt)
+    has_pt = c["fences"] > 0 and c["part_tree"] > 0
+    dedup = c["design_brief"] <= 2
+    return {"pass": c["sections"] >= 8 and has_pt and dedup, "sections": c["sections"], "part_tree": has_pt, "dedup": dedup,
+            "design_brief": c["design_brief"], "numbers": c["numbers"],
+            "num_density": round(c["numbers"]*1000.0/c["chars"], 2) if c["chars"] else 0.0}
+
+def block_score(txt, c=None):
+    """blueprint_batch_ui 점수: 숫자 +1, part_tree +3, Test Plan/벤치 +1, 지시문 흔적 -2, 이중공백 -0.2"""
+    if not txt: return 0.0
+    c = c or scan(txt)
+    s  = c["numbers"] * 1.0
+    s += 3.0 if c["part_tree_ci"] else 0.0
+    s += 1.0 if (c["test_plan_cs"] or c["bench"]) else 0.0
+    s -= 2.0 * c["hints"]
+    s -= 0.2 * c["double_spaces"]
+    return round(s, 2)
+
+# ----- run.jsonl 배치 채점 -----
+def score_record(r):
+    """-> {topic, ov, hf, all}. all = ov+hf 출력 합본(validate_outputs 기준)"""
+    ov = (r.get("ov") or {}).get("out", "") or ""; hf = (r.get("hf") or {}).get("out", "") or ""
+    return {"topic": r.get("topic", ""), "ov": qa_score(ov), "hf": qa_score(hf), "all": qa_score(ov+"\n"+hf)}
+
+def score_lines(lines, start=1):
+    """start = 첫 줄 번호(1부터). 읽을 수 없는 줄은 {topic:"", error, line}"""
+    out = []
+    for i, ln in enumerate(lines, start):
+        if not ln.strip(): continue
+        try: r = json.loads(ln)
+        except ValueError as e: out.append({"topic": "", "error": f"bad json: {e}", "line": i}); continue
+        if not isinstance(r, dict): out.append({"topic": "", "error": f"not an object: {type(r).__name__}", "line": i}); continue
+        out.append(score_record(r))
+    return out
+
+def iter_chunks(path, chunk=256):
+    """-> (첫 줄 번호, 줄 목록)"""
+    buf = []; start = 1
+    with open(path, encoding="utf-8-sig") as f:
+        for n, ln in enumerate(f, 1):
+            buf.append(ln)
+            if len(buf) >= chunk: yield start, buf; buf = []; start = n+1
+    if buf: yield start, buf
+
+def score_run(path, workers=None, chunk=256, ex=None):
+    """run.jsonl 전체를 청크 단위로 프로세스 풀에서 채점, 입력 순서대로 yield. workers<=1 이면 현재 프로세스.
+    ex: 여러 파일에 같은 풀을 재사용할 때 전달"""
+    if ex is None:
+        if workers is None: workers = os.cpu_count() or 1
+        if workers <= 1:
+            for st, ch in iter_chunks(path, chunk): yield from score_lines(ch, st)
+            return
+        with ProcessPoolExecutor(max_workers=workers) as own:
+            yield from score_run(path, workers, chunk, ex=own)
+        return
+    depth = 2*(workers or getattr(ex, "_max_workers", None) or os.cpu_count() or 1)
+    pend = deque()   # 진행 중 청크 수 제한 → 파일 전체를 메모리에 올리지 않음
+    for st, ch in iter_chunks(path, chunk):
+        pend.append(ex.submit(score_lines, ch, st))
+        if len(pend) >= depth: yield from pend.popleft().result()
+    while pend: yield from pend.popleft().result()
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 2: sys.exit("usage: python ai/cli/qa_scorer.py <run.jsonl>")
+    for r in score_run(sys.argv[1]): print(json.dumps(r, ensure_ascii=False))
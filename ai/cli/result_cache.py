@@ -0,0 +1,49 @@
+import os, json, time, hashlib, threading
+from pathlib import Path
+
+# 콘텐츠 주소 결과 캐시: key = sha256(모델키, 장치, sys/usr 템플릿 해시, 토픽, 생성 파라미터)
+# 저장: <root>/objects/<k[:2]>/<k>.json  +  <root>/index.jsonl (key, ts, meta 한 줄씩 append)
+
+def text_hash(s):
+    return hashlib.sha256((s or "").encode("utf-8")).hexdigest()
+
+def make_key(**parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+class ResultCache:
+    def __init__(self, root="save/cache/results"):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._keys = None
+
+    def _obj(self, key):
+        return self.root/"objects"/key[:2]/f"{key}.json"
+
+    def keys(self):
+        """index.jsonl 기준 키 집합(1회 로드 후 메모리 유지)"""
+        with self._lock:
+            if self._keys is None:
+                self._keys = set()
+                ip = self.root/"index.jsonl"
+                if ip.exists():
+                    with ip.open(encoding="utf-8") as f:
+                        for ln in f:
+                            try: self._keys.add(json.loads(ln)["key"])
+                            except Exception: pass
+            return self._keys
+
+    def get(self, key):
+        if key not in self.keys(): return None
+        try:
+            with self._obj(key).open(encoding="utf-8") as f: return json.load(f)
+        except (OSError, ValueError): return None
+
+    def put(self, key, value, meta=None):
+        p = self._obj(key); p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with tmp.open("w", encoding="utf-8") as f: json.dump(value, f, ensure_ascii=False)
+        os.replace(tmp, p)
+        with self._lock:
+            with (self.root/"index.jsonl").open("a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, "ts": time.strftime("%Y-%m-%dT%H:%M:%S"), "meta": meta or {}}, ensure_ascii=False)+"\n")
+            if self._keys is not None: self._keys.add(key)
@@ -0,0 +1,153 @@
+import os, json, glob, time, sqlite3, threading
+from pathlib import Path
+from contextlib import contextmanager
+
+# save/sessions 카탈로그(SQLite): 세션별 run.jsonl 의 레코드 메타 + 바이트 오프셋.
+# 스캔은 증분(마지막으로 읽은 오프셋 이후 완결된 줄만) → 뷰어는 전체 파싱 없이 seek 로 레코드 1개만 읽음.
+# 예) python ai/cli/session_index.py --topic Rocket --ov_pass 0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions(
+  path TEXT PRIMARY KEY, name TEXT, kind TEXT, size INTEGER, mtime REAL, scanned_to INTEGER, n INTEGER);
+CREATE TABLE IF NOT EXISTS records(
+  session TEXT, idx INTEGER, off INTEGER, len INTEGER, ts TEXT, topic TEXT,
+  ov_key TEXT, ov_device TEXT, hf_key TEXT, hf_device TEXT,
+  ov_pass INTEGER, hf_pass INTEGER, elapsed REAL, PRIMARY KEY(session, idx));
+CREATE INDEX IF NOT EXISTS rec_topic ON records(topic);
+CREATE INDEX IF NOT EXISTS rec_qa ON records(ov_pass, hf_pass);
+"""
+
+def _key(p):
+    return Path(p).resolve().as_posix()
+
+def _kind(name):
+    # <stamp>_dual_batch_v3 → dual_batch_v3
+    parts = name.split("_", 2)
+    return parts[2] if len(parts) == 3 and parts[0].isdigit() else name
+
+def _meta(r):
+    ov = r.get("ov") or {}; hf = r.get("hf") or {}; qa = r.get("qa") or {}
+    b = lambda q: None if not isinstance(q, dict) or "pass" not in q else int(bool(q["pass"]))
+    return (r.get("ts"), r.get("topic"), ov.get("key"), ov.get("device"), hf.get("key"), hf.get("device"),
+            b(qa.get("ov")), b(qa.get("hf")), r.get("elapsed_sec"))
+
+class SessionIndex:
+    def __init__(self, db="save/sessions/index.sqlite", root="save/sessions"):
+        self.db = str(db); self.root = str(root); self._lock = threading.Lock()
+        Path(self.db).parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as c: c.executescript(SCHEMA)
+
+    @contextmanager
+    def _conn(self):
+        c = sqlite3.connect(self.db, timeout=30)
+        try:
+            with c: yield c   # 성공 시 commit
+        finally: c.close()
+
+    # ----- 스캔 -----
+    def scan_file(self, path):
+        """run.jsonl 1개 증분 색인 → 새로 추가된 레코드 수"""
+        key = _key(path)
+        try: st = os.stat(key)
+        except OSError: return 0
+        with self._lock, self._conn() as c:
+            row = c.execute("SELECT size, mtime, scanned_to, n FROM sessions WHERE path=?", (key,)).fetchone()
+            size0, mtime0, start, n = row if row else (None, None, 0, 0)
+            if row and size0 == st.st_size and mtime0 == st.st_mtime: return 0
+            with open(key, "rb") as f:
+                if start and not self._still_valid(c, f, key, n, start, st.st_size):
+                    c.execute("DELETE FROM records WHERE session=?", (key,)); start, n = 0, 0
+                f.seek(start); off = start; rows = []
+                for ln in f:
+                    if not ln.endswith(b"\n"): break   # 아직 쓰는 중인 마지막 줄
+                    try: r = json.loads(ln)
+                    except ValueError: r = None
+                    if isinstance(r, dict):
+                        rows.append((key, n, off, len(ln)) + _meta(r)); n += 1
+                    off += len(ln)
+            c.executemany("INSERT OR REPLACE INTO records VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)", rows)
+            name = Path(key).parent.name
+            c.execute("INSERT OR REPLACE INTO sessions VALUES (?,?,?,?,?,?,?)", (key, name, _kind(name), st.st_size, st.st_mtime, off, n))
+            return len(rows)
+
+    def _still_valid(self, c, f, key, n, start, size):
+        """파일이 줄었거나(재작성) 마지막 색인 레코드 자리가 달라졌으면 False → 처음부터 재색인"""
+        if size < start: return False
+        last = c.execute("SELECT off, len FROM records WHERE session=? ORDER BY idx DESC LIMIT 1", (key,)).fetchone()
+        if not last: return n == 0
+        f.seek(last[0]); ln = f.read(last[1])
+        try: return ln.endswith(b"\n") and isinstance(json.loads(ln), dict)
+        except ValueError: return False
+
+    def scan(self, pattern="*/run.jsonl"):
+        """root 아래 모든 run.jsonl 증분 색인, 사라진 세션은 제거 → 새 레코드 수"""
+        files = {_key(p) for p in glob.glob(os.path.join(self.root, pattern))}
+        added = sum(self.scan_file(p) for p in sorted(files))
+        with self._lock, self._conn() as c:
+            root = _key(self.root)
+            for (p,) in c.execute("SELECT path FROM sessions").fetchall():
+                if p.startswith(root) and p not in files and not os.path.exists(p):
+                    c.execute("DELETE FROM records WHERE session=?", (p,)); c.execute("DELETE FROM sessions WHERE path=?", (p,))
+        return added
+
+    # ----- 조회 -----
+    def latest(self, kind="dual_batch_v3", rescan=True):
+        if rescan: self.scan()
+        with self._conn() as c:
+            row = c.execute("SELECT path FROM sessions WHERE kind=? ORDER BY mtime DESC LIMIT 1", (kind,)).fetchone()
+        return row[0] if row else ""
+
+    def sessions(self, kind=None):
+        q = "SELECT path, name, kind, n, mtime FROM sessions" + (" WHERE kind=?" if kind else "") + " ORDER BY mtime DESC"
+        with self._conn() as c:
+            return [dict(zip(("path","name","kind","n","mtime"), r)) for r in c.execute(q, (kind,) if kind else ())]
+
+    def count(self, path):
+        with self._conn() as c:
+            row = c.execute("SELECT n FROM sessions WHERE path=?", (_key(path),)).fetchone()
+        return row[0] if row else 0
+
+    def rows(self, path, offset=0, limit=-1):
+        """레코드 메타(출력 본문 제외), idx 순"""
+        with self._conn() as c:
+            cur = c.execute("SELECT idx, topic, elapsed, ov_pass, hf_pass FROM records WHERE session=? ORDER BY idx LIMIT ? OFFSET ?",
+                            (_key(path), limit, offset))
+            return [dict(zip(("idx","topic","elapsed","ov_pass","hf_pass"), r)) for r in cur]
+
+    def read(self, path, idx):
+        """idx(0부터) 레코드 1개를 오프셋으로 바로 읽음. 색인에 없으면 None"""
+        key = _key(path)
+        with self._conn() as c:
+            row = c.execute("SELECT off, len FROM records WHERE session=? AND idx=?", (key, int(idx))).fetchone()
+        if not row: return None
+        with open(key, "rb") as f:
+            f.seek(row[0]); return json.loads(f.read(row[1]))
+
+    def query(self, topic=None, session=None, ov_pass=None, hf_pass=None, ov_key=None, hf_key=None, limit=200):
+        """세션 전체에서 필터(topic/session 은 부분 일치) → [{session, idx, topic, ...}]"""
+        w, a = [], []
+        if topic:   w.append("r.topic LIKE ?"); a.append(f"%{topic}%")
+        if session: w.append("s.name LIKE ?"); a.append(f"%{session}%")
+        for col, v in (("r.ov_pass", ov_pass), ("r.hf_pass", hf_pass), ("r.ov_key", ov_key), ("r.hf_key", hf_key)):
+            if v is not None and v != "": w.append(f"{col}=?"); a.append(v)
+        q = ("SELECT r.session, s.name, r.idx, r.ts, r.topic, r.ov_key, r.hf_key, r.ov_pass, r.hf_pass, r.elapsed "
+             "FROM records r JOIN sessions s ON s.path=r.session" + (" WHERE " + " AND ".join(w) if w else "") +
+             " ORDER BY s.mtime DESC, r.idx LIMIT ?")
+        with self._conn() as c:
+            cols = ("session","name","idx","ts","topic","ov_key","hf_key","ov_pass","hf_pass","elapsed")
+            return [dict(zip(cols, r)) for r in c.execute(q, a+[int(limit)])]
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--root", default="save/sessions")
+    ap.add_argument("--db", default="")
+    ap.add_argument("--topic"); ap.add_argument("--session")
+    ap.add_argument("--ov_pass", type=int); ap.add_argument("--hf_pass", type=int)
+    ap.add_argument("--limit", type=int, default=50)
+    a = ap.parse_args()
+    ix = SessionIndex(a.db or os.path.join(a.root, "index.sqlite"), a.root)
+    t0 = time.perf_counter(); n = ix.scan()
+    print(f"[index] +{n} records, {len(ix.sessions())} sessions ({time.perf_counter()-t0:.2f}s)")
+    for r in ix.query(a.topic, a.session, a.ov_pass, a.hf_pass, limit=a.limit):
+        print(f"{r['name']}#{r['idx']+1}  ov={r['ov_pass']} hf={r['hf_pass']}  {r['elapsed']}s  {r['topic']}")
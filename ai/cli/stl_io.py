@@ -0,0 +1,200 @@
+import os, re, json, hashlib, shutil
+from pathlib import Path
+import numpy as np
+from mesh3d import STL_DTYPE, write_stl
+
+# STL 읽기/검사/수리. 바이너리 STL 은 np.memmap(구조화 dtype, 복사 없음), ASCII 는 메모리로 파싱.
+# 검사(벡터 연산): 삼각형 수, 찌그러진 면, bbox, 부피/면적, 열린 변(수밀), 비다양체 변, 뒤집힌 면(방향 불일치).
+# 수리: 정점 용접 → 찌그러진/중복 면 제거 → 구멍 메우기(경계 루프 팬) → 전체 방향(부피>0) → 법선 재계산.
+# 수리 결과는 입력 내용 해시로 캐시(save/cache/stl_repair) → 같은 메시는 한 번만 수리, 이미 깨끗하면 원본 그대로.
+# 예) python ai/cli/stl_io.py check data/geometry   /   python ai/cli/stl_io.py repair in.stl --out_dir fixed
+
+REPAIR_VERSION = "1"
+_NUM = re.compile(rb"vertex\s+(\S+)\s+(\S+)\s+(\S+)")
+
+def read_stl(path, mmap=True):
+    """-> (헤더 80바이트, 구조화 배열 STL_DTYPE). 바이너리는 memmap(읽기 전용), ASCII 는 normal=0 으로 변환"""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        head = f.read(84)
+    if size >= 84:
+        n = int(np.frombuffer(head, "<u4", 1, 80)[0])
+        if size == 84 + n*STL_DTYPE.itemsize:   # "solid" 로 시작하는 바이너리도 있어 크기로 판정
+            if n == 0: return head[:80], np.zeros(0, STL_DTYPE)
+            if mmap: return head[:80], np.memmap(path, dtype=STL_DTYPE, mode="r", offset=84, shape=(n,))
+            return head[:80], np.fromfile(path, dtype=STL_DTYPE, count=n, offset=84)
+    with open(path, "rb") as f:
+        v = np.array(_NUM.findall(f.read()), dtype=np.float32).reshape(-1, 3, 3)
+    a = np.zeros(len(v), STL_DTYPE); a["v"] = v
+    return head[:80], a
+
+def triangles(path, mmap=True):
+    """(N,3,3) float32 정점 (memmap 필드 뷰, 복사 없음)"""
+    return read_stl(path, mmap)[1]["v"]
+
+def _factorize(keys):
+    """int64 키 → (그룹 번호, 그룹 수)"""
+    uniq, inv = np.unique(keys, return_inverse=True)
+    return inv.reshape(-1), len(uniq)
+
+def _first(codes, n):
+    """그룹마다 처음 등장한 위치(중복 인덱스 대입 순서는 보장되지 않음 → minimum.at)"""
+    f = np.full(n, len(codes), dtype=np.int64); np.minimum.at(f, codes, np.arange(len(codes)))
+    return f
+
+def weld(tris, tol=1e-5):
+    """같은 위치(tol 격자) 정점 합치기 -> (정점 (V,3) float64, 면 (F,3) 정점 번호)"""
+    v = np.asarray(tris, dtype=np.float64).reshape(-1, 3)
+    q = np.round(v / tol).astype(np.int64); q -= q.min(0)
+    # 2단계 정확 키: (x, y) → 번호, (번호, z) → 정점 번호 (각 단계 int64 범위 안)
+    xy, nxy = _factorize(q[:, 0] * (int(q[:, 1].max()) + 1) + q[:, 1])
+    codes, n = _factorize(xy.astype(np.int64) * (int(q[:, 2].max()) + 1) + q[:, 2])
+    return v[_first(codes, n)], codes.reshape(-1, 3)
+
+def _face_keys(f, nv):
+    """정점 순서와 무관한 면 키(같은 세 정점 = 같은 번호)"""
+    s = np.sort(f, 1).astype(np.int64)
+    k1, n1 = _factorize(s[:, 0]*nv + s[:, 1])
+    return _factorize(k1.astype(np.int64)*nv + s[:, 2])
+
+def _edge_stats(f, nv):
+    """면 → (무방향 변 사용 횟수 배열, 방향이 어긋난 변 수). 두 면이 공유하는 변은 서로 반대 방향이어야 함"""
+    e = np.concatenate([f[:, [0, 1]], f[:, [1, 2]], f[:, [2, 0]]]).astype(np.int64)
+    codes, n = _factorize(np.minimum(e[:, 0], e[:, 1]) * nv + np.maximum(e[:, 0], e[:, 1]))
+    cnt = np.bincount(codes, minlength=n)
+    sign = np.bincount(codes, weights=np.where(e[:, 0] < e[:, 1], 1.0, -1.0), minlength=n)
+    return cnt, int(((cnt == 2) & (sign != 0)).sum())
+
+def check(tris, tol=1e-5):
+    """-> {triangles, vertices, degenerate, duplicate_faces, boundary_edges, nonmanifold_edges, flipped_edges,
+           watertight, bbox, size, area, volume, inverted}"""
+    t = np.asarray(tris, dtype=np.float64)
+    if not len(t): return {"triangles": 0, "watertight": False}
+    cr = np.cross(t[:, 1] - t[:, 0], t[:, 2] - t[:, 0])
+    area = 0.5*np.sqrt(np.einsum("ij,ij->i", cr, cr))
+    vol = float(np.einsum("ij,ij->i", t[:, 0], np.cross(t[:, 1], t[:, 2])).sum() / 6.0)
+    v, f = weld(t, tol)
+    degen = (f[:, 0] == f[:, 1]) | (f[:, 1] == f[:, 2]) | (f[:, 0] == f[:, 2]) | (area <= 1e-12)
+    ok = f[~degen]
+    dup = len(ok) - _face_keys(ok, len(v))[1] if len(ok) else 0
+    cnt, flipped = _edge_stats(ok, len(v))
+    lo = t.reshape(-1, 3).min(0); hi = t.reshape(-1, 3).max(0)
+    rep = {"triangles": len(t), "vertices": len(v), "degenerate": int(degen.sum()), "duplicate_faces": int(dup),
+           "boundary_edges": int((cnt == 1).sum()), "nonmanifold_edges": int((cnt > 2).sum()), "flipped_edges": flipped,
+           "bbox": [lo.round(4).tolist(), hi.round(4).tolist()], "size": (hi - lo).round(4).tolist(),
+           "area": round(float(area.sum()), 4), "volume": round(abs(vol), 4), "inverted": vol < 0}
+    rep["watertight"] = rep["boundary_edges"] == 0 and rep["nonmanifold_edges"] == 0 and flipped == 0
+    return rep
+
+def is_clean(rep):
+    return bool(rep.get("watertight")) and not rep["degenerate"] and not rep["duplicate_faces"] and not rep["inverted"]
+
+def _fill_holes(v, f, max_edges):
+    """경계 루프(한 번만 쓰인 변)를 중심점 팬으로 메움. 분기(비다양체) 루프와 max_edges 초과 루프는 건너뜀"""
+    e = np.concatenate([f[:, [0, 1]], f[:, [1, 2]], f[:, [2, 0]]]).astype(np.int64)
+    nv = len(v)
+    codes, n = _factorize(np.minimum(e[:, 0], e[:, 1]) * nv + np.maximum(e[:, 0], e[:, 1]))
+    b = e[np.bincount(codes, minlength=n)[codes] == 1]
+    if not len(b): return v, f, 0
+    nxt = {}
+    for a, c in b[:, ::-1]:   # 메울 면은 경계 변을 반대 방향으로 사용
+        nxt.setdefault(int(a), []).append(int(c))
+    new_v, new_f, filled, seen = [], [], 0, set()
+    for s in list(nxt):
+        if s in seen or len(nxt[s]) != 1: continue
+        loop = [s]; cur = nxt[s][0]
+        while cur != s and cur in nxt and len(nxt[cur]) == 1 and len(loop) <= max_edges:
+            loop.append(cur); cur = nxt[cur][0]
+        seen.update(loop)
+        if cur != s or len(loop) < 3 or len(loop) > max_edges: continue
+        c = nv + len(new_v); new_v.append(v[loop].mean(0))
+        ring = np.array(loop); new_f.append(np.stack([ring, np.roll(ring, -1), np.full(len(ring), c)], 1))
+        filled += 1
+    if not filled: return v, f, 0
+    return np.vstack([v, new_v]), np.vstack([f] + new_f), filled
+
+def repair(tris, tol=1e-5, max_hole=256):
+    """-> (수리된 삼각형 (F,3,3) float32, 수리 내역 dict)"""
+    t = np.asarray(tris, dtype=np.float64)
+    v, f = weld(t, tol)
+    n0 = len(f)
+    f = f[(f[:, 0] != f[:, 1]) & (f[:, 1] != f[:, 2]) & (f[:, 0] != f[:, 2])]
+    cr = np.cross(v[f[:, 1]] - v[f[:, 0]], v[f[:, 2]] - v[f[:, 0]])
+    f = f[np.einsum("ij,ij->i", cr, cr) > 1e-24]
+    n_degen = n0 - len(f)
+    codes, n = _face_keys(f, len(v)); keep = np.sort(_first(codes, n))
+    n_dup = len(f) - len(keep); f = f[keep]
+    v, f, holes = _fill_holes(v, f, max_hole)
+    out = v[f]
+    vol = float(np.einsum("ij,ij->i", out[:, 0], np.cross(out[:, 1], out[:, 2])).sum())
+    if vol < 0: out = out[:, ::-1]
+    return out.astype(np.float32), {"removed_degenerate": int(n_degen), "removed_duplicate": int(n_dup),
+                                    "holes_filled": int(holes), "flipped_all": vol < 0}
+
+def file_hash(path, chunk=1 << 22):
+    h = hashlib.sha256(REPAIR_VERSION.encode())
+    with open(path, "rb") as f:
+        for b in iter(lambda: f.read(chunk), b""): h.update(b)
+    return h.hexdigest()
+
+def repair_cached(path, cache_dir="save/cache/stl_repair", tol=1e-5):
+    """내용 해시 캐시로 수리 → (결과 STL 경로, 보고서). 이미 깨끗하면 원본 경로, 같은 내용은 다시 수리하지 않음"""
+    cache = Path(cache_dir); h = file_hash(path)
+    rep_p = cache/f"{h}.json"; out_p = cache/f"{h}.stl"
+    if rep_p.exists():
+        rep = json.loads(rep_p.read_text(encoding="utf-8"))
+        if rep.get("clean") or out_p.exists():
+            return (str(path) if rep.get("clean") else str(out_p)), dict(rep, cached=True)
+    tris = triangles(path)
+    before = check(tris, tol)
+    if is_clean(before):
+        rep = {"clean": True, "before": before}
+    else:
+        fixed, steps = repair(tris, tol)
+        write_stl(out_p, fixed, "stl_io repaired")
+        after = check(fixed, tol)
+        rep = {"clean": False, "before": before, "steps": steps, "after": after}
+        # 수리 결과 자체도 등록 → 수리본을 다시 넣으면 바로 통과(_repaired_repaired 방지)
+        if is_clean(after): _write_json(cache/f"{file_hash(out_p)}.json", {"clean": True, "before": after})
+    _write_json(rep_p, rep)
+    return (str(path) if rep["clean"] else str(out_p)), dict(rep, cached=False)
+
+def _write_json(p, obj):
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_suffix(".tmp")
+    tmp.write_text(json.dumps(obj, ensure_ascii=False), encoding="utf-8"); os.replace(tmp, p)
+
+def iter_stl(paths):
+    for p in paths:
+        p = Path(p)
+        yield from (sorted(p.rglob("*.stl")) if p.is_dir() else [p])
+
+if __name__ == "__main__":
+    import argparse, csv, sys, time
+    ap = argparse.ArgumentParser()
+    ap.add_argument("cmd", choices=["check", "repair"])
+    ap.add_argument("paths", nargs="+", help="STL 파일/폴더(하위 *.stl)")
+    ap.add_argument("--csv", default="", help="check 결과 CSV")
+    ap.add_argument("--out_dir", default="", help="repair: 결과를 같은 파일명으로 복사할 폴더(접미사 _repaired 붙이지 않음)")
+    ap.add_argument("--cache_dir", default="save/cache/stl_repair")
+    ap.add_argument("--tol", type=float, default=1e-5, help="정점 용접 격자(mm)")
+    a = ap.parse_args()
+    t0 = time.perf_counter(); rows = []
+    for p in iter_stl(a.paths):
+        if a.cmd == "check":
+            r = check(triangles(p), a.tol); rows.append(dict(file=str(p), **r))
+            print(f"{'OK ' if is_clean(r) else 'BAD'} {p}  tris={r['triangles']} open={r.get('boundary_edges')} "
+                  f"degen={r.get('degenerate')} vol={r.get('volume')} size={r.get('size')}")
+        else:
+            out, rep = repair_cached(p, a.cache_dir, a.tol)
+            if a.out_dir:
+                dst = Path(a.out_dir)/Path(p).name; dst.parent.mkdir(parents=True, exist_ok=True)
+                if Path(out).resolve() != dst.resolve(): shutil.copyfile(out, dst)
+                out = str(dst)
+            state = "clean" if rep["clean"] else f"repaired {rep.get('steps', {})}"
+            print(f"{p}: {state}{' (cached)' if rep['cached'] else ''} -> {out}")
+    if a.csv and rows:
+        cols = list(dict.fromkeys(k for r in rows for k in r))
+        with open(a.csv, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, cols); w.writeheader(); w.writerows(rows)
+    print(f"[stl_io] {a.cmd}: {len(rows) if a.cmd == 'check' else 'done'} ({time.perf_counter()-t0:.2f}s)", file=sys.stderr)
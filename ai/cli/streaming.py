@@ -0,0 +1,89 @@
+import time, queue, threading
+
+# 토큰 스트리밍: HF(TextIteratorStreamer) / OpenVINO GenAI(streamer 콜백) 공통 제너레이터 + TTFT/토큰 지연 측정
+
+_END = object()
+
+def _pump(run, q):
+    """run() 을 별도 스레드에서 실행, 끝나면 _END(또는 예외)를 큐에 넣음"""
+    def _t():
+        try: run()
+        except Exception as e: q.put(e); return
+        q.put(_END)
+    th = threading.Thread(target=_t, daemon=True); th.start()
+    return th
+
+def _drain(q):
+    while True:
+        x = q.get()
+        if x is _END: return
+        if isinstance(x, Exception): raise x
+        yield x
+
+def stream_ov(pipe, prompt, cfg, lock=None):
+    """openvino_genai.LLMPipeline.generate(streamer=콜백) → 텍스트 조각 제너레이터"""
+    q = queue.Queue()
+    def cb(sub):
+        q.put(sub); return False   # False = 계속 생성
+    def run():
+        if lock:
+            with lock: pipe.generate(prompt, generation_config=cfg, streamer=cb)
+        else: pipe.generate(prompt, generation_config=cfg, streamer=cb)
+    _pump(run, q)
+    yield from _drain(q)
+
+def stream_hf(tok, model, dev, prompt, lock=None, prefix=None, info=None, **gen_kw):
+    """HF model.generate(streamer=TextIteratorStreamer) → 새 텍스트 조각 제너레이터(프롬프트 제외)
+    prefix: 공통 접두 문자열(prefix_cache 로 KV 재사용), info(dict) 에 prefix_tokens/prefill_saved_sec 기록"""
+    import torch
+    from transformers import TextIteratorStreamer
+    if prefix:
+        from prefix_cache import prepare
+        enc, pinfo = prepare(tok, model, dev, prompt, prefix, lock=lock)
+        if info is not None: info.update(pinfo)
+    else:
+        enc = tok(prompt, return_tensors="pt").to(dev)
+    st = TextIteratorStreamer(tok, skip_prompt=True, skip_special_tokens=True)
+    q = queue.Queue()
+    def run():
+        try:
+            with torch.inference_mode():
+                if lock:
+                    with lock: model.generate(**enc, streamer=st, pad_token_id=tok.pad_token_id, **gen_kw)
+                else: model.generate(**enc, streamer=st, pad_token_id=tok.pad_token_id, **gen_kw)
+        except Exception:
+            st.end(); raise
+    th = _pump(run, q)
+    for piece in st:
+        if piece: yield piece
+    th.join()
+    if not q.empty():
+        x = q.get()
+        if isinstance(x, Exception): raise x
+
+def pct(xs, p):
+    if not xs: return 0.0
+    xs = sorted(xs); i = min(len(xs)-1, max(0, int(round(p/100.0*(len(xs)-1)))))
+    return xs[i]
+
+class Timed:
+    """제너레이터를 감싸 TTFT / 조각 간 지연을 기록. for 루프 후 .stats() 사용"""
+    def __init__(self, gen):
+        self.gen = gen; self.t0 = time.perf_counter(); self.ttft = None; self.gaps = []; self.n = 0; self.total = 0.0
+    def __iter__(self):
+        last = self.t0
+        try:
+            for piece in self.gen:
+                t = time.perf_counter()
+                if self.ttft is None: self.ttft = t - self.t0
+                else: self.gaps.append(t - last)
+                last = t; self.n += 1
+                yield piece
+        finally:   # 소비자가 중간에 멈춰도(break/예외) total 기록
+            self.total = time.perf_counter() - self.t0
+    def stats(self):
+        return {"ttft_sec": round(self.ttft or 0.0, 3), "chunks": self.n, "total_sec": round(self.total, 3),
+                "ms_per_chunk_p50": round(pct(self.gaps, 50)*1000, 2), "ms_per_chunk_p95": round(pct(self.gaps, 95)*1000, 2)}
+    def summary(self):
+        s = self.stats()
+        return f"ttft {s['ttft_sec']}s · {s['ms_per_chunk_p50']} ms/tok(p50) · {s['chunks']} tok"
@@ -1,21 +1,26 @@
-﻿import argparse, json, os, subprocess, time
+﻿import argparse, json, os, sys, time
 from datetime import datetime
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]/"cli"))
+from genai_client import get_client
 
 def clean(txt:str)->str:
     # [LOG] 라인은 버리고 실제 생성 텍스트만 남김
     return "\n".join([ln for ln in txt.splitlines() if not ln.startswith("[LOG]")]).strip()
 
 def run_one(py, gen, model_dir, device, prompt, base_env):
+    """-> (생성 텍스트, None) 또는 (None, 오류 문자열). 오류는 학습 데이터로 쓰지 않음"""
     env = base_env.copy()
     env.update({
         "PYTHONUTF8":"1","PYTHONIOENCODING":"utf-8",
         "HF_HUB_OFFLINE":"1","TRANSFORMERS_OFFLINE":"1","HF_DATASETS_OFFLINE":"1"
     })
-    cmd = [py,"-X","utf8",gen,"--model_dir",model_dir,"--device",device,
-           "--max_new_tokens","256","--prompt",prompt]
-    # ★ encoding='utf-8', errors='replace' 로 디코딩 강제
-    r = subprocess.run(cmd, capture_output=True, text=True, encoding="utf-8", errors="replace", env=env)
-    return clean(((r.stdout or "") + ("\n"+r.stderr if r.stderr else "")))
+    # 상주 genai_run(--serve) 1개로 모든 프롬프트 처리
+    try:
+        out = clean(get_client(py, gen, env, tag=device).generate(model_dir, device, prompt, 256))
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+    return (out, None) if out else (None, "empty output")
 
 def main():
     ap=argparse.ArgumentParser()
@@ -53,12 +58,18 @@ def main():
     os.makedirs(os.path.dirname(a.out), exist_ok=True)
     if not os.path.exists(a.out):
         with open(a.out,"wb") as f: f.write(bytes([0xEF,0xBB,0xBF]))  # BOM(윈도우 뷰어 호환)
+    # 실패한 프롬프트는 SFT 데이터(a.out) 대신 <out>.errors.jsonl 에 기록
+    err_path = os.path.splitext(a.out)[0] + ".errors.jsonl"
     with open(a.out,"a",encoding="utf-8") as f:
         for p in seeds[a.topic]:
-            rec={"ts":datetime.now().isoformat(timespec="seconds"),
-                 "prompt":p,
-                 "output":run_one(a.py,a.gen,a.model_dir,a.device,p,os.environ)}
-            f.write(json.dumps(rec, ensure_ascii=False)+"\n")
+            out, err = run_one(a.py,a.gen,a.model_dir,a.device,p,os.environ)
+            ts = datetime.now().isoformat(timespec="seconds")
+            if err is not None:
+                with open(err_path,"a",encoding="utf-8") as ef:
+                    ef.write(json.dumps({"ts":ts,"prompt":p,"device":a.device,"error":err}, ensure_ascii=False)+"\n")
+                print("failed:", p[:20], "...", err.splitlines()[0][:120] if err else "", flush=True)
+                continue
+            f.write(json.dumps({"ts":ts,"prompt":p,"output":out}, ensure_ascii=False)+"\n")
             print("added:", p[:20], "...", flush=True)
             time.sleep(0.1)
 
@@ -0,0 +1,123 @@
+import os, sys, json, glob, time, zlib, re
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cli"))
+from qa_scorer import qa_score, block_score
+
+# 세션 출력 → 학습 코퍼스 샤드(jsonl, 채팅로그와 같은 {prompt, output} 형식) 스트리밍 변환.
+# 읽는 스키마: 채팅로그 {prompt, output} / batch_dual_v3 {topic, ov.out, hf.out, qa} / blueprint_batch_ui {topic, npu, xpu, score_*}
+# 파일은 한 줄씩, 레코드는 제너레이터로 → 코퍼스 전체를 메모리에 올리지 않음(중복 제거용 MinHash 서명만 보관).
+# 예) python ai/train/corpus_stream.py save/sessions data/memory/chatlogs --min_score 5
+#     python ai/train/lora_sft.py ... --data_glob "data/memory/chatlogs/*.jsonl;data/memory/corpus/*.jsonl"
+
+def iter_files(paths):
+    """경로/글롭/폴더(하위 *.jsonl) → jsonl 파일 경로(중복 없이, 정렬)"""
+    seen = set()
+    for p in paths:
+        hits = [Path(p)] if Path(p).exists() else [Path(x) for x in glob.glob(p)]
+        for h in hits:
+            for f in (sorted(h.rglob("*.jsonl")) if h.is_dir() else [h]):
+                k = f.resolve()
+                if k not in seen: seen.add(k); yield f
+
+def _qa_pass(r, src, out):
+    q = (r.get("qa") or {}).get(src)
+    return bool(q["pass"]) if isinstance(q, dict) and "pass" in q else qa_score(out)["pass"]
+
+def record_samples(r):
+    """레코드 1개 → (src, prompt, output, qa_pass, score). 채팅로그는 qa_pass/score = None"""
+    if "prompt" in r and "output" in r:
+        yield "log", r.get("prompt"), r.get("output"), None, None; return
+    topic = r.get("topic")
+    for src in ("ov", "hf"):   # batch_dual_v3
+        v = r.get(src)
+        if isinstance(v, dict) and v.get("out"):
+            yield src, topic, v["out"], _qa_pass(r, src, v["out"]), block_score(v["out"])
+    for src in ("npu", "xpu"):   # blueprint_batch_ui
+        out = r.get(src)
+        if isinstance(out, str) and out:
+            s = r.get(f"score_{src}")
+            yield src, topic, out, qa_score(out)["pass"], float(s) if s is not None else block_score(out)
+
+def iter_samples(path):
+    """파일 1개를 줄 단위로 → {prompt, output, src, file, line, qa_pass, score} (빈 prompt/output 제외)"""
+    with open(path, encoding="utf-8-sig") as f:
+        for n, ln in enumerate(f, 1):
+            try: r = json.loads(ln)
+            except ValueError: continue
+            if not isinstance(r, dict): continue
+            for src, p, out, ok, sc in record_samples(r):
+                if p and out and isinstance(p, str) and isinstance(out, str):
+                    yield {"prompt": p, "output": out, "src": src, "file": str(path), "line": n, "qa_pass": ok, "score": sc}
+
+def keep(s, qa="pass", min_score=None):
+    """QA/점수 필터. 값이 없는(채팅로그) 항목은 통과"""
+    if qa != "any" and s["qa_pass"] is not None and s["qa_pass"] != (qa == "pass"): return False
+    if min_score is not None and s["score"] is not None and s["score"] < min_score: return False
+    return True
+
+# ----- MinHash 근사 중복 제거 -----
+_P = np.uint64((1 << 61) - 1)
+_M32 = np.uint64(0xFFFFFFFF)
+_WS = re.compile(r"\s+")
+
+class MinHashDedup:
+    """문자 k-gram 집합의 MinHash 서명 + LSH 밴드. 추정 Jaccard >= threshold 면 중복"""
+    def __init__(self, num_perm=64, bands=16, k=5, threshold=0.85, seed=1):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, _P, num_perm, dtype=np.uint64); self.b = rng.integers(0, _P, num_perm, dtype=np.uint64)
+        self.bands = bands; self.rows = num_perm // bands; self.k = k; self.threshold = threshold
+        self.tables = [dict() for _ in range(bands)]; self.sigs = []
+
+    def signature(self, text):
+        t = _WS.sub(" ", text.lower()).strip()
+        if len(t) < self.k: t = t.ljust(self.k)
+        sh = np.fromiter({zlib.crc32(t[i:i+self.k].encode("utf-8")) for i in range(len(t)-self.k+1)}, dtype=np.uint64)
+        # a, b 를 [0, P) 전체에서 뽑아야 perm 끼리 독립(작은 a 는 crc 순서를 거의 그대로 보존 → 모든 perm 이 같은 최소값)
+        with np.errstate(over="ignore"):   # uint64 곱은 2^64 로 감김(의도됨), 하위 32비트만 사용
+            return (((np.outer(sh, self.a) + self.b) % _P) & _M32).min(axis=0)   # (shingle × perm) → perm 별 최소
+
+    def seen(self, text):
+        """중복이면 True, 아니면 등록 후 False"""
+        sig = self.signature(text)
+        keys = [sig[i*self.rows:(i+1)*self.rows].tobytes() for i in range(self.bands)]
+        cand = {j for t, key in zip(self.tables, keys) for j in t.get(key, ())}
+        if any(float(np.mean(self.sigs[j] == sig)) >= self.threshold for j in cand): return True
+        j = len(self.sigs); self.sigs.append(sig)
+        for t, key in zip(self.tables, keys): t.setdefault(key, []).append(j)
+        return False
+
+def stream(paths, qa="pass", min_score=None, dedup=None, stats=None):
+    """필터/중복 제거를 거친 샘플 제너레이터. dedup = MinHashDedup 또는 None, stats = {read, filtered, dup} 집계용 dict"""
+    st = stats if stats is not None else {}
+    for k in ("read", "filtered", "dup"): st.setdefault(k, 0)
+    for f in iter_files(paths):
+        for s in iter_samples(f):
+            st["read"] += 1
+            if not keep(s, qa, min_score): st["filtered"] += 1; continue
+            if dedup is not None and dedup.seen(s["output"]): st["dup"] += 1; continue
+            yield s
+
+def write_shard(out, samples):
+    """샘플 → jsonl 샤드(tmp 후 교체) -> 기록한 줄 수"""
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    tmp = out + ".tmp"; n = 0
+    with open(tmp, "w", encoding="utf-8") as f:
+        for s in samples:
+            f.write(json.dumps(s, ensure_ascii=False) + "\n"); n += 1
+    os.replace(tmp, out)
+    return n
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser()
+    ap.add_argument("paths", nargs="*", default=["save/sessions", "data/memory/chatlogs"], help="jsonl 파일/글롭/폴더")
+    ap.add_argument("--out", default="data/memory/corpus/sessions.jsonl")
+    ap.add_argument("--qa", choices=["pass","fail","any"], default="pass", help="세션 출력 QA 통과 여부 필터(채팅로그는 항상 통과)")
+    ap.add_argument("--min_score", type=float, default=None, help="blueprint 점수(score_* / block_score) 하한")
+    ap.add_argument("--dedup", type=float, default=0.85, help="MinHash 추정 Jaccard 임계값, 0 = 중복 제거 안 함")
+    a = ap.parse_args()
+    t0 = time.perf_counter(); st = {}
+    n = write_shard(a.out, stream(a.paths, a.qa, a.min_score, MinHashDedup(threshold=a.dedup) if a.dedup > 0 else None, st))
+    print(f"[corpus] {st['read']} samples, {st['filtered']} filtered, {st['dup']} near-dup → {n} kept ({time.perf_counter()-t0:.2f}s) -> {a.out}")
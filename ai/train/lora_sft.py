@@ -1,20 +1,16 @@
-﻿import argparse, json, glob, os, random, torch
+﻿import argparse, os, sys, random, torch
 from datasets import Dataset
 from transformers import AutoModelForCausalLM, AutoTokenizer
 from peft import LoraConfig, get_peft_model, PeftModel
 from trl import SFTTrainer, SFTConfig
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from packing import PadMeter, PackCollator, pack_dataset, packed_supported
+from corpus_stream import stream
+from token_cache import TokenCache, format_rec
 
 def load_logs(patterns):
-    recs=[]
-    for pat in patterns:
-        for path in glob.glob(pat):
-            with open(path,"r",encoding="utf-8") as f:
-                for line in f:
-                    try: j=json.loads(line)
-                    except: continue
-                    p=j.get("prompt"); a=j.get("output")
-                    if p and a: recs.append({"text": f"User: {p}\nAssistant: {a}"})
-    return recs
+    # 채팅로그 + 세션 run.jsonl(v3/blueprint UI) 모두, 세션 출력은 QA 통과분만
+    return [{"text": format_rec(s)} for s in stream(patterns)]
 
 def pick_device(precision):
     use_xpu = hasattr(torch,"xpu") and torch.xpu.is_available()
@@ -38,29 +34,46 @@ def main():
     ap.add_argument("--seq_len", type=int, default=1024)
     ap.add_argument("--precision", choices=["fp16","bf16","fp32"], default="fp32")
     ap.add_argument("--data_glob", default="data/memory/chatlogs/*.jsonl")
+    ap.add_argument("--token_cache", default="data/cache/tokens", help="토큰 캐시 폴더, off = 매번 원문 토크나이즈")
+    ap.add_argument("--pack", choices=["none","bucket","packed"], default="packed",
+                    help="packed = 샘플 이어붙여 seq_len 채움(경계 마스크), bucket = 비슷한 길이끼리 배치, none = 패딩만")
     args=ap.parse_args()
 
     os.makedirs(args.out_dir, exist_ok=True)
-    recs = load_logs(args.data_glob.split(";"))
-    if not recs: raise SystemExit("학습 데이터가 비어있음: "+args.data_glob)
-    random.shuffle(recs)
-    ds = Dataset.from_list(recs)
-
     tok = AutoTokenizer.from_pretrained(args.base, use_fast=True)
-
     tok.model_max_length = args.seq_len
-
-    if tok.pad_token is None:
-
-        tok.pad_token = tok.eos_token
     if tok.pad_token is None: tok.pad_token = tok.eos_token
 
+    patterns = args.data_glob.split(";")
+    if args.token_cache != "off":
+        # 토크나이즈 1회 → Arrow 샤드(메모리 매핑), 새/변경 로그 파일만 다시 토크나이즈
+        tc = TokenCache(args.token_cache, tok, args.seq_len)
+        print(f"TOKEN_CACHE={tc.update(patterns)}", flush=True)
+        ds = tc.dataset(patterns)   # input_ids 열 → SFTTrainer 가 토크나이즈 생략
+        if ds is None: raise SystemExit("학습 데이터가 비어있음: "+args.data_glob)
+    else:
+        recs = load_logs(patterns)
+        if not recs: raise SystemExit("학습 데이터가 비어있음: "+args.data_glob)
+        random.shuffle(recs)
+        ds = Dataset.from_list(recs)
+
+    pack = args.pack
+    if pack == "packed" and not ("input_ids" in ds.column_names and packed_supported()):
+        # 원문 경로(--token_cache off) 또는 position_ids 경계 마스크 미지원 transformers → 길이 버킷
+        print("PACK=packed 불가(토큰 캐시 필요, transformers>=4.53) → bucket", flush=True); pack = "bucket"
+    collator = None
+    if pack == "packed":
+        ds, n_samples = pack_dataset(ds, args.seq_len)
+        print(f"PACK=packed {n_samples} samples -> {len(ds)} rows of <= {args.seq_len} tokens", flush=True)
+        collator = PackCollator(tok.pad_token_id)
+
     device, dtype, use_xpu = pick_device(args.precision)
     print(f"DEVICE={device}, DTYPE={dtype}, XPU={use_xpu}", flush=True)
 
     model = AutoModelForCausalLM.from_pretrained(args.base, torch_dtype=dtype)
     model.to(device)
     model.gradient_checkpointing_enable()
+    model.config.use_cache = False   # 캐시가 있으면 packed 경계 마스크가 꺼짐
 
     lora=LoraConfig(r=16,lora_alpha=32,lora_dropout=0.05,
                     target_modules=["q_proj","k_proj","v_proj","o_proj","up_proj","down_proj","gate_proj"],
@@ -68,6 +81,7 @@ def main():
     model = get_peft_model(model, lora)
 
     train_cfg = SFTConfig(optim='adamw_torch', packing=False,  
+        max_length=args.seq_len,
         output_dir=os.path.join(args.out_dir,"lora"),
         num_train_epochs=args.epochs,
         per_device_train_batch_size=args.bsz,
@@ -80,7 +94,9 @@ def main():
         warmup_ratio=0.03,
         
         fp16=False, bf16=False,  # TRL 내부 AMP 사용 안 함
-        gradient_checkpointing=True
+        gradient_checkpointing=True,
+        group_by_length=(pack == "bucket"),
+        remove_unused_columns=(pack != "packed"),   # position_ids 유지
     )
     # --- formatting for TRL >= 0.10 ---
     def _fmt(ex):
@@ -94,39 +110,25 @@ def main():
         elif isinstance(ex, str):
             return ex
         return ""
-    trainer = SFTTrainer(model=model, train_dataset=ds,
-                       args=train_cfg, formatting_func=_fmt)
+    meter = PadMeter()
+    trainer = SFTTrainer(model=model, train_dataset=ds, processing_class=tok, callbacks=[meter],
+                       data_collator=meter.wrap(collator) if collator else None,
+                       args=train_cfg, formatting_func=None if "input_ids" in ds.column_names else _fmt)
+    if not collator: trainer.data_collator = meter.wrap(trainer.data_collator)
     trainer.train()
     # === Save LoRA adapter & tokenizer ===
     out_lora = os.path.join(args.out_dir, "lora")
     os.makedirs(out_lora, exist_ok=True)
     trainer.model.save_pretrained(out_lora)
     tok.save_pretrained(args.out_dir)
-trainer.save_model()
 
     # LoRA 병합 저장
-
+    merged_dir = os.path.join(args.out_dir, "merged")
     base = AutoModelForCausalLM.from_pretrained(args.base, torch_dtype=dtype)
-    base.to(device)
-    base = get_peft_model(base, lora)
-
-    base.save_pretrained(merged_dir)
+    merged = PeftModel.from_pretrained(base, out_lora).merge_and_unload()
+    merged.save_pretrained(merged_dir)
     tok.save_pretrained(merged_dir)
     print(f"MERGED_OUT={merged_dir}", flush=True)
 
 if __name__=="__main__":
     main()
-
-
-
-
-
-
-
-
-
-
-
-
-
-
@@ -0,0 +1,80 @@
+import time, bisect
+import torch
+from transformers import TrainerCallback
+
+# lora_sft 배치 구성: 시퀀스 패킹(best-fit decreasing) + 패딩 효율 측정.
+# 패킹 행 = 여러 샘플을 이어붙이고 position_ids 를 샘플마다 0부터 다시 시작, attention_mask 는 넘기지 않음
+# → transformers(>=4.53) 가 position_ids 로 샘플 경계를 찾아 블록 대각 causal 마스크 생성(샘플 간 attention 없음).
+
+def packed_supported():
+    """position_ids 기반 샘플 경계 마스크 지원 여부(없으면 lora_sft 가 bucket 으로 대체)"""
+    try:
+        from transformers.masking_utils import find_packed_sequence_indices  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def pack_plan(lengths, cap):
+    """길이 목록 → 행(인덱스 목록) 목록. 긴 것부터 남은 자리가 가장 작은 행에 넣음"""
+    order = sorted(range(len(lengths)), key=lambda i: -lengths[i])
+    rems, bins = [], []   # rems: (남은 자리, 행 번호) 정렬 목록
+    for i in order:
+        n = min(int(lengths[i]), cap)
+        k = bisect.bisect_left(rems, (n, -1))
+        if k < len(rems):
+            r, b = rems.pop(k)
+        else:
+            r, b = cap, len(bins); bins.append([])
+        bins[b].append(i)
+        if r - n > 0: bisect.insort(rems, (r - n, b))
+    return bins
+
+def pack_dataset(ds, cap):
+    """input_ids 데이터셋 → 패킹 데이터셋(input_ids, position_ids). -> (데이터셋, 원래 샘플 수)"""
+    from datasets import Dataset
+    ids = ds["input_ids"]
+    rows = pack_plan([len(x) for x in ids], cap)
+    out_ids, out_pos = [], []
+    for b in rows:
+        seq = [ids[i][:cap] for i in b]
+        out_ids.append([t for s in seq for t in s])
+        out_pos.append([p for s in seq for p in range(len(s))])
+    return Dataset.from_dict({"input_ids": out_ids, "position_ids": out_pos}), len(ids)
+
+class PackCollator:
+    """패킹 행 → input_ids/position_ids/labels (attention_mask 없음). 각 샘플 첫 토큰과 패딩은 labels=-100"""
+    def __init__(self, pad_id):
+        self.pad_id = pad_id
+
+    def __call__(self, examples):
+        L = max(len(e["input_ids"]) for e in examples)
+        ids = torch.full((len(examples), L), self.pad_id, dtype=torch.long)
+        pos = torch.zeros((len(examples), L), dtype=torch.long)
+        for r, e in enumerate(examples):
+            n = len(e["input_ids"])
+            ids[r, :n] = torch.tensor(e["input_ids"]); pos[r, :n] = torch.tensor(e["position_ids"])
+        labels = ids.clone()
+        labels[pos == 0] = -100   # 이전 샘플 마지막 토큰으로 다음 샘플 첫 토큰을 예측하지 않음(패딩 위치도 0)
+        return {"input_ids": ids, "position_ids": pos, "labels": labels}
+
+class PadMeter(TrainerCallback):
+    """collator 를 감싸 실제 토큰 / 배치 토큰(패딩 포함) 집계, epoch 마다 PAD_EFF 출력"""
+    def __init__(self):
+        self.real = self.total = 0; self.t0 = time.perf_counter(); self.epochs = []
+
+    def wrap(self, collate):
+        def _collate(examples):
+            batch = collate(examples)
+            self.real += sum(len(e["input_ids"]) for e in examples); self.total += batch["input_ids"].numel()
+            return batch
+        return _collate
+
+    def on_epoch_begin(self, args, state, control, **kw):
+        self.real = self.total = 0; self.t0 = time.perf_counter()
+
+    def on_epoch_end(self, args, state, control, **kw):
+        sec = time.perf_counter() - self.t0
+        ep = {"epoch": round(state.epoch or 0, 2), "pad_eff": round(self.real / max(self.total, 1), 4),
+              "real_tokens": self.real, "batch_tokens": self.total, "tok_per_sec": round(self.real / max(sec, 1e-9), 1)}
+        self.epochs.append(ep)
+        print(f"PAD_EFF={ep}", flush=True)
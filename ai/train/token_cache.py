@@ -0,0 +1,97 @@
+import os, json, glob, hashlib, shutil, time
+from corpus_stream import iter_samples, keep
+
+# lora_sft 전처리: 채팅로그를 1회 토크나이즈해 파일별 Arrow 샤드로 저장(load_from_disk = 메모리 매핑).
+# 캐시 키 = 토크나이저 해시(포맷 버전 포함) + seq_len. 다음 실행에서는 새로 생겼거나 바뀐(size/mtime) 파일만 다시 토크나이즈.
+# 예) python ai/train/token_cache.py --base models/hf_base/tinyllama_1.1b_chat --seq_len 1024
+
+FORMAT_VERSION = "2"   # 텍스트 포맷(User:/Assistant:)이나 읽기 규칙이 바뀌면 올림
+
+def format_rec(j):
+    """채팅로그 1줄 → 학습 텍스트(없으면 None)"""
+    p=j.get("prompt"); a=j.get("output")
+    return f"User: {p}\nAssistant: {a}" if p and a else None
+
+def tok_hash(tok):
+    """토크나이저 동일성 해시: 어휘/병합 규칙 + bos/eos + 클래스 (pad 는 input_ids 에 영향 없어 제외)"""
+    h=hashlib.sha1(type(tok).__name__.encode())
+    try: h.update(tok.backend_tokenizer.to_str().encode("utf-8"))   # fast tokenizer 전체 정의
+    except Exception: h.update(json.dumps(sorted(tok.get_vocab().items())).encode("utf-8"))
+    h.update(json.dumps([tok.bos_token_id, tok.eos_token_id, FORMAT_VERSION]).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+def _fid(path):
+    return hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+
+def _tokenize_file(path, tok, seq_len, batch=512):
+    # 채팅로그/세션 run.jsonl/코퍼스 샤드 모두(corpus_stream), 세션 출력은 QA 통과분만
+    texts=[format_rec(s) for s in iter_samples(path) if keep(s)]
+    ids=[]; eos=tok.eos_token_id
+    for i in range(0,len(texts),batch):
+        enc=tok(texts[i:i+batch], truncation=True, max_length=seq_len-1 if eos is not None else seq_len, add_special_tokens=True)["input_ids"]
+        ids+= [x+[eos] for x in enc] if eos is not None else enc
+    return ids
+
+class TokenCache:
+    def __init__(self, root, tok, seq_len):
+        self.tok=tok; self.seq_len=int(seq_len)
+        self.dir=os.path.join(root, f"{tok_hash(tok)}_{self.seq_len}")
+        self.man_p=os.path.join(self.dir,"manifest.json")
+        try:
+            with open(self.man_p,encoding="utf-8") as f: self.man=json.load(f)
+        except (OSError, ValueError): self.man={"files":{}}
+
+    def _save(self):
+        os.makedirs(self.dir, exist_ok=True)
+        tmp=self.man_p+".tmp"
+        with open(tmp,"w",encoding="utf-8") as f: json.dump(self.man,f,ensure_ascii=False,indent=1)
+        os.replace(tmp,self.man_p)
+
+    def update(self, patterns):
+        """glob 패턴들 → 바뀐 파일만 토크나이즈. -> {"files","tokenized","reused","removed","sec"}"""
+        from datasets import Dataset
+        t0=time.perf_counter()
+        paths=sorted({os.path.abspath(p) for pat in patterns for p in glob.glob(pat)})
+        files=self.man["files"]; done=reused=0
+        for p in paths:
+            st=os.stat(p); ent=files.get(p); shard=os.path.join(self.dir,"shards",_fid(p))
+            if ent and ent["size"]==st.st_size and ent["mtime"]==st.st_mtime and os.path.isdir(shard):
+                reused+=1; continue
+            ids=_tokenize_file(p, self.tok, self.seq_len)
+            shutil.rmtree(shard, ignore_errors=True)
+            if ids: Dataset.from_dict({"input_ids": ids}).save_to_disk(shard)
+            files[p]={"size":st.st_size,"mtime":st.st_mtime,"rows":len(ids),"tokens":sum(map(len,ids)),"shard":_fid(p) if ids else None}
+            done+=1
+            self._save()   # 파일마다 기록 → 중단돼도 이어서
+        gone=[p for p in files if p not in paths and not os.path.exists(p)]
+        for p in gone:
+            if files[p].get("shard"): shutil.rmtree(os.path.join(self.dir,"shards",files[p]["shard"]), ignore_errors=True)
+            files.pop(p)
+        if gone or done: self._save()
+        return {"files":len(paths),"tokenized":done,"reused":reused,"removed":len(gone),"sec":round(time.perf_counter()-t0,3)}
+
+    def dataset(self, patterns=None):
+        """지정 패턴(없으면 전체)의 샤드를 메모리 매핑으로 열어 이어붙인 datasets.Dataset(input_ids)"""
+        from datasets import load_from_disk, concatenate_datasets
+        keep=None if patterns is None else {os.path.abspath(p) for pat in patterns for p in glob.glob(pat)}
+        parts=[load_from_disk(os.path.join(self.dir,"shards",e["shard"])) for p,e in sorted(self.man["files"].items())
+               if e.get("shard") and (keep is None or p in keep)]
+        if not parts: return None
+        return parts[0] if len(parts)==1 else concatenate_datasets(parts)
+
+    def stats(self):
+        fs=self.man["files"].values()
+        return {"files":len(self.man["files"]),"rows":sum(e["rows"] for e in fs),"tokens":sum(e["tokens"] for e in fs),"dir":self.dir}
+
+if __name__=="__main__":
+    import argparse
+    from transformers import AutoTokenizer
+    ap=argparse.ArgumentParser()
+    ap.add_argument("--base", required=True)
+    ap.add_argument("--seq_len", type=int, default=1024)
+    ap.add_argument("--data_glob", default="data/memory/chatlogs/*.jsonl")
+    ap.add_argument("--cache_dir", default="data/cache/tokens")
+    a=ap.parse_args()
+    tok=AutoTokenizer.from_pretrained(a.base, use_fast=True)
+    tc=TokenCache(a.cache_dir, tok, a.seq_len)
+    print(tc.update(a.data_glob.split(";")), tc.stats())
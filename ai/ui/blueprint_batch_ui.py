@@ -1,42 +1,58 @@
-﻿import os, sys, json, csv, zipfile, re, io, subprocess
+﻿import os, sys, json, re, threading
 from pathlib import Path
 from datetime import datetime
 import gradio as gr
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]/"cli"))
+from genai_client import get_client
+from hf_batcher import get_batcher, close_batcher
+from streaming import stream_hf, Timed
+from qa_scorer import HINT_RE, block_score
+from blueprint_export import export_blueprints   # 1패스 + 내용 해시 증분 + zip writestr
+from batch_mesh import mesh_session                # leaf 부품 STL(프로세스 풀, 파라미터 해시 캐시)
 
 # =========================
 # XPU (HF merged)
 # =========================
 _tok=_model=None; _src=None; _dev="cpu"
+_lock=None   # 배처/스트리밍 공용 generate lock(로드한 모델 1개당 1개)
 def _dtype(s):
     import torch
     return {"fp32":torch.float32,"bf16":torch.bfloat16,"f16":torch.float16}.get(str(s).lower(),torch.float32)
 
 def load_xpu(merged_dir, dtype, device):
-    global _tok,_model,_src,_dev
+    global _tok,_model,_src,_dev,_lock
     from transformers import AutoTokenizer, AutoModelForCausalLM
     import torch
     mdir=str(Path(merged_dir).resolve())
-    if _model is not None and _src==mdir and _dev==device: return "ok"
+    # _src = (경로, 요청 장치, dtype): 실제 _dev 와 비교하면 xpu 없는 PC 에서 매번 다시 로드됨
+    if _model is not None and _src==(mdir,device,dtype): return "ok"
+    close_batcher(_model); _model=None   # 이전 모델 배처 종료 → 가중치 해제
     _tok   = AutoTokenizer.from_pretrained(mdir, use_fast=True, local_files_only=True)
     _model = AutoModelForCausalLM.from_pretrained(mdir, torch_dtype=_dtype(dtype), local_files_only=True).eval()
     if device.lower()=="xpu" and hasattr(torch,"xpu") and torch.xpu.is_available():
         _model.to("xpu"); _dev="xpu"
     else:
         _dev="cpu"
-    _src=mdir
+    _src=(mdir,device,dtype); _lock=threading.Lock()
     return "ok"
 
+def submit_xpu(prompt, max_new):
+    # 동적 배처: 동시에 제출된 프롬프트를 left-pad 로 묶어 1회 generate
+    return get_batcher(_tok, _model, _dev, max_batch=8, window_ms=20, lock=_lock).submit(prompt, max_new_tokens=int(max_new))
+
 def gen_xpu(prompt, max_new):
     if _tok is None or _model is None: return "(XPU not loaded)"
-    x=_tok(prompt, return_tensors="pt")
-    if _dev=="xpu": x={k:v.to("xpu") for k,v in x.items()}
-    y=_model.generate(**x, max_new_tokens=int(max_new))
-    return _tok.decode(y[0], skip_special_tokens=True)
+    return submit_xpu(prompt, max_new).result()["text"]
+
+def stream_xpu(prompt, max_new, info=None):
+    # WRAP_BASE 의 토픽 앞부분은 모든 프롬프트 공통 → KV 재사용(prefix_cache)
+    pfx = WRAP_BASE.split("{topic}")[0]
+    return stream_hf(_tok, _model, _dev, prompt, lock=_lock, prefix=pfx if prompt.startswith(pfx) else None, info=info, max_new_tokens=int(max_new))
 
 # =========================
 # NPU (OpenVINO runner)
 # =========================
-def run_npu(gen_script, ov_dir, device, max_new, prompt, offline):
+def _npu_client(gen_script, device, offline):
     env=os.environ.copy()
     def set_off(on):
         for k in ["HF_HUB_OFFLINE","TRANSFORMERS_OFFLINE","HF_DATASETS_OFFLINE"]:
@@ -44,11 +60,14 @@ def run_npu(gen_script, ov_dir, device, max_new, prompt, offline):
             elif k in env: env.pop(k)
     if   offline=="on" : set_off(True)
     elif offline=="off": set_off(False)
-    cmd=[sys.executable, gen_script, "--model_dir", ov_dir, "--device", device,
-         "--max_new_tokens", str(int(max_new)), "--prompt", prompt]
+    return get_client(sys.executable, gen_script, env, tag=device)
+
+def stream_npu(gen_script, ov_dir, device, max_new, prompt, offline):
+    return _npu_client(gen_script, device, offline).stream(ov_dir, device, prompt, int(max_new), timeout=180)
+
+def run_npu(gen_script, ov_dir, device, max_new, prompt, offline):
     try:
-        r=subprocess.run(cmd, capture_output=True, text=True, encoding="utf-8", errors="replace", timeout=180, env=env)
-        txt=(r.stdout or "")+("\n"+r.stderr if r.stderr else "")
+        txt=_npu_client(gen_script, device, offline).generate(ov_dir, device, prompt, int(max_new), timeout=180)
     except Exception as e:
         txt=f"(NPU run error) {e}"
     return "\n".join([ln for ln in txt.splitlines() if not ln.startswith("[LOG]")]).strip()
@@ -76,15 +95,11 @@ WRAP_BLUEPRINT = """Add a 'BLUEPRINT' package:
 7) Top 5 risks & probes
 """
 
-INSTR_HINTS = [
-    "You are a propulsion","당신은 추진","Add a 'BLUEPRINT'","Add a 'PROPOSAL'",
-    "Format: Section headings","Constraints:"
-]
 def clean_text(txt:str):
     if not txt: return txt
     out=[]
     for ln in txt.splitlines():
-        if any(h in ln for h in INSTR_HINTS): continue
+        if HINT_RE.search(ln): continue
         out.append(ln)
     s="\n".join(out)
     s=re.sub(r"(Part Tree(?: Node)*){2,}", "Part Tree", s, flags=re.I)
@@ -109,32 +124,56 @@ def expand_lines(lines, total, cycle):
         i+=1
     return out
 
-_num_re = re.compile(r"\d+(\.\d+)?")
 def score_block(txt:str):
     if not txt: return 0.0
-    txt=clean_text(txt)
-    s  = len(_num_re.findall(txt)) * 1.0
-    s += 3.0 if "```part_tree" in txt.lower() or "part_tree" in txt.lower() else 0.0
-    s += 1.0 if ("Test Plan" in txt or "벤치" in txt) else 0.0
-    s -= 2.0 * sum(1 for h in INSTR_HINTS if h in txt)
-    s -= 0.2 * txt.count("  ")
-    return round(s,2)
+    return block_score(clean_text(txt))   # qa_scorer 1회 스캔
 
-def build_records(lines, make_npu, make_xpu, cfg):
-    records=[]
-    for i,topic in enumerate(lines,1):
-        p = wrap_prompt(topic, cfg["use_wrap"], cfg["blueprint"])
-        npu = run_npu(cfg["gen_script"], cfg["ov_dir"], cfg["npu_dev"], int(cfg["npu_max"]), p, cfg["npu_off"]) if make_npu else ""
-        xpu = gen_xpu(p, int(cfg["xpu_max"])) if make_xpu else ""
+def iter_records(lines, make_npu, make_xpu, cfg):
+    """("partial", 블록 md) 또는 ("rec", record) 이벤트를 순서대로 내보냄"""
+    wrapped=[wrap_prompt(topic, cfg["use_wrap"], cfg["blueprint"]) for topic in lines]
+    stream=bool(cfg.get("stream"))
+    # XPU 는 전부 먼저 제출 → 배치 generate 가 NPU 실행과 겹쳐 진행 (스트리밍 모드는 개별 생성)
+    xfuts=[submit_xpu(p, int(cfg["xpu_max"])) if (make_xpu and not stream and _model is not None) else None for p in wrapped]
+    for i,(topic,p,xf) in enumerate(zip(lines,wrapped,xfuts),1):
+        npu = xpu = ""; lat = {}
+        if stream:
+            view=lambda n,x: f"### {i}. {topic}\n\n**NPU(OpenVINO)**\n{n or '…'}\n\n**XPU(HF merged)**\n{x or '…'}"
+            if make_npu:
+                try:
+                    tg=Timed(stream_npu(cfg["gen_script"], cfg["ov_dir"], cfg["npu_dev"], int(cfg["npu_max"]), p, cfg["npu_off"]))
+                    for piece in tg:
+                        npu+=piece; yield "partial", view(npu, "")
+                    lat["npu"]=tg.summary()
+                except Exception as e: npu=f"(NPU run error) {e}"
+            if make_xpu:
+                if _model is None: xpu="(XPU not loaded)"
+                else:
+                    try:
+                        pinfo={}
+                        tg=Timed(stream_xpu(p, int(cfg["xpu_max"]), info=pinfo))
+                        for piece in tg:
+                            xpu+=piece; yield "partial", view(npu, xpu)
+                        lat["xpu"]=tg.summary()
+                        if pinfo.get("prefix_tokens"): lat["xpu_prefill_saved_sec"]=pinfo["prefill_saved_sec"]
+                    except Exception as e: xpu=f"(XPU error) {e}"
+        else:
+            npu = run_npu(cfg["gen_script"], cfg["ov_dir"], cfg["npu_dev"], int(cfg["npu_max"]), p, cfg["npu_off"]) if make_npu else ""
+            if make_xpu:
+                try: xpu = xf.result()["text"] if xf else "(XPU not loaded)"
+                except Exception as e: xpu = f"(XPU error) {e}"
         npu_c, xpu_c = clean_text(npu), clean_text(xpu)
-        records.append({
+        rec = {
             "ts": datetime.now().isoformat(timespec="seconds"),
             "idx": i, "topic": topic, "prompt_wrapped": p,
             "settings":{"npu":{"dev":cfg["npu_dev"],"max_new":int(cfg["npu_max"])}, "xpu":{"dir":cfg["merged_dir"],"dtype":cfg["xpu_dtype"],"dev":cfg["xpu_dev"],"max_new":int(cfg["xpu_max"])}},
             "npu": npu_c, "xpu": xpu_c,
             "score_npu": score_block(npu_c), "score_xpu": score_block(xpu_c)
-        })
-    return records
+        }
+        if lat: rec["latency"] = lat
+        yield "rec", rec
+
+def build_records(lines, make_npu, make_xpu, cfg):
+    return [r for kind, r in iter_records(lines, make_npu, make_xpu, cfg) if kind=="rec"]
 
 def save_session(session_name, records, keep_top=0, keep_bottom=0):
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -165,71 +204,16 @@ def save_session(session_name, records, keep_top=0, keep_bottom=0):
                     f.write(f"## WORST [{src}] score={sc} | {topic}\n\n{txt}\n\n---\n")
     return str(root)
 
-# =========================
-# Blueprint / Print-Pack export
-# =========================
-PT_RE = re.compile(r"```part_tree\s*(\{.*?\})\s*```", re.S|re.I)
-def extract_part_tree(text):
-    m = PT_RE.search(text or "")
-    if not m: return None
-    try:
-        return json.loads(m.group(1))
-    except Exception:
-        return None
-
-def flatten_bom(node, rows, parent=""):
-    if not isinstance(node, dict): return
-    rid = node.get("id","")
-    rows.append([rid, node.get("name",""), node.get("qty",1), node.get("material",""), node.get("process",""), parent])
-    for ch in (node.get("children") or []):
-        flatten_bom(ch, rows, rid)
-
-def export_blueprints(session_root:str, records, include_npu=True, include_xpu=True):
-    root = Path(session_root)
-    pack_dir = root/"blueprints"
-    for r in records:
-        for src_key, txt in (("npu", r["npu"]), ("xpu", r["xpu"])):
-            if (src_key=="npu" and not include_npu) or (src_key=="xpu" and not include_xpu): 
-                continue
-            if not txt: continue
-            topic_s = "".join([c for c in r["topic"] if c.isalnum() or c in ("-","_"," ")])[:80].strip().replace(" ","_")
-            d = pack_dir/f"{r['idx']:02d}_{topic_s}"/src_key
-            d.mkdir(parents=True, exist_ok=True)
-            # full blueprint text
-            (d/"blueprint.md").write_text(txt, encoding="utf-8")
-            # part_tree -> json + bom csv
-            pt = extract_part_tree(txt)
-            if pt:
-                (d/"part_tree.json").write_text(json.dumps(pt, ensure_ascii=False, indent=2), encoding="utf-8")
-                rows=[]; flatten_bom(pt, rows)
-                with (d/"BOM.csv").open("w", newline="", encoding="utf-8") as f:
-                    w=csv.writer(f); w.writerow(["id","name","qty","material","process","parent"])
-                    w.writerows(rows)
-    # aggregate print queue
-    pq = []
-    for bom in pack_dir.rglob("BOM.csv"):
-        with bom.open("r", encoding="utf-8") as f:
-            r=csv.DictReader(f)
-            for row in r:
-                pq.append([row["id"], row["name"], row["qty"], row["material"], row["process"], str(bom.parent.relative_to(pack_dir))])
-    if pq:
-        with (pack_dir/"PRINT_QUEUE.csv").open("w", newline="", encoding="utf-8") as f:
-            w=csv.writer(f); w.writerow(["id","name","qty","material","process","path"])
-            w.writerows(pq)
-    # zip
-    zip_path = root/("print_pack.zip")
-    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as z:
-        for p in (root/"blueprints").rglob("*"):
-            z.write(p, p.relative_to(root))
-    return str(zip_path)
-
 # =========================
 # Runners
 # =========================
+def _render(r):
+    return f"### {r['idx']}. {r['topic']}\n\n**NPU(OpenVINO)**\n{r['npu'] or '(no output)'}\n\n**XPU(HF merged)**\n{r['xpu'] or '(no output)'}"
+
 def run_core(which, prompts_block, run_count, cycle_fill,
              gen_script, ov_dir, npu_dev, npu_max, npu_off,
              merged_dir, xpu_dtype, xpu_dev, xpu_max,
-             use_wrap, blueprint, do_save, session_name, keep_top, keep_bottom):
+             use_wrap, blueprint, do_save, session_name, keep_top, keep_bottom, stream_tokens=False):
     lines=[ln.strip() for ln in (prompts_block or "").splitlines() if ln.strip()]
     lines=expand_lines(lines, max(1,min(int(run_count),50)), cycle_fill)
     try:
@@ -237,18 +221,22 @@ def run_core(which, prompts_block, run_count, cycle_fill,
     except Exception: pass
     cfg=dict(gen_script=gen_script, ov_dir=ov_dir, npu_dev=npu_dev, npu_max=npu_max, npu_off=npu_off,
              merged_dir=merged_dir, xpu_dtype=xpu_dtype, xpu_dev=xpu_dev, xpu_max=xpu_max,
-             use_wrap=use_wrap, blueprint=blueprint)
+             use_wrap=use_wrap, blueprint=blueprint, stream=stream_tokens)
     make_npu = which in ("npu","both")
     make_xpu = which in ("xpu","both")
-    recs = build_records(lines, make_npu, make_xpu, cfg)
+    # 제너레이터: 레코드(또는 스트리밍 조각)마다 UI 갱신
+    recs=[]
+    for kind, x in iter_records(lines, make_npu, make_xpu, cfg):
+        if kind=="rec": recs.append(x); yield "\n\n".join(_render(r) for r in recs), ""
+        else: yield "\n\n".join([_render(r) for r in recs]+[x]), ""
     saved_path = save_session(session_name, recs, int(keep_top), int(keep_bottom)) if do_save else ""
-    out = "\n\n".join([f"### {r['idx']}. {r['topic']}\n\n**NPU(OpenVINO)**\n{r['npu'] or '(no output)'}\n\n**XPU(HF merged)**\n{r['xpu'] or '(no output)'}" for r in recs])
+    out = "\n\n".join([_render(r) for r in recs])
     if saved_path: out += f"\n\n> Saved to **{saved_path}**"
-    return out, saved_path
+    yield out, saved_path
 
-def run_npu_only(*args):  txt, path = run_core("npu",  *args); return txt, path
-def run_xpu_only(*args):  txt, path = run_core("xpu",  *args); return txt, path
-def run_both   (*args):   txt, path = run_core("both", *args); return txt, path
+def run_npu_only(*args):  yield from run_core("npu",  *args)
+def run_xpu_only(*args):  yield from run_core("xpu",  *args)
+def run_both   (*args):   yield from run_core("both", *args)
 
 # =========================
 # UI
@@ -277,6 +265,7 @@ with gr.Blocks(title="Blueprint NPU+XPU Batch Runner v5") as demo:
     with gr.Row():
         use_wrap  = gr.Checkbox(value=True,  label="Apply engineering wrapper")
         blueprint = gr.Checkbox(value=True,  label="Add BLUEPRINT package (part tree, tolerances, tests)")
+        stream_tokens = gr.Checkbox(value=False, label="Stream tokens (TTFT/ms per token)")
 
     with gr.Row():
         do_save      = gr.Checkbox(value=True, label="Save to ./save/sessions")
@@ -297,10 +286,11 @@ with gr.Blocks(title="Blueprint NPU+XPU Batch Runner v5") as demo:
         gr.Markdown("### Export BLUEPRINTs per model and build a printable pack (BOM/PRINT_QUEUE + zip)")
         use_npu = gr.Checkbox(value=False, label="Include NPU results")
         use_xpu = gr.Checkbox(value=True,  label="Include XPU results")
+        do_mesh = gr.Checkbox(value=False, label="Mesh leaf parts → <session>/meshes/*.stl")
         export_btn = gr.Button("Export BLUEPRINTs / Build Print-Pack (zip)")
         zip_file = gr.File(label="download print_pack.zip", interactive=False)
 
-        def do_export(session_folder, inc_npu, inc_xpu):
+        def do_export(session_folder, inc_npu, inc_xpu, mesh):
             if not session_folder or not Path(session_folder).exists():
                 return None
             # load records back
@@ -311,23 +301,23 @@ with gr.Blocks(title="Blueprint NPU+XPU Batch Runner v5") as demo:
                     try: recs.append(json.loads(ln))
                     except: pass
             if not recs: return None
-            zp = export_blueprints(session_folder, recs, include_npu=inc_npu, include_xpu=inc_xpu)
+            zp, st = export_blueprints(session_folder, recs, include_npu=inc_npu, include_xpu=inc_xpu)
+            print(f"[export] {st}")
+            if mesh: print(f"[mesh] {mesh_session(session_folder)[1]}")
             return zp
 
-        export_btn.click(do_export, [sess_path, use_npu, use_xpu], [zip_file])
+        export_btn.click(do_export, [sess_path, use_npu, use_xpu, do_mesh], [zip_file])
 
     inputs=[prompts, run_count, cycle_fill,
             gen_script, ov_dir, npu_dev, npu_max, npu_off,
             merged_dir, xpu_dtype, xpu_dev, xpu_max,
-            use_wrap, blueprint, do_save, session_name, keep_top, keep_bottom]
-
-    def _wrap(fn, *args):
-        txt, path = fn(*args)
-        return txt, path
+            use_wrap, blueprint, do_save, session_name, keep_top, keep_bottom, stream_tokens]
 
-    btn_npu.click( lambda *a:_wrap(run_npu_only, *a), inputs, [out, sess_path])
-    btn_xpu.click( lambda *a:_wrap(run_xpu_only, *a), inputs, [out, sess_path])
-    btn_both.click(lambda *a:_wrap(run_both,    *a), inputs, [out, sess_path])
+    # 제너레이터 함수를 그대로 연결해야 Gradio 가 스트리밍으로 인식
+    btn_npu.click( run_npu_only, inputs, [out, sess_path])
+    btn_xpu.click( run_xpu_only, inputs, [out, sess_path])
+    btn_both.click(run_both,     inputs, [out, sess_path])
 
-demo.launch(server_name=os.environ.get("GRADIO_SERVER_NAME","127.0.0.1"),
-            server_port=int(os.environ.get("GRADIO_SERVER_PORT","7860")))
+if __name__ == "__main__":   # 내보내기 프로세스 풀(spawn)이 재임포트할 때 서버를 띄우지 않도록
+    demo.launch(server_name=os.environ.get("GRADIO_SERVER_NAME","127.0.0.1"),
+                server_port=int(os.environ.get("GRADIO_SERVER_PORT","7860")))
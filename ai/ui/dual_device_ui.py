@@ -1,20 +1,31 @@
-﻿import argparse, os, subprocess, time, concurrent.futures
+﻿import argparse, os, sys, time, concurrent.futures
 from datetime import datetime
 from pathlib import Path
 import gradio as gr
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]/"cli"))
+from genai_client import get_client
 
 def clean(txt:str)->str:
     return "\n".join([ln for ln in txt.splitlines() if not ln.startswith("[LOG]")]).strip()
 
-def one_job(py, gen, model_dir, device, prompt, offline:bool):
+def one_job(py, gen, model_dir, device, prompt, offline:bool, sink=None):
+    # sink(list) 가 주어지면 토큰 조각을 스트리밍으로 채움
     env = os.environ.copy()
     if offline:
         env.update({"HF_HUB_OFFLINE":"1","TRANSFORMERS_OFFLINE":"1","HF_DATASETS_OFFLINE":"1"})
-    cmd=[py,"-X","utf8",gen,"--model_dir",model_dir,"--device",device,"--max_new_tokens","256","--prompt",prompt]
-    r=subprocess.run(cmd,capture_output=True,text=True,encoding="utf-8",errors="replace",env=env)
-    out=clean(((r.stdout or "")+("\n"+r.stderr if r.stderr else ""))).strip()
+    st={}
+    try:
+        c=get_client(py,gen,env,tag=device)
+        if sink is None:
+            out=clean(c.generate(model_dir,device,prompt,256)).strip()
+        else:
+            for piece in c.stream(model_dir,device,prompt,256,stats=st): sink.append(piece)
+            out=clean("".join(sink)).strip()
+    except Exception as e:
+        out=f"(error) {e}"
     ts=datetime.now().strftime("%H:%M:%S")
-    return f"[{ts}] {out or '(no output)'}"
+    lat=f" (ttft {st['ttft_sec']}s, {st['ms_per_chunk_p50']} ms/tok)" if st else ""
+    return f"[{ts}]{lat} {out or '(no output)'}"
 
 def build_ui(args):
     seeds = "\n".join([
@@ -43,12 +54,18 @@ def build_ui(args):
             xpu_prompts = lines[:int(xpu_n)]
             t0=time.time()
             max_workers=max(len(npu_prompts), len(xpu_prompts), 1)
+            npu_sinks=[[] for _ in npu_prompts]; xpu_sinks=[[] for _ in xpu_prompts]
+            def view(futs, sinks, empty):
+                if not futs: return empty
+                return "\n\n----\n\n".join([f.result() if f.done() else "[…] "+"".join(sk) for f,sk in zip(futs,sinks)])
             with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as ex:
-                npu_futs=[ex.submit(one_job,args.py,args.gen,args.npu_model,"NPU",p,args.offline) for p in npu_prompts]
-                xpu_futs=[ex.submit(one_job,args.py,args.gen,args.xpu_model,"XPU",p,args.offline) for p in xpu_prompts]
-                npu_res=[f.result() for f in npu_futs] if npu_futs else ["(no NPU jobs)"]
-                xpu_res=[f.result() for f in xpu_futs] if xpu_futs else ["(no XPU jobs)"]
-            return "\n\n----\n\n".join(npu_res), "\n\n----\n\n".join(xpu_res), f"완료: {time.time()-t0:.1f}s"
+                npu_futs=[ex.submit(one_job,args.py,args.gen,args.npu_model,"NPU",p,args.offline,sk) for p,sk in zip(npu_prompts,npu_sinks)]
+                xpu_futs=[ex.submit(one_job,args.py,args.gen,args.xpu_model,"XPU",p,args.offline,sk) for p,sk in zip(xpu_prompts,xpu_sinks)]
+                # 생성되는 토큰을 0.25s 간격으로 UI 에 흘려보냄
+                while not all(f.done() for f in npu_futs+xpu_futs):
+                    yield view(npu_futs,npu_sinks,"(no NPU jobs)"), view(xpu_futs,xpu_sinks,"(no XPU jobs)"), f"진행중: {time.time()-t0:.1f}s"
+                    time.sleep(0.25)
+            yield view(npu_futs,npu_sinks,"(no NPU jobs)"), view(xpu_futs,xpu_sinks,"(no XPU jobs)"), f"완료: {time.time()-t0:.1f}s"
 
         run_btn.click(run_batch,[prompts,npu_k,xpu_k],[npu_out,xpu_out,status])
     demo.queue(api_open=False).launch(server_name="0.0.0.0", server_port=args.port, share=False)
@@ -1,6 +1,10 @@
-﻿import os, subprocess, textwrap
+﻿import os, sys, textwrap, threading
 from pathlib import Path
 import gradio as gr
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]/"cli"))
+from genai_client import get_client
+from hf_batcher import get_batcher, close_batcher
+from streaming import stream_hf, Timed
 
 # ---------------------- Utils ----------------------
 def _clean(txt:str)->str:
@@ -67,13 +71,14 @@ def add_to_batch(batch_txt, built):  # 복사 누락 방지: 단순 합치기
     return (batch_txt + ("\n" if batch_txt and not batch_txt.endswith("\n") else "") + built) if built else batch_txt
 
 # ---------------------- XPU (HF merged) ----------------------
-_x = {"path":None,"tok":None,"model":None,"dev":"cpu","dtype":"fp32"}
+_x = {"path":None,"tok":None,"model":None,"dev":"cpu","dtype":"fp32","req":None,"lock":None}   # lock: 배처/스트리밍 공용(모델 1개당 1개)
 def _load_xpu(merged:str,dtype:str,device:str):
     from transformers import AutoTokenizer, AutoModelForCausalLM
     import torch
     merged=str(Path(merged))
-    if _x["path"]==merged and _x["model"] is not None and _x["dtype"]==dtype and _x["dev"]==device:
+    if _x["path"]==merged and _x["model"] is not None and _x["dtype"]==dtype and _x["req"]==device:   # req = 요청 장치("auto" 그대로)
         return _x
+    close_batcher(_x["model"]); _x.update(tok=None,model=None)   # 이전 모델 배처 종료 → 가중치 해제
     dt = torch.float32 if dtype=="fp32" else torch.bfloat16
     tok = AutoTokenizer.from_pretrained(merged, use_fast=True, local_files_only=True)
     model = AutoModelForCausalLM.from_pretrained(merged, torch_dtype=dt, local_files_only=True).eval()
@@ -84,40 +89,72 @@ def _load_xpu(merged:str,dtype:str,device:str):
     else: dev=device
     try: model.to(dev)
     except Exception: dev="cpu"
-    _x.update(path=merged,tok=tok,model=model,dev=dev,dtype=dtype)
+    _x.update(path=merged,tok=tok,model=model,dev=dev,dtype=dtype,req=device,lock=threading.Lock())
     return _x
 
+def submit_xpu(prompt, merged, max_new_tokens, dtype, device):
+    """동적 배처에 넣고 Future 반환 (동시에 들어온 프롬프트는 한 배치로 generate)"""
+    st=_load_xpu(merged,dtype,device)
+    b=get_batcher(st["tok"],st["model"],st["dev"],max_batch=8,window_ms=20,lock=st["lock"])
+    return b.submit(prompt, max_new_tokens=int(max_new_tokens), do_sample=False, temperature=0.0, repetition_penalty=1.05)
+
 def gen_xpu(prompt, merged, max_new_tokens, dtype, device):
     if not prompt.strip(): return ""
+    return submit_xpu(prompt, merged, max_new_tokens, dtype, device).result()["text"]
+
+def stream_xpu(prompt, merged, max_new_tokens, dtype, device):
     st=_load_xpu(merged,dtype,device)
-    tok,model,dev=st["tok"],st["model"],st["dev"]
-    import torch
-    enc=tok(prompt, return_tensors="pt")
-    if dev!="cpu":
-        for k in enc: enc[k]=enc[k].to(dev)
-    out=model.generate(**enc, max_new_tokens=int(max_new_tokens), do_sample=False, temperature=0.0, repetition_penalty=1.05)
-    return tok.decode(out[0], skip_special_tokens=True)
+    return stream_hf(st["tok"],st["model"],st["dev"],prompt, lock=st["lock"], max_new_tokens=int(max_new_tokens), do_sample=False, repetition_penalty=1.05)
 
 # ---------------------- NPU (OpenVINO runner) ----------------------
 def gen_npu(prompt, gen_py, model_dir, device, max_new_tokens, offline_mode):
     if not prompt.strip(): return ""
     py = os.environ.get("PY_EXE","python")
     env = _offline_env(offline_mode)
-    # 동일 래퍼 사용(모델 일관성 증가)
-    cmd=[py,"-X","utf8",gen_py,"--model_dir",model_dir,"--device",device,"--max_new_tokens",str(int(max_new_tokens)),"--prompt",prompt]
-    r=subprocess.run(cmd,capture_output=True,text=True,encoding="utf-8",errors="replace",env=env,timeout=900)
-    return _clean(((r.stdout or "") + ("\n"+r.stderr if r.stderr else "")))
+    # 상주 genai_run(--serve) 재사용: 프롬프트마다 인터프리터/컴파일 반복 없음
+    try:
+        return _clean(get_client(py,gen_py,env,tag=device).generate(model_dir,device,prompt,int(max_new_tokens),timeout=900))
+    except Exception as e:
+        return f"(NPU run error) {e}"
+
+def stream_npu(prompt, gen_py, model_dir, device, max_new_tokens, offline_mode):
+    py = os.environ.get("PY_EXE","python")
+    return get_client(py,gen_py,_offline_env(offline_mode),tag=device).stream(model_dir,device,prompt,int(max_new_tokens),timeout=900)
 
 # ---------------------- Batch Runner ----------------------
-def run_batch(prompts, run_count, gen_py, npu_model_dir, npu_device, npu_tokens, npu_offline, merged_dir, xpu_dtype, xpu_device, xpu_tokens):
+def _block(i,p,n,x,n_lat="",x_lat=""):
+    return f"### {i}. Prompt\n{p}\n\n**NPU**{n_lat}\n```\n{n}\n```\n**XPU**{x_lat}\n```\n{x}\n```"
+
+def run_batch(prompts, run_count, gen_py, npu_model_dir, npu_device, npu_tokens, npu_offline, merged_dir, xpu_dtype, xpu_device, xpu_tokens, stream_tokens=False):
     lines=[l.strip() for l in (prompts or "").splitlines() if l.strip()]
     lines=lines[:max(1,min(int(run_count),5))]
     out=[]
-    for i,p in enumerate(lines,1):
+    join=lambda cur: "\n\n---\n\n".join(out+[cur] if cur else out)
+    if stream_tokens:
+        # 토큰 스트리밍: 프롬프트마다 NPU → XPU 순서로 조각 단위 갱신(TTFT 표시)
+        for i,p in enumerate(lines,1):
+            n=x=""; n_lat=x_lat=""
+            try:
+                tg=Timed(stream_npu(p,gen_py,npu_model_dir,npu_device,int(npu_tokens),npu_offline))
+                for piece in tg:
+                    n+=piece; yield join(_block(i,p,n,x))
+                n_lat=f" ({tg.summary()})"
+            except Exception as e: n=f"(NPU run error) {e}"
+            try:
+                tg=Timed(stream_xpu(p,merged_dir,int(xpu_tokens),xpu_dtype,xpu_device))
+                for piece in tg:
+                    x+=piece; yield join(_block(i,p,_clean(n),x,n_lat))
+                x_lat=f" ({tg.summary()})"
+            except Exception as e: x=f"(XPU error) {e}"
+            out.append(_block(i,p,_clean(n),x,n_lat,x_lat)); yield join("")
+        return
+    # XPU 는 먼저 전부 배처에 제출(한 배치로 실행) → NPU 와 동시에 진행
+    xfuts=[submit_xpu(p,merged_dir,int(xpu_tokens),xpu_dtype,xpu_device) for p in lines]
+    for i,(p,xf) in enumerate(zip(lines,xfuts),1):
         n=gen_npu(p,gen_py,npu_model_dir,npu_device,int(npu_tokens),npu_offline)
-        x=gen_xpu(p,merged_dir,int(xpu_tokens),xpu_dtype,xpu_device)
-        out.append(f"### {i}. Prompt\n{p}\n\n**NPU**\n```\n{n}\n```\n**XPU**\n```\n{x}\n```")
-    return "\n\n---\n\n".join(out)
+        try: x=xf.result()["text"]
+        except Exception as e: x=f"(XPU error) {e}"
+        out.append(_block(i,p,n,x)); yield join("")
 
 # ---------------------- UI ----------------------
 default_prompts = """[SYSTEM]
@@ -191,10 +228,12 @@ with gr.Blocks(title="Blueprint Dual UI v2") as demo:
             xpu_device = gr.Dropdown(choices=["auto","cpu","xpu","cuda"], value="auto", label="device")
             xpu_tokens = gr.Slider(16,512,step=16,value=128,label="Max new tokens")
 
-    run_btn = gr.Button("Run Both")
+    with gr.Row():
+        run_btn = gr.Button("Run Both")
+        stream_tokens = gr.Checkbox(value=True, label="Stream tokens (TTFT 표시)")
     out_md = gr.Markdown()
     run_btn.click(run_batch,
-        [prompts, run_count, gen_py, npu_model_dir, npu_device, npu_tokens, npu_offline, merged_dir, xpu_dtype, xpu_device, xpu_tokens],
+        [prompts, run_count, gen_py, npu_model_dir, npu_device, npu_tokens, npu_offline, merged_dir, xpu_dtype, xpu_device, xpu_tokens, stream_tokens],
         [out_md])
 
 if __name__ == "__main__":
@@ -1,41 +1,85 @@
-﻿import gradio as gr, json, glob, os, pandas as pd, pathlib
+﻿import gradio as gr, os, sys, math, functools, pandas as pd, pathlib
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]/"cli"))
+from session_index import SessionIndex
+SESS=pathlib.Path(__file__).resolve().parents[2]/"save"/"sessions"   # 실행 위치와 무관하게 저장소 기준
+_IDX=None
+def idx():
+    # 처음 쓸 때 생성(import 만으로 index.sqlite 를 만들지 않음)
+    global _IDX
+    if _IDX is None: _IDX=SessionIndex(SESS/"index.sqlite", SESS)
+    return _IDX
 def latest_run():
-    paths=sorted(glob.glob("save/sessions/*_dual_batch_v3/run.jsonl"), key=os.path.getmtime)
-    return paths[-1] if paths else ""
-def load_jsonl(p):
-    recs=[]
-    for ln in open(p,encoding="utf-8"):
-        recs.append(json.loads(ln))
-    return recs
-def table_src(p):
-    recs=load_jsonl(p)
-    rows=[]
-    for i,r in enumerate(recs,1):
-        rows.append({
-            "#":i, "topic":r["topic"], "elapsed":r["elapsed_sec"],
-            "ov_pass": int(r["qa"]["ov"]["pass"]), "hf_pass": int(r["qa"]["hf"]["pass"])
-        })
-    return pd.DataFrame(rows)
-def read_detail(p, idx):
-    recs=load_jsonl(p); i=int(idx)-1
-    if i<0 or i>=len(recs): return "", "", ""
-    r=recs[i]
-    return r["topic"], r["ov"]["out"], r["hf"]["out"]
+    return idx().latest("dual_batch_v3")
+COLS=["#","topic","elapsed","ov_pass","hf_pass"]
+PAGE=50
+@functools.lru_cache(maxsize=128)
+def _page(p, size, mtime, page, page_size):
+    # (size, mtime) 가 키에 들어가므로 파일이 바뀌면 자동 무효화
+    rows=idx().rows(p, (page-1)*page_size, page_size)
+    return pd.DataFrame([{"#":r["idx"]+1,"topic":r["topic"],"elapsed":r["elapsed"],"ov_pass":r["ov_pass"],"hf_pass":r["hf_pass"]} for r in rows], columns=COLS)
+def table_src(p, page=1, page_size=PAGE, tail=False):
+    """-> (DataFrame, page, info). 새로 붙은 줄만 색인(증분), 한 페이지만 조회. tail=True 면 마지막 페이지"""
+    if not p or not os.path.exists(p): return pd.DataFrame(columns=COLS), 1, "no file"
+    st=os.stat(p)   # 색인 전에 stat → 색인 도중 추가된 줄은 다음 갱신 때 반영
+    idx().scan_file(p)
+    page_size=max(1,int(page_size or PAGE)); n=idx().count(p); pages=max(1,math.ceil(n/page_size))
+    page=pages if tail else min(max(1,int(page or 1)),pages)
+    return _page(p, st.st_size, st.st_mtime, page, page_size), page, f"page {page}/{pages} · {n} records"
+def read_detail(p, row):
+    # 색인된 바이트 오프셋으로 레코드 1개만 읽음(row = 화면의 # 열, 1부터)
+    if not p or row is None: return "", "", ""
+    idx().scan_file(p)
+    r=idx().read(p, int(row)-1)
+    if r is None: return "", "", ""
+    return r.get("topic",""), (r.get("ov") or {}).get("out",""), (r.get("hf") or {}).get("out","")
+def search(topic, session, ov_pass, hf_pass):
+    idx().scan()
+    qp=lambda v: None if v in ("", None, "any") else int(v)
+    rows=idx().query(topic=topic or None, session=session or None, ov_pass=qp(ov_pass), hf_pass=qp(hf_pass), limit=500)
+    return pd.DataFrame([{"session":r["name"],"#":r["idx"]+1,"topic":r["topic"],"ov":r["ov_key"],"hf":r["hf_key"],
+                          "ov_pass":r["ov_pass"],"hf_pass":r["hf_pass"],"elapsed":r["elapsed"],"path":r["session"]} for r in rows],
+                        columns=["session","#","topic","ov","hf","ov_pass","hf_pass","elapsed","path"])
 def app():
     with gr.Blocks() as demo:
         gr.Markdown("# Dual Batch v3 Viewer")
         run_path=gr.Textbox(value=latest_run(), label="run.jsonl path")
-        btn=gr.Button("Load")
-        tbl=gr.Dataframe(headers=["#","topic","elapsed","ov_pass","hf_pass"], interactive=False)
-        idx=gr.Number(value=1, precision=0, label="row #")
+        with gr.Row():
+            btn=gr.Button("Load")
+            prev_b=gr.Button("◀ Prev"); next_b=gr.Button("Next ▶")
+            page=gr.Number(value=1, precision=0, label="page")
+            page_size=gr.Number(value=PAGE, precision=0, label="rows/page")
+            follow=gr.Checkbox(value=False, label="Follow (live tail)")
+        info=gr.Markdown()
+        tbl=gr.Dataframe(headers=COLS, interactive=False)
+        row_no=gr.Number(value=1, precision=0, label="row #")
         topic=gr.Textbox(label="topic")
         ov=gr.Markdown(label="ov_out")
         hf=gr.Markdown(label="hf_out")
-        def _load(p): 
-            import pandas as pd
-            return table_src(p)
-        btn.click(_load, inputs=run_path, outputs=tbl)
-        idx.change(read_detail, inputs=[run_path,idx], outputs=[topic,ov,hf])
+        def _load(p, pg, ps): return table_src(p, pg, ps)
+        def _step(d):
+            return lambda p, pg, ps: table_src(p, int(pg or 1)+d, ps)
+        def _tail(p, pg, ps, on):
+            if not on: return gr.update(), gr.update(), gr.update()
+            return table_src(p, pg, ps, tail=True)
+        ins=[run_path,page,page_size]; outs=[tbl,page,info]
+        btn.click(_load, inputs=ins, outputs=outs)
+        prev_b.click(_step(-1), inputs=ins, outputs=outs)
+        next_b.click(_step(+1), inputs=ins, outputs=outs)
+        page_size.submit(_load, inputs=ins, outputs=outs)
+        if hasattr(gr, "Timer"):   # 실행 중인 배치 따라가기: 2초마다 증분 색인 + 마지막 페이지
+            gr.Timer(2.0).tick(_tail, inputs=ins+[follow], outputs=outs)
+        row_no.change(read_detail, inputs=[run_path,row_no], outputs=[topic,ov,hf])
+        with gr.Accordion("Search all sessions", open=False):
+            with gr.Row():
+                q_topic=gr.Textbox(label="topic contains"); q_sess=gr.Textbox(label="session contains")
+                q_ov=gr.Dropdown(["any","1","0"], value="any", label="ov_pass"); q_hf=gr.Dropdown(["any","1","0"], value="any", label="hf_pass")
+            q_btn=gr.Button("Search")
+            q_tbl=gr.Dataframe(interactive=False)
+        q_btn.click(search, inputs=[q_topic,q_sess,q_ov,q_hf], outputs=q_tbl)
+        def _pick(df, evt: gr.SelectData):
+            r=df.iloc[evt.index[0]]   # 검색 결과 행 선택 → 해당 세션/레코드로 이동
+            return r["path"], int(r["#"])
+        q_tbl.select(_pick, inputs=q_tbl, outputs=[run_path, row_no])
     return demo
 if __name__ == "__main__":
     app().launch(server_name="127.0.0.1", server_port=9036)
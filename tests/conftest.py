@@ -0,0 +1,5 @@
+import os, sys
+# ai/cli, ai/train 모듈은 스크립트처럼 sys.path 로 import
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for d in ("ai/cli", "ai/train"):
+    sys.path.insert(0, os.path.join(ROOT, d))
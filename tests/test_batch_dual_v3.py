@@ -0,0 +1,120 @@
+import batch_dual_v3 as b
+
+def _rec(ov_status="ok", hf_status="ok", ov_key="o", hf_key="h"):
+    return {"topic": "t", "ov": {"key": ov_key, "out": "x", "timing": {"status": ov_status}},
+            "hf": {"key": hf_key, "out": "y", "timing": {"status": hf_status}}}
+
+def test_resume_skips_only_successful_same_models():
+    assert b.succeeded(_rec(), "o", "h")
+    assert not b.succeeded(_rec(ov_status="timeout"), "o", "h")
+    assert not b.succeeded(_rec(hf_status="error"), "o", "h")
+    assert not b.succeeded(_rec(), "o", "other")
+
+def test_resume_legacy_records_without_status():
+    r = {"topic": "t", "ov": {"key": "o", "out": "[TIMEOUT 90s]"}, "hf": {"key": "h", "out": "ok"}}
+    assert not b.succeeded(r, "o", "h")
+    r["ov"]["out"] = "fine"
+    assert b.succeeded(r, "o", "h")
+
+def test_device_scheduler_joins_per_topic():
+    import time
+    s = b.DeviceScheduler({"ov": 1, "hf": 2})
+    def slow(x, d): return lambda: (time.sleep(d), x)[1]
+    f = s.submit({"ov": slow("o", 0.1), "hf": slow("h", 0.01)})
+    r = f.result(5)
+    assert set(r) == {"ov", "hf"} and r["ov"][0] == "o" and r["hf"][0] == "h"
+    assert r["ov"][2] - r["ov"][1] >= 0.09 and r["hf"][2] <= r["ov"][2]
+    def boom(): raise RuntimeError("npu gone")
+    r = s.submit({"ov": boom, "hf": slow("h", 0)}).result(5)
+    assert r["ov"][0] == ("[ERR] npu gone", {}) and r["hf"][0] == "h"   # 한 장치 실패가 토픽 전체를 막지 않음
+    s.shutdown()
+
+def test_device_scheduler_devices_do_not_wait_for_each_other():
+    import threading, time
+    s = b.DeviceScheduler({"ov": 1, "hf": 1})
+    gate, hf_done = threading.Event(), []
+    def ov(): gate.wait(5); return "o"
+    def hf(i): return lambda: (hf_done.append(i), "h")[1]
+    futs = [s.submit({"ov": ov, "hf": hf(i)}) for i in range(4)]
+    t0 = time.time()
+    while len(hf_done) < 4 and time.time()-t0 < 5: time.sleep(0.01)
+    assert hf_done == [0, 1, 2, 3] and not any(f.done() for f in futs)   # HF 큐는 OV 가 막혀도 계속 소화, 합류는 둘 다 끝나야
+    gate.set()
+    assert all(f.result(5)["ov"][0] == "o" for f in futs)
+    s.shutdown()
+
+def _ok(topic, ov="o", hf="h"):
+    return {"topic": topic, "ov": {"key": ov, "out": "x", "timing": {"status": "ok"}}, "hf": {"key": hf, "out": "y", "timing": {"status": "ok"}}}
+
+def test_resume_session_drops_truncated_line_and_moves_failures(tmp_path):
+    import json
+    jp = tmp_path / "run.jsonl"
+    bad = _ok("b"); bad["hf"]["timing"]["status"] = "timeout"
+    lines = [json.dumps(r) for r in (_ok("a"), bad, _ok("c", hf="old"), _ok("z"))] + ["[1, 2]", json.dumps(_ok("d"))[:25]]
+    jp.write_text("\n".join(lines), encoding="utf-8")   # 마지막 줄은 개행 없이 잘림
+    prev, todo, skipped, redo = b.resume_session(jp, ["a", "b", "c", "d"], "o", "h")
+    assert [r["topic"] for r in prev] == ["a", "z"] and skipped == ["a"] and todo == ["b", "c", "d"]
+    assert [r["topic"] for r in redo] == ["b", "c"]
+    assert [json.loads(l)["topic"] for l in jp.read_text(encoding="utf-8").splitlines()] == ["a", "z"]
+    assert [json.loads(l)["topic"] for l in (tmp_path / "run.replaced.jsonl").read_text(encoding="utf-8").splitlines()] == ["b", "c"]
+    with jp.open("a", encoding="utf-8") as f: f.write(json.dumps(_ok("b")) + "\n")   # 이어쓴 줄이 잘린 줄에 붙지 않음
+    prev, todo, skipped, _ = b.resume_session(jp, ["a", "b", "c", "d"], "o", "h")
+    assert skipped == ["a", "b"] and todo == ["c", "d"]
+
+def test_result_cache_keys_and_persistence(tmp_path):
+    from result_cache import ResultCache, make_key
+    k = make_key(topic="t", temp=0.0, stops=["a", "b"])
+    assert k == make_key(stops=["a", "b"], temp=0.0, topic="t") and len(k) == 64
+    assert k != make_key(topic="t", temp=0.0, stops=["b", "a"]) != make_key(topic="t", temp=0.1, stops=["a", "b"])
+    c = ResultCache(tmp_path)
+    assert c.get(k) is None
+    c.put(k, {"out": "한글 결과"}, meta={"topic": "t"})
+    assert c.get(k) == {"out": "한글 결과"} and ResultCache(tmp_path).get(k) == {"out": "한글 결과"}
+    assert not list(tmp_path.rglob("*.tmp"))
+
+def _args(**kw):
+    from types import SimpleNamespace
+    a = dict(ov_key="o", hf_key="h", ov_device="NPU", hf_device="xpu", max_new_tokens=8, temp=0.0, top_p=0.9, top_k=40, rep_pen=1.1,
+             cache="auto", timeout_sec=5, retries=0, retry_backoff_sec=0, abort_grace_sec=1, prefix_cache="off", hf_batch=1, hf_batch_window_ms=0)
+    a.update(kw); return SimpleNamespace(**a)
+
+def _run(monkeypatch, cache, args, topic="t", fail=()):
+    calls = {"ov": 0, "hf": 0}
+    def gen(k):
+        def f(*a, stats=None, **kw):
+            calls[k] += 1
+            if k in fail: raise RuntimeError("boom")
+            return f"{k} {topic} #{calls[k]}"
+        return f
+    monkeypatch.setattr(b, "ov_generate", gen("ov")); monkeypatch.setattr(b, "hf_generate", gen("hf"))
+    tasks, finish = b.make_worker("ovdir", "hfid", "sys", "usr {topic}", args, cache=cache)
+    t = tasks(topic)
+    return {k: t[k]() for k in t}, calls
+
+def test_auto_cache_only_for_deterministic_settings(tmp_path, monkeypatch):
+    from result_cache import ResultCache
+    c = ResultCache(tmp_path)
+    r1, _ = _run(monkeypatch, c, _args(temp=0.7))
+    r2, calls = _run(monkeypatch, c, _args(temp=0.7))
+    assert calls == {"ov": 0, "hf": 1}   # OV(greedy)는 재사용, 샘플링 HF 는 매번 생성
+    assert r2["ov"] == (r1["ov"][0], {"status": "ok", "cached": True, "orig": r1["ov"][1]})
+    _run(monkeypatch, c, _args(temp=0.0))
+    r4, calls = _run(monkeypatch, c, _args(temp=0.0))
+    assert calls == {"ov": 0, "hf": 0} and r4["hf"][1]["cached"]
+    _, calls = _run(monkeypatch, c, _args(temp=0.0, max_new_tokens=9))   # 생성 파라미터가 다르면 다른 키
+    assert calls == {"ov": 1, "hf": 1}
+    _, calls = _run(monkeypatch, c, _args(temp=0.0), topic="u")
+    assert calls == {"ov": 1, "hf": 1}
+    _run(monkeypatch, c, _args(temp=0.7, cache="on"))
+    _, calls = _run(monkeypatch, c, _args(temp=0.7, cache="on"))
+    assert calls == {"ov": 0, "hf": 0}
+
+def test_failures_are_not_cached(tmp_path, monkeypatch):
+    from result_cache import ResultCache
+    c = ResultCache(tmp_path)
+    r, _ = _run(monkeypatch, c, _args(), fail=("hf",))
+    assert r["hf"][0].startswith("[ERR]") and r["hf"][1]["status"] == "error"
+    _, calls = _run(monkeypatch, c, _args())
+    assert calls == {"ov": 0, "hf": 1}
+    _, calls = _run(monkeypatch, None, _args())   # --cache off
+    assert calls == {"ov": 1, "hf": 1}
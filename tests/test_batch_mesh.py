@@ -0,0 +1,25 @@
+import json
+import batch_mesh
+
+def _session(tmp_path, kids):
+    d = tmp_path/"blueprints"/"01_topic"/"ov"; d.mkdir(parents=True)
+    (d/"part_tree.json").write_text(json.dumps({"id": "r", "name": "engine", "children": kids}), encoding="utf-8")
+    return tmp_path
+
+def test_bad_params_are_clamped_or_reported(tmp_path):
+    kids = [{"id": "a", "name": "nozzle", "geometry": {"channels": -3}},
+            {"id": "b", "name": "nozzle", "geometry": {"segments": 0}},
+            {"id": "c", "name": "tank", "geometry": {"radius": "1e999", "wall": -1}},
+            {"id": "d", "name": "tank", "geometry": {"wall": 1e-9, "length": 5}},
+            {"id": "e", "name": "ring"}]
+    man, st = batch_mesh.mesh_session(_session(tmp_path, kids))
+    parts = {p["id"]: p for p in json.load(open(man, encoding="utf-8"))["parts"]}
+    assert all(parts[k].get("stl") and "error" not in parts[k] for k in "abce")
+    assert "error" in parts["d"] and "stl" not in parts["d"] and st["errors"] == 1
+
+def test_rerun_uses_cache(tmp_path):
+    root = _session(tmp_path, [{"id": "a", "name": "ring"}, {"id": "b", "name": "ring"}])
+    _, st = batch_mesh.mesh_session(root)
+    assert st["unique"] == 1 and st["meshed"] == 1
+    _, st = batch_mesh.mesh_session(root)
+    assert st["cached"] == 1 and st["meshed"] == 0
@@ -0,0 +1,54 @@
+import json, os, subprocess, sys
+import pytest
+from conftest import ROOT
+bench = pytest.importorskip("bench")
+
+def _row(model="m", device="CPU", n=64, **kw):
+    r = {"model": model, "backend": "hf", "device": device, "max_new_tokens": n, "load_sec": 1.0, "ttft_sec_p50": 0.2,
+         "latency_sec_p50": 2.0, "latency_sec_p95": 3.0, "tok_per_sec": 30.0, "peak_rss_mb": 500.0}
+    r.update(kw); return r
+
+def test_compare_tolerance_direction():
+    prev = {"results": [_row()]}
+    lines, bad = bench.compare({"results": [_row(tok_per_sec=26.0)]}, prev, tol=0.10)   # -13% (클수록 좋음)
+    assert bad == 1 and any("tok_per_sec" in ln and "⚠" in ln for ln in lines)
+    assert bench.compare({"results": [_row(tok_per_sec=26.0)]}, prev, tol=0.20)[1] == 0
+    assert bench.compare({"results": [_row(tok_per_sec=40.0, latency_sec_p50=1.0)]}, prev)[1] == 0   # 개선은 회귀 아님
+    assert bench.compare({"results": [_row(latency_sec_p95=3.5, ttft_sec_p50=0.21)]}, prev)[1] == 1   # +16.7% / +5%
+
+def test_compare_matches_rows_by_key():
+    prev = {"results": [_row(device="cpu", load_sec=0), _row(n=256, tok_per_sec=100.0)]}
+    cur = {"results": [_row(device="CPU", load_sec=9.0), _row(model="new")]}
+    lines, bad = bench.compare(cur, prev)
+    assert bad == 0 and not any("load_sec" in ln for ln in lines)   # 장치 대소문자 무시, 이전 0 은 비교 안 함, 새 모델은 건너뜀
+    assert sum(ln.startswith("| m |") for ln in lines) == 5
+
+def test_compare_counts_new_errors():
+    prev = {"results": [_row(), _row(device="NPU", error="boom")]}
+    cur = {"results": [_row(error="RuntimeError: x"), _row(device="NPU", error="boom")]}
+    lines, bad = bench.compare(cur, prev)
+    assert bad == 1 and lines[-1].endswith("| error | ok | RuntimeError: x | ⚠ |")
+
+def test_table_rows_and_errors():
+    lines = bench.table([_row(model="/models/llama1b"), {"model": "x", "backend": "ov", "device": "NPU", "max_new_tokens": 64, "error": "E"}])
+    assert lines[2].startswith("| llama1b | hf | CPU | 64 | 1.0 | 0.2 | 30.0 | 2.0 | 3.0 | 500.0 |")
+    assert all(ln.count("|") == lines[0].count("|") for ln in lines[2:])
+
+def test_cli_on_tiny_local_model(tmp_path):
+    tiny_hf = pytest.importorskip("tiny_hf")
+    md = tmp_path / "tiny"; tiny_hf.model().save_pretrained(md); tiny_hf.tokenizer().save_pretrained(md)
+    prompts = tmp_path / "p.txt"; prompts.write_text("w1 w2 w3\nw4 w5\n", encoding="utf-8")
+    out = tmp_path / "b.json"
+    cmd = [sys.executable, os.path.join(ROOT, "ai", "cli", "bench.py"), "--backend", "hf", "--models", str(md), "--devices", "cpu",
+           "--max_new_tokens", "4,8", "--prompts", str(prompts), "--warmup", "0", "--out", str(out)]
+    r = subprocess.run(cmd, capture_output=True, text=True, encoding="utf-8", cwd=tmp_path)
+    assert r.returncode == 0, r.stderr
+    res = json.loads(out.read_text(encoding="utf-8"))
+    assert [x["max_new_tokens"] for x in res["results"]] == [4, 8] and all(not x.get("error") and x["runs"] == 2 for x in res["results"])
+    assert res["results"][1]["new_tokens_avg"] == 8 and res["results"][0]["tok_per_sec"] > 0
+    prev = tmp_path / "prev.json"
+    # 실측 지연/RSS 는 실행마다 흔들리므로 tok/s 만 남겨 비교(나머지 지표는 prev 에 없으면 건너뜀)
+    prev.write_text(json.dumps({"results": [{k: x[k] for k in ("model", "backend", "device", "max_new_tokens")} | {"tok_per_sec": x["tok_per_sec"]*100}
+                                            for x in res["results"]]}), encoding="utf-8")
+    r = subprocess.run(cmd + ["--compare", str(prev), "--fail_on_regress"], capture_output=True, text=True, encoding="utf-8", cwd=tmp_path)
+    assert r.returncode == 1 and "[compare] regressions: 2" in r.stdout
@@ -0,0 +1,54 @@
+import json, zipfile
+import blueprint_export as be
+
+def _txt(name, qty=1):
+    tree = {"id": "r", "name": name, "material": "Inconel 718", "process": "SLM",
+            "children": [{"id": "n", "name": "nozzle", "qty": qty}]}
+    return f"# {name}\n```part_tree {json.dumps(tree)}```\n"
+
+def _recs(n=3, **over):
+    recs = [{"idx": i, "topic": f"topic {i}", "npu": _txt(f"engine{i}"), "xpu": f"plain text {i}"} for i in range(n)]
+    for i, v in over.items(): recs[int(i[1:])]["npu"] = v
+    return recs
+
+def _mtimes(root):
+    return {p: p.stat().st_mtime_ns for p in (root / "blueprints").rglob("*") if p.is_file()} | {"zip": (root / "print_pack.zip").stat().st_mtime_ns}
+
+def test_unchanged_reexport_skips_everything(tmp_path):
+    z, st = be.export_blueprints(tmp_path, _recs())
+    assert st == {"items": 6, "parsed": 6, "skipped": 0, "zip": True, "print_queue": 6}
+    before = _mtimes(tmp_path)
+    z2, st = be.export_blueprints(tmp_path, _recs())
+    assert z2 == z and st["parsed"] == 0 and st["skipped"] == 6 and not st["zip"]
+    assert _mtimes(tmp_path) == before
+
+def test_one_changed_item_rewrites_and_rezips(tmp_path):
+    be.export_blueprints(tmp_path, _recs())
+    before = _mtimes(tmp_path)
+    z, st = be.export_blueprints(tmp_path, _recs(r1=_txt("engine1", qty=4)))
+    assert st["parsed"] == 1 and st["zip"]
+    changed = {p for p, t in _mtimes(tmp_path).items() if before.get(p) != t}
+    d = tmp_path / "blueprints" / "01_topic_1" / "npu"
+    assert {d / "blueprint.md", d / "part_tree.json", d / "BOM.csv", "zip"} <= changed
+    assert not [p for p in changed if "00_topic_0" in str(p)]
+    with zipfile.ZipFile(z) as zf:
+        assert '"qty": 4' in zf.read("blueprints/01_topic_1/npu/part_tree.json").decode()
+        assert "engine0" in zf.read("blueprints/00_topic_0/npu/part_tree.json").decode()   # 건너뛴 항목은 디스크에서
+        assert zf.read("blueprints/PRINT_QUEUE.csv").decode().count("nozzle") == 3
+
+def test_empty_queue_removes_stale_tables(tmp_path):
+    be.export_blueprints(tmp_path, _recs(1))
+    assert (tmp_path / "blueprints" / "PRINT_QUEUE.csv").exists()
+    z, st = be.export_blueprints(tmp_path, _recs(1, r0="no tree any more"))
+    assert st["print_queue"] == 0 and st["zip"]
+    assert not any((tmp_path / "blueprints" / fn).exists() for fn in be.PRINT_TABLES)
+    assert not (tmp_path / "blueprints" / "00_topic_0" / "npu" / "part_tree.json").exists()
+    with zipfile.ZipFile(z) as zf:
+        assert not [n for n in zf.namelist() if "PRINT_" in n]
+
+def test_process_pool_matches_in_process(tmp_path, monkeypatch):
+    be.export_blueprints(tmp_path / "a", _recs(4))
+    monkeypatch.setattr(be, "POOL_MIN", 2)
+    be.export_blueprints(tmp_path / "b", _recs(4), workers=2)
+    for fn in be.PRINT_TABLES:
+        assert (tmp_path / "a" / "blueprints" / fn).read_text() == (tmp_path / "b" / "blueprints" / fn).read_text()
@@ -0,0 +1,36 @@
+import bom
+
+def test_flatten_eff_qty_and_parents():
+    tree = {"id": "r", "name": "engine", "qty": 2, "children": [
+        {"id": "a", "name": "pump", "qty": 3, "children": [{"id": "b", "name": "impeller", "qty": 4}]},
+        {"id": "c", "name": "nozzle"}]}
+    rows = {r[0]: r for r in bom.flatten(tree)}
+    assert rows["b"][3] == 24 and rows["b"][6] == "a" and rows["b"][7] == 2 and rows["b"][8] == 1
+    assert rows["a"][3] == 6 and rows["a"][8] == 0 and rows["c"][3] == 2
+
+def test_flatten_deep_tree_without_recursion():
+    node = tree = {"id": "0", "name": "n", "qty": 1}
+    for i in range(1, 5000):
+        ch = {"id": str(i), "name": "n", "qty": 1}; node["children"] = [ch]; node = ch
+    rows = bom.flatten(tree)
+    assert len(rows) == 5000 and rows[-1][7] == 4999
+
+def test_bad_qty_counts_as_one():
+    rows = bom.flatten({"id": "r", "qty": "1e999", "children": [{"id": "a", "qty": -2}, {"id": "b", "qty": "x"}]})
+    assert [r[3] for r in rows] == [1, 1, 1]
+
+def test_rollup_merges_same_part_across_records():
+    rows = [{"name": "Injector", "material": "Inconel", "process": "SLM", "eff_qty": 2, "path": "r1", "leaf": 1},
+            {"name": " injector ", "material": "inconel", "process": "slm", "eff_qty": 3, "path": "r2", "leaf": 1},
+            {"name": "Tank", "material": "Al", "process": "FDM", "eff_qty": 1, "path": "r1", "leaf": 1},
+            {"name": "Assembly", "material": "Al", "process": "FDM", "eff_qty": 1, "path": "r1", "leaf": 0}]
+    parts, groups = bom.rollup(rows)
+    assert ["Injector", "Inconel", "SLM", 5, 2] in parts and len(parts) == 2
+    assert groups[0] == ["Inconel", "SLM", 1, 5, 2]
+    _, groups_all = bom.rollup(rows, leaves_only=False)
+    assert ["Al", "FDM", 2, 2, 1] in groups_all
+
+def test_first_occurrence_per_group():
+    import numpy as np
+    inv = np.array([2, 0, 2, 1, 0, 2])
+    assert bom._first(inv, 4).tolist() == [1, 3, 0, 6]   # 없는 그룹은 len(inv)
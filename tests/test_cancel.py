@@ -0,0 +1,63 @@
+import time, threading
+import pytest
+from cancel import Deadline, call_with_deadline
+from batch_dual_v3 import run_with_timeout
+
+def _gen(lock, pre=0.0, steps=100, step=0.02):
+    def fn(dl):
+        time.sleep(pre)   # 로드/컴파일
+        with lock:
+            dl.arm(); n = 0
+            for _ in range(steps):
+                if dl.expired(): dl.aborted = True; break
+                time.sleep(step); n += 1
+            return n
+    return fn
+
+def test_unarmed_deadline_does_not_expire():
+    d = Deadline(0.01, armed=False); time.sleep(0.03)
+    assert not d.expired()
+    d.arm(); time.sleep(0.03)
+    assert d.expired()
+
+def test_load_time_outside_window():
+    st, n = call_with_deadline(_gen(threading.Lock(), pre=0.3), 0.2)
+    assert st == "timeout" and n >= 5
+
+def test_retry_waits_for_abandoned_worker_lock():
+    lock = threading.Lock()
+    def stuck(dl):
+        with lock:
+            dl.arm(); time.sleep(0.6); return "late"
+    assert call_with_deadline(stuck, 0.1, grace=0.1)[0] == "abort"
+    st, n = call_with_deadline(_gen(lock), 0.2)   # lock 대기는 제한 시간 밖 → 온전한 창
+    assert st == "timeout" and n >= 5
+
+def test_errors_and_unarmed_functions():
+    assert call_with_deadline(lambda d: 1/0, 1)[0] == "error"
+    assert call_with_deadline(lambda d: "x", 1) == ("ok", "x")
+
+def test_run_with_timeout_retries_then_succeeds():
+    lock, calls = threading.Lock(), []
+    def fn(dl):
+        calls.append(1)
+        return _gen(lock, steps=100 if len(calls) == 1 else 3)(dl)
+    st = {}
+    assert run_with_timeout(fn, 0.2, retries=2, stats=st) == 3
+    assert st == {"attempts": 2, "timeouts": 1, "aborts": 0, "errors": 0, "status": "ok"}
+    st = {}
+    out = run_with_timeout(lambda d: 1/0, 1, retries=1, backoff_s=0.05, stats=st)
+    assert out.startswith("[ERR]") and st["attempts"] == 2 and st["errors"] == 2 and st["status"] == "error"
+
+def test_hf_generate_stops_at_deadline(tmp_path, monkeypatch):
+    pytest.importorskip("torch"); tiny_hf = pytest.importorskip("tiny_hf")
+    import model_cache, batch_dual_v3 as b
+    md = tmp_path / "tiny"; tiny_hf.model().save_pretrained(md); tiny_hf.tokenizer().save_pretrained(md)
+    monkeypatch.setattr(model_cache, "HF_MODELS", model_cache.Registry(max_items=1))
+    def run(n, timeout_s, st):
+        fn = lambda dl: b.hf_generate(str(md), "cpu", "s", tiny_hf.text(3), n, 0.0, 1.0, 0, 1.0, stats=st, deadline=dl)
+        return run_with_timeout(fn, timeout_s, stats=st)
+    st = {}
+    assert not run(4, 30, st).startswith("[TIMEOUT") and st["new_tokens"] == 4
+    st = {}   # StoppingCriteria 로 생성이 실제로 멈춰야 grace 안에 끝남(abort 아님)
+    assert run(100000, 0.05, st) == "[TIMEOUT 0.05s]" and st["timeouts"] == 1 and st["aborts"] == 0
@@ -0,0 +1,34 @@
+import json, random
+from corpus_stream import MinHashDedup, stream, keep
+
+TEXT = ("노즐 목 직경은 추력과 연소실 압력으로 정한다. 냉각 채널은 벽 두께의 절반 깊이로 파고 "
+        "재생 냉각 유량은 연료 전량을 쓴다. 인젝터 판은 동축 스월 방식으로 배치한다. ") * 3
+
+def test_minhash_near_duplicate_detected():
+    d = MinHashDedup()
+    assert d.seen(TEXT) is False
+    assert d.seen(TEXT.replace("절반", "1/2").upper() + "  ") is True   # 대소문자/공백/단어 하나 차이
+    assert len(d.sigs) == 1
+
+def test_minhash_distinct_texts_kept():
+    rng = random.Random(0); d = MinHashDedup()
+    words = [f"w{i}" for i in range(500)]
+    texts = [" ".join(rng.choice(words) for _ in range(60)) for _ in range(200)]
+    assert sum(d.seen(t) for t in texts) == 0
+    assert all(d.seen(t) for t in texts[:20])
+
+def test_minhash_short_text():
+    d = MinHashDedup()
+    assert d.seen("ab") is False and d.seen("AB ") is True and d.seen("cd") is False
+
+def test_stream_filters_and_dedups(tmp_path):
+    recs = [{"prompt": "p1", "output": TEXT},
+            {"prompt": "p2", "output": TEXT + " "},
+            {"topic": "t", "ov": {"out": "ov out"}, "hf": {"out": "hf out"}, "qa": {"ov": {"pass": True}, "hf": {"pass": False}}},
+            "not a dict"]
+    f = tmp_path / "s.jsonl"
+    f.write_text("\n".join(json.dumps(r, ensure_ascii=False) for r in recs) + "\n{broken\n", encoding="utf-8")
+    st = {}
+    out = list(stream([str(tmp_path)], dedup=MinHashDedup(), stats=st))
+    assert [s["src"] for s in out] == ["log", "ov"] and st == {"read": 4, "filtered": 1, "dup": 1}
+    assert keep({"qa_pass": None, "score": None}, "fail", 5)
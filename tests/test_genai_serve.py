@@ -0,0 +1,78 @@
+import os, sys, time, threading, textwrap
+from concurrent.futures import TimeoutError as FutureTimeout
+import pytest
+from conftest import ROOT
+from genai_client import GenaiClient
+
+# 서버 프로세스에만 보이는 가짜 openvino_genai: 프롬프트 명령으로 동작 선택
+FAKE = textwrap.dedent('''
+    import os, sys, time
+    class GenerationConfig:
+        def __init__(self, max_new_tokens=64): self.max_new_tokens = max_new_tokens
+    class LLMPipeline:
+        def __init__(self, model_dir, device): self.model_dir = model_dir
+        def generate(self, prompt, generation_config=None, streamer=None):
+            cmd, _, arg = prompt.partition(" ")
+            if cmd == "die": os._exit(3)
+            if cmd == "fail": raise RuntimeError("boom")
+            if cmd == "noise":
+                print("[LOG] python print")                     # sys.stdout → stderr 로 돌려짐
+                os.write(1, b"[LOG] native fd1 write\\n"); os.write(1, b'{"id": 1, "ok": true, "out": "forged"}\\n')
+            if cmd == "slow": time.sleep(float(arg.split()[0])); arg = arg.split(" ", 1)[-1]
+            words = arg.split()[:generation_config.max_new_tokens]
+            if streamer:
+                for w in words:
+                    time.sleep(0.02); streamer(w + " ")
+            return "out:" + " ".join(words)
+''')
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / "openvino_genai.py").write_text(FAKE, encoding="utf-8")
+    env = dict(os.environ, PYTHONPATH=str(tmp_path) + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    c = GenaiClient(sys.executable, os.path.join(ROOT, "ai", "cli", "genai_run.py"), env)
+    yield c
+    c.close()
+
+def test_generate_and_ids_match_out_of_order(client, tmp_path):
+    md = str(tmp_path)
+    assert client.generate(md, "CPU", "echo a b c", timeout=30) == "out:a b c"
+    slow = client.submit(md + "/other", "CPU", "slow 0.5 first")   # 다른 파이프라인(lock 별도) → 동시 실행
+    fast = client.submit(md, "CPU", "echo second", max_new_tokens=1)
+    assert fast.result(30)["out"] == "out:second" and not slow.done()   # 먼저 끝난 응답이 먼저, id 로 짝지음
+    r = slow.result(30)
+    assert r["out"] == "out:first" and r["cold"] is True
+    with pytest.raises(RuntimeError, match="boom"): client.generate(md, "CPU", "fail", timeout=30)
+
+def test_interleaved_streams_keep_their_deltas(client, tmp_path):
+    md = str(tmp_path); out = {}; stats = {}
+    def run(tag, n):
+        out[tag] = list(client.stream(md, "CPU", "echo " + " ".join(f"{tag}{i}" for i in range(n)), timeout=30, stats=stats.setdefault(tag, {})))
+    ts = [threading.Thread(target=run, args=(t, 8)) for t in "xy"]
+    [t.start() for t in ts]; [t.join(30) for t in ts]
+    assert out == {t: [f"{t}{i} " for i in range(8)] for t in "xy"}
+    assert all("ttft_sec" in s and "gen_sec" in s for s in stats.values()) and not client._pending
+
+def test_stdout_noise_stays_off_protocol(client, tmp_path):
+    md = str(tmp_path)
+    assert client.generate(md, "CPU", "noise x y", timeout=30) == "out:x y"
+    assert client.generate(md, "CPU", "echo z", timeout=30) == "out:z"
+    time.sleep(0.2)
+    assert any("native fd1 write" in ln for ln in client.stderr_tail) and any("python print" in ln for ln in client.stderr_tail)
+
+def test_server_death_fails_pending_and_restarts(client, tmp_path):
+    md = str(tmp_path)
+    slow = client.submit(md + "/other", "CPU", "slow 5 never")   # 다른 파이프라인에서 진행 중인 요청
+    with pytest.raises(RuntimeError, match="server exited"): client.generate(md, "CPU", "die", timeout=30)
+    r = slow.result(30)
+    assert not r["ok"] and "server exited" in r["error"] and not client._pending
+    assert client.generate(md, "CPU", "echo back", timeout=30) == "out:back"   # 다음 요청은 새 프로세스
+
+def test_timeout_drops_pending_entry(client, tmp_path):
+    md = str(tmp_path)
+    with pytest.raises(FutureTimeout): client.generate(md, "CPU", "slow 0.5 late", timeout=0.1)
+    assert not client._pending
+    with pytest.raises(Exception): next(client.stream(md, "CPU", "slow 0.5 late", timeout=0.1))
+    assert not client._pending
+    time.sleep(0.8)   # 늦게 온 응답은 버려짐
+    assert client.generate(md, "CPU", "echo ok", timeout=30) == "out:ok"
@@ -0,0 +1,28 @@
+import ast, os, re, fnmatch
+from conftest import ROOT
+
+ENTRIES = ["ai/cli/batch_dual_v3.py", "ai/cli/genai_run.py", "scripts/hf_pull_ov_models.py",
+           "ai/ui/quick_ui.py", "ai/ui/blueprint_batch_ui.py", "ai/ui/dual_device_ui.py", "ai/ui/hf_dual_quick_ui.py"]
+
+def _keep():
+    with open(os.path.join(ROOT, "tools", "make_github_min.ps1"), encoding="utf-8-sig") as f:
+        block = f.read().split("$keep = @(", 1)[1].split("\n)", 1)[0]
+    return [p.replace("\\", "/") for p in re.findall(r'"([^"]+)"', block)]
+
+def _local_imports(rel):
+    cli = {f[:-3] for f in os.listdir(os.path.join(ROOT, "ai", "cli")) if f.endswith(".py")}
+    with open(os.path.join(ROOT, rel), encoding="utf-8-sig") as f: tree = ast.parse(f.read())
+    mods = set()
+    for n in ast.walk(tree):
+        if isinstance(n, ast.Import): mods |= {a.name.split(".")[0] for a in n.names}
+        elif isinstance(n, ast.ImportFrom) and n.module: mods.add(n.module.split(".")[0])
+    return {f"ai/cli/{m}.py" for m in mods & cli}
+
+def test_minimal_export_keeps_every_imported_module():
+    keep = _keep(); seen = set(); stack = list(ENTRIES)
+    while stack:
+        rel = stack.pop()
+        if rel in seen: continue
+        seen.add(rel); stack += _local_imports(rel)
+    missing = [r for r in sorted(seen) if not any(fnmatch.fnmatch(r, p) for p in keep)]
+    assert not missing
@@ -0,0 +1,82 @@
+import gc, threading, time, weakref
+import pytest
+pytest.importorskip("torch"); pytest.importorskip("transformers")
+import tiny_hf
+import hf_batcher
+from hf_batcher import Batcher, get_batcher, close_batcher
+from cancel import Deadline
+
+@pytest.fixture(scope="module")
+def tm():
+    return tiny_hf.tokenizer(), tiny_hf.model()
+
+def _single(tok, model, prompt, n):
+    enc = tok(prompt, return_tensors="pt")
+    out = model.generate(**enc, max_new_tokens=n, do_sample=False, pad_token_id=tok.pad_token_id)
+    return tok.decode(out[0, enc["input_ids"].shape[1]:], skip_special_tokens=True)
+
+def _recording(model):
+    calls, gen = [], model.generate
+    def rec(**kw):
+        calls.append((kw["input_ids"].shape[0], kw.get("max_new_tokens"))); return gen(**kw)
+    model.generate = rec
+    return calls
+
+def test_left_pad_batch_matches_single_runs(tm):
+    tok, model = tm
+    side = tok.padding_side
+    b = Batcher(tok, model, "cpu", max_batch=8, window_ms=200)
+    prompts = [tiny_hf.text(n, n*3) for n in (1, 4, 9)]
+    res = [f.result(10) for f in [b.submit(p, max_new_tokens=6, do_sample=False) for p in prompts]]
+    b.close(wait=True)
+    assert [r["batch"] for r in res] == [3, 3, 3] and all(r["new_tokens"] == 6 for r in res)
+    assert [r["new_text"] for r in res] == [_single(tok, model, p, 6) for p in prompts]
+    assert [r["text"] for r in res] == [p + " " + r["new_text"] for p, r in zip(prompts, res)]
+    assert tok.padding_side == side   # 공유 토크나이저 설정 그대로
+
+def test_per_row_deadline_stops_only_that_row(tm):
+    tok, model = tm
+    b = Batcher(tok, model, "cpu", window_ms=200)
+    dl = Deadline(1e-6, armed=False)   # 배치 generate 시작 시 arm → 바로 만료
+    fa = b.submit(tiny_hf.text(3), deadline=dl, max_new_tokens=12, do_sample=False)
+    fb = b.submit(tiny_hf.text(5), max_new_tokens=12, do_sample=False)
+    a, c = fa.result(10), fb.result(10); b.close(wait=True)
+    assert a["batch"] == c["batch"] == 2 and dl.aborted
+    assert a["new_tokens"] <= 1 and c["new_tokens"] == 12
+
+def test_groups_by_generate_kwargs(tm):
+    tok, model = tm[0], tiny_hf.model()
+    calls = _recording(model)
+    b = Batcher(tok, model, "cpu", max_batch=8, window_ms=300)
+    futs = [b.submit(tiny_hf.text(2, i), max_new_tokens=3 + 2*(i % 2), do_sample=False) for i in range(5)]
+    res = [f.result(10) for f in futs]; b.close(wait=True)
+    assert sorted(calls) == [(2, 5), (3, 3)]
+    assert [r["new_tokens"] for r in res] == [3, 5, 3, 5, 3] and b.stats["batches"] == 2 and b.stats["prompts"] == 5
+
+def test_max_batch_splits(tm):
+    tok, model = tm[0], tiny_hf.model()
+    calls = _recording(model)
+    b = Batcher(tok, model, "cpu", max_batch=2, window_ms=300)
+    futs = [b.submit(tiny_hf.text(2, i), max_new_tokens=2, do_sample=False) for i in range(5)]
+    [f.result(10) for f in futs]; b.close(wait=True)
+    assert sum(n for n, _ in calls) == 5 and max(n for n, _ in calls) == 2
+
+def test_shared_lock_serialises_generate(tm):
+    tok, model = tm
+    lock = threading.Lock(); b = Batcher(tok, model, "cpu", window_ms=0, lock=lock)
+    with lock:
+        f = b.submit(tiny_hf.text(2), max_new_tokens=2, do_sample=False)
+        time.sleep(0.2); assert not f.done()   # 스트리밍 등 다른 generate 가 lock 을 쥐는 동안 대기
+    assert f.result(10)["new_tokens"] == 2; b.close(wait=True)
+
+def test_close_batcher_releases_thread_and_model(tm):
+    tok = tm[0]; model = tiny_hf.model()
+    b = get_batcher(tok, model, "cpu")
+    assert get_batcher(tok, model, "cpu") is b and b.submit(tiny_hf.text(2), max_new_tokens=1).result(10)
+    close_batcher(model)
+    assert not b.thread.is_alive() and model not in hf_batcher._BATCHERS
+    with pytest.raises(RuntimeError): b.submit("w1").result(1)
+    b2 = get_batcher(tok, model, "cpu"); assert b2 is not b
+    ref = weakref.ref(model); del model; gc.collect()
+    assert ref() is None   # 배처는 모델을 붙잡지 않음
+    b2.thread.join(5); assert not b2.thread.is_alive()   # 모델 해제 시 finalize → 스레드 종료
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+import mesh3d
+import stl_io
+
+@pytest.mark.parametrize("name", sorted(mesh3d.SHAPES))
+def test_shapes_watertight_positive(name):
+    tris = mesh3d.SHAPES[name](segments=48) if name != "box" else mesh3d.box(size=10)
+    rep = stl_io.check(tris)
+    assert rep["watertight"] and not rep["inverted"]
+    assert mesh3d._signed_volume(tris) > 0
+
+def test_box_volume():
+    assert mesh3d._signed_volume(mesh3d.box(2, 3, 4)) == pytest.approx(24.0, rel=1e-6)
+
+def test_ring_volume_close_to_analytic():
+    v = mesh3d._signed_volume(mesh3d.ring(30, 40, 5, segments=512))
+    assert v == pytest.approx(np.pi*(40**2-30**2)*5, rel=1e-3)
+
+def test_nozzle_channels_are_cavities():
+    bare = mesh3d._signed_volume(mesh3d.nozzle(segments=64))
+    ch = mesh3d.nozzle(channels=24, segments=64)
+    assert 0 < mesh3d._signed_volume(ch) < bare
+    assert stl_io.check(ch)["watertight"]
+
+def test_nozzle_oversized_channels_stay_in_wall():
+    ch = mesh3d.nozzle(channels=24, channel_w=100, channel_d=100, segments=64)
+    assert 0 < mesh3d._signed_volume(ch) < mesh3d._signed_volume(mesh3d.nozzle(segments=64))
@@ -0,0 +1,74 @@
+import threading, time
+import pytest
+from model_cache import Registry, cfg_hash
+
+def _loader(calls, obj, sec=0.0):
+    def f():
+        calls.append(obj); time.sleep(sec); return obj
+    return f
+
+def test_cfg_hash_order_independent():
+    assert cfg_hash({"a": 1, "b": 2}) == cfg_hash({"b": 2, "a": 1}) != cfg_hash({"a": 1, "b": 3})
+    assert cfg_hash(None) == cfg_hash({})
+
+def test_lru_evicts_by_count():
+    r, calls = Registry(max_items=2), []
+    for k in "ab": r.get(k, _loader(calls, k))
+    e, cold = r.get("a", _loader(calls, "a"))   # a 최근 사용 → b 가 가장 오래됨
+    assert not cold and e.obj == "a" and e.hits == 1
+    r.get("c", _loader(calls, "c"))
+    assert [s["key"] for s in r.stats()] == [list("a"), list("c")]
+    _, cold = r.get("b", _loader(calls, "b"))
+    assert cold and calls == ["a", "b", "c", "b"]
+
+def test_lru_evicts_by_mb_and_keeps_current():
+    r, calls = Registry(max_items=10, max_mb=100), []
+    r.get("a", _loader(calls, "a"), size_mb=60)
+    r.get("b", _loader(calls, "b"), size_mb=30)
+    r.get("c", _loader(calls, "c"), size_mb=30)   # 120MB > 100 → a 축출
+    assert [s["key"][0] for s in r.stats()] == ["b", "c"]
+    r.get("d", _loader(calls, "d"), size_mb=500)  # 예산 초과라도 방금 로드한 것은 유지
+    assert [s["key"][0] for s in r.stats()] == ["d"]
+
+def test_configure_shrinks_immediately():
+    r = Registry(max_items=3)
+    for k in "abc": r.get(k, lambda k=k: k)
+    r.configure(max_items=1)
+    assert [s["key"][0] for s in r.stats()] == ["c"]
+    r.configure(max_items=0)   # 최소 1
+    assert r.max_items == 1 and len(r.stats()) == 1
+
+def test_concurrent_get_loads_once():
+    r, calls = Registry(max_items=2), []
+    out = []
+    def w(): out.append(r.get("k", _loader(calls, object(), 0.2)))
+    ths = [threading.Thread(target=w) for _ in range(6)]
+    for t in ths: t.start()
+    for t in ths: t.join()
+    assert len(calls) == 1 and len({id(e.obj) for e, _ in out}) == 1
+    assert sum(cold for _, cold in out) == 1 and r.stats()[0]["hits"] == 5
+
+def test_loader_error_is_not_cached():
+    r, n = Registry(), []
+    def bad():
+        n.append(1); raise RuntimeError("compile failed")
+    with pytest.raises(RuntimeError): r.get("k", bad)
+    with pytest.raises(RuntimeError): r.get("k", bad)
+    assert len(n) == 2 and r.stats() == []
+    e, cold = r.get("k", lambda: "ok")
+    assert cold and e.obj == "ok"
+
+def test_hf_model_loaded_once_for_concurrent_workers(tmp_path, monkeypatch):
+    pytest.importorskip("torch"); tiny_hf = pytest.importorskip("tiny_hf")
+    import model_cache, batch_dual_v3 as b
+    md = tmp_path / "tiny"; tiny_hf.model().save_pretrained(md); tiny_hf.tokenizer().save_pretrained(md)
+    monkeypatch.setattr(model_cache, "HF_MODELS", Registry(max_items=1))
+    out, sts = [None]*4, [{} for _ in range(4)]
+    def w(i): out[i] = b.hf_generate(str(md), "cpu", "s", tiny_hf.text(3), 5, 0.0, 1.0, 0, 1.0, stats=sts[i])
+    ths = [threading.Thread(target=w, args=(i,)) for i in range(4)]
+    for t in ths: t.start()
+    for t in ths: t.join()
+    assert len(set(out)) == 1 and [s["new_tokens"] for s in sts] == [5]*4
+    assert sum(s["cold"] for s in sts) == 1 and sum(s["load_sec"] > 0 for s in sts) <= 1
+    st = model_cache.HF_MODELS.stats()
+    assert len(st) == 1 and st[0]["hits"] == 3 and st[0]["size_mb"] > 0
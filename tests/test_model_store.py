@@ -0,0 +1,52 @@
+import os
+import model_store as ms
+
+class CountingSource(ms.LocalSource):
+    def __init__(self, root):
+        super().__init__(root); self.lists = 0; self.fetches = 0
+    def list_files(self, repo):
+        self.lists += 1; return super().list_files(repo)
+    def fetch(self, repo, rel, dest_dir):
+        self.fetches += 1; return super().fetch(repo, rel, dest_dir)
+
+def _mirror(tmp_path):
+    base = tmp_path / "mirror" / "org" / "tiny-ov"; (base / "sub").mkdir(parents=True)
+    (base / "openvino_model.xml").write_text("<net/>")
+    (base / "openvino_model.bin").write_bytes(os.urandom(4096))
+    (base / "sub" / "tokenizer_config.json").write_text("{}")
+    (base / "README.md").write_text("not allowed")
+    return CountingSource(tmp_path / "mirror"), [("tiny", "org/tiny-ov", str(tmp_path / "models" / "tiny"))]
+
+def test_pull_then_skip_network(tmp_path):
+    src, items = _mirror(tmp_path); d = items[0][2]
+    st = ms.pull(items, src, log=lambda *_: None)["tiny"]
+    assert st["fetched"] == 3 and "error" not in st and not os.path.exists(os.path.join(d, "README.md"))
+    man = ms.load_manifest(d)
+    assert man["complete"] and set(man["files"]) == {"openvino_model.xml", "openvino_model.bin", "sub/tokenizer_config.json"}
+    st = ms.pull(items, src, log=lambda *_: None)["tiny"]
+    assert st == {"fetched": 0, "skipped": 3, "bytes": 0} and src.lists == 1 and src.fetches == 3
+
+def test_adopt_existing_files_without_manifest(tmp_path):
+    src, items = _mirror(tmp_path); d = items[0][2]
+    ms.pull(items, src, log=lambda *_: None); os.remove(os.path.join(d, ms.MANIFEST))
+    st = ms.pull(items, src, log=lambda *_: None)["tiny"]
+    assert st["fetched"] == 0 and st["skipped"] == 3 and src.fetches == 3
+
+def test_verify_detects_damage_and_repull_fixes(tmp_path):
+    src, items = _mirror(tmp_path); d = items[0][2]
+    ms.pull(items, src, log=lambda *_: None)
+    assert ms.verify(items, log=lambda *_: None)["tiny"] == {"ok": 3, "damaged": [], "missing": []}
+    p = os.path.join(d, "openvino_model.bin")
+    with open(p, "r+b") as f: f.write(b"\0" * 16)   # 같은 크기로 손상
+    os.remove(os.path.join(d, "openvino_model.xml"))
+    res = ms.verify(items, log=lambda *_: None)["tiny"]
+    assert res == {"ok": 1, "damaged": ["openvino_model.bin"], "missing": ["openvino_model.xml"]}
+    man = ms.load_manifest(d)
+    assert not man["complete"] and man["damaged"] == ["openvino_model.bin", "openvino_model.xml"]
+    st = ms.pull(items, src, log=lambda *_: None)["tiny"]
+    assert st["fetched"] == 2 and st["skipped"] == 1 and "error" not in st
+    assert ms.verify(items, log=lambda *_: None)["tiny"]["ok"] == 3 and not ms.load_manifest(d).get("damaged")
+
+def test_verify_without_manifest_is_unverified(tmp_path):
+    res = ms.verify([("x", "org/x", str(tmp_path / "none"))], log=lambda *_: None)["x"]
+    assert res["unverified"] and res["ok"] == 0
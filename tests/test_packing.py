@@ -0,0 +1,28 @@
+import random
+import pytest
+pytest.importorskip("torch"); pytest.importorskip("transformers")
+from packing import pack_plan, pack_dataset, PackCollator
+
+def test_pack_plan_places_each_index_once_within_cap():
+    rng = random.Random(0)
+    for _ in range(50):
+        cap = rng.randint(8, 512)
+        lens = [rng.randint(1, cap*2) for _ in range(rng.randint(1, 300))]
+        bins = pack_plan(lens, cap)
+        assert sorted(i for b in bins for i in b) == list(range(len(lens)))
+        assert all(sum(min(lens[i], cap) for i in b) <= cap for b in bins)
+
+def test_pack_plan_best_fit_fills_rows():
+    assert sorted(map(sorted, pack_plan([6, 4, 5, 5, 3, 7], 10))) == [[0, 1], [2, 3], [4, 5]]
+
+def test_pack_dataset_and_collator_mask_sample_starts():
+    pytest.importorskip("datasets")
+    from datasets import Dataset
+    ds = Dataset.from_dict({"input_ids": [[1, 2, 3], [4, 5], [6, 7, 8, 9, 10, 11]]})
+    packed, n = pack_dataset(ds, 6)
+    assert n == 3 and sorted(len(x) for x in packed["input_ids"]) == [5, 6]
+    batch = PackCollator(pad_id=0)([packed[i] for i in range(len(packed))])
+    pos, lab = batch["position_ids"], batch["labels"]
+    assert "attention_mask" not in batch and batch["input_ids"].shape == (2, 6)
+    assert bool((lab[pos == 0] == -100).all()) and bool((lab[pos > 0] > 0).all())
+    assert int((pos == 0).sum()) == 3 + 1   # 샘플 시작 3개 + 패딩 1개
@@ -0,0 +1,23 @@
+import pytest
+import part_tree
+
+def test_parse_fenced_and_nested():
+    r = part_tree.parse('text ```part_tree {"id":"r","name":"engine","children":[{"id":"n","name":"nozzle","qty":2}]}``` tail')
+    assert r["found"] == 1 and not r["errors"]
+    assert r["tree"]["id"] == "r" and r["tree"]["children"][0]["qty"] == 2
+
+def test_parse_truncated_returns_none():
+    assert part_tree.parse('```part_tree {"id":"r","children":[{"id":"a"')["tree"] is None
+
+@pytest.mark.parametrize("q", ["1e999", "Infinity", '"inf"', '"nan"', "-2", "0", "true"])
+def test_bad_qty_falls_back_to_one(q):
+    tree, errs = part_tree.validate(part_tree._loads('{"id":"a","name":"x","qty":%s}' % q))
+    assert tree["qty"] == 1 and any("qty" in e for e in errs)
+
+def test_parse_infinite_qty_does_not_crash():
+    r = part_tree.parse('```part_tree {"id":"a","qty":1e999}```')
+    assert r["tree"]["qty"] == 1 and r["errors"]
+
+def test_fractional_qty_kept():
+    tree, errs = part_tree.validate({"id": "a", "name": "x", "qty": "2.5"})
+    assert tree["qty"] == 2.5 and not [e for e in errs if "qty" in e]
@@ -0,0 +1,59 @@
+import gc
+import pytest
+pytest.importorskip("torch"); pytest.importorskip("transformers")
+import tiny_hf
+import prefix_cache as pc
+
+@pytest.fixture(scope="module")
+def tm():
+    return tiny_hf.tokenizer(), tiny_hf.model()
+
+def _gen(tok, model, enc, n=8):
+    out = model.generate(**enc, max_new_tokens=n, do_sample=False, pad_token_id=tok.pad_token_id)
+    return out[0, enc["input_ids"].shape[1]:].tolist()
+
+def _ref(tok, model, prompt):
+    return _gen(tok, model, dict(tok(prompt, return_tensors="pt")))
+
+def test_template_prefix():
+    render = lambda t: f"SYS rules\nTopic: {t}\nEnd"
+    assert pc.template_prefix(render) == "SYS rules\nTopic: "
+
+def test_cached_prefix_matches_uncached_and_is_not_mutated(tm):
+    tok, model = tm; pc.clear()
+    prefix, prompt = tiny_hf.text(6), tiny_hf.text(10)
+    want = _ref(tok, model, prompt)
+    for _ in range(2):   # 두 번째 호출도 같은 결과 → generate 가 캐시 원본을 늘리지 않음
+        enc, info = pc.prepare(tok, model, "cpu", prompt, prefix)
+        assert info["prefix_tokens"] == 6 and enc["past_key_values"].get_seq_length() == 6
+        assert _gen(tok, model, enc) == want
+    ent = pc.get_prefix(tok, model, "cpu", prefix)
+    assert ent.n == 6 and ent.pkv.get_seq_length() == 6
+
+def test_token_boundary_mismatch_crops(tm):
+    tok, model = tm; pc.clear()
+    prefix = tiny_hf.text(4) + " w4x"   # 접두 끝 단어가 프롬프트와 다르게 토큰화됨(<unk>)
+    prompt = tiny_hf.text(9)
+    enc, info = pc.prepare(tok, model, "cpu", prompt, prefix)
+    assert info["prefix_tokens"] == 4 and enc["past_key_values"].get_seq_length() == 4
+    assert _gen(tok, model, enc) == _ref(tok, model, prompt)
+    assert pc.get_prefix(tok, model, "cpu", prefix).pkv.get_seq_length() == 5   # crop 은 복사본에만
+
+def test_unrelated_or_whole_prompt_prefix(tm):
+    tok, model = tm; pc.clear()
+    enc, info = pc.prepare(tok, model, "cpu", tiny_hf.text(5), tiny_hf.text(3, 20))
+    assert info["prefix_tokens"] == 0 and "past_key_values" not in enc
+    prompt = tiny_hf.text(5)   # 접두부 = 프롬프트 전체 → 마지막 1토큰은 새로 prefill
+    enc, info = pc.prepare(tok, model, "cpu", prompt, prompt)
+    assert info["prefix_tokens"] == 4 and _gen(tok, model, enc) == _ref(tok, model, prompt)
+
+def test_entries_are_per_model_and_released(tm):
+    tok = tm[0]; pc.clear()
+    a, b = tiny_hf.model(seed=1), tiny_hf.model(seed=2)
+    prefix, prompt = tiny_hf.text(6), tiny_hf.text(10)
+    pc.prepare(tok, a, "cpu", prompt, prefix)
+    enc, _ = pc.prepare(tok, b, "cpu", prompt, prefix)
+    assert _gen(tok, b, enc) == _ref(tok, b, prompt)   # 다른 모델의 KV 를 쓰지 않음
+    assert len(pc._CACHE) == 2
+    del a, b, enc; gc.collect()
+    assert len(pc._CACHE) == 0
@@ -0,0 +1,46 @@
+import random
+import pytest
+import print_planner as pp
+
+def _overlap(a, b):
+    return a[0] < b[0]+b[2] and b[0] < a[0]+a[2] and a[1] < b[1]+b[3] and b[1] < a[1]+a[3]
+
+def test_shelf_pack_no_overlap_within_plate():
+    rng = random.Random(0)
+    for _ in range(30):
+        W, D = rng.uniform(100, 400), rng.uniform(100, 400)
+        items = [(rng.uniform(1, W), rng.uniform(1, D), rng.uniform(1, 50), i) for i in range(rng.randint(1, 120))]
+        levels = pp.shelf_pack(items, (W, D), gap=2.0)
+        assert sorted(p[5] for lv in levels for p in lv["parts"]) == list(range(len(items)))
+        for lv in levels:
+            ps = lv["parts"]
+            assert lv["h"] == max(p[4] for p in ps)
+            assert all(p[0] >= 0 and p[1] >= 0 and p[0]+p[2] <= W+1e-9 and p[1]+p[3] <= D+1e-9 for p in ps)
+            assert not any(_overlap(a, b) for i, a in enumerate(ps) for b in ps[i+1:])
+
+def test_parse_build_vol_units():
+    assert pp.parse_build_vol("400×400×450 mm") == (400.0, 400.0, 450.0)
+    assert pp.parse_build_vol("250x250x300") == (250.0, 250.0, 300.0)
+    assert pp.parse_build_vol("25 x 25 x 30 cm") == (250.0, 250.0, 300.0)
+    assert pp.parse_build_vol("10 x 10 x 12 in") == pytest.approx((254.0, 254.0, 304.8))
+    with pytest.raises(ValueError): pp.parse_build_vol("400x400")
+
+def _part(key, size, qty=1, process="SLM", volume=None):
+    return {"key": key, "name": key, "material": "Inconel 718", "process": process, "qty": qty, "size": size, "volume": volume}
+
+def test_plan_oversize_rotation_and_qty():
+    res = pp.plan([_part("big", (600, 10, 10)), _part("tall", (10, 20, 450)), _part("cube", (40, 40, 40), qty=2.5)],
+                  build_vol=(500, 500, 300))
+    assert [o["key"] for o in res["oversize"]] == ["big"]
+    rows = {}
+    for r in res["placements"]: rows.setdefault(r[4], []).append(r)
+    assert len(rows["cube"]) == 3 and rows["tall"][0][12] == 1 and rows["tall"][0][11] == 10
+    assert len(res["jobs"]) == 1 and res["jobs"][0][4] == 4
+
+def test_plan_nests_powder_levels_in_z():
+    parts = [_part("p", (390, 390, 100), qty=3, process="SLS", volume=1000.0)]
+    sls = pp.plan(parts, build_vol=(400, 400, 450), gap=5.0)
+    assert len(sls["jobs"]) == 1 and sls["jobs"][0][3] == 3
+    assert sorted(r[8] for r in sls["placements"]) == [0.0, 105.0, 210.0] and sls["jobs"][0][5] == 310.0
+    slm = pp.plan([dict(parts[0], process="SLM")], build_vol=(400, 400, 450))
+    assert len(slm["jobs"]) == 3 and all(r[8] == 0.0 for r in slm["placements"])
@@ -0,0 +1,33 @@
+import re, random
+import qa_scorer as q
+
+# 단일 스캔 이전 구현(batch_dual_v3.qa_score / blueprint_batch_ui.score_block)을 기준으로 비교
+def _ref_qa(txt):
+    found = [k for k in q.NEED_SECTIONS if re.search(re.escape(k), txt, re.I)]
+    has_pt = "```" in txt and "part_tree" in txt
+    dedup = len(re.findall(r"Design Brief", txt, re.I)) <= 2
+    return {"pass": len(found) >= 8 and has_pt and dedup, "sections": len(found), "part_tree": has_pt, "dedup": dedup}
+
+def _ref_block(txt):
+    s = len(re.findall(r"\d+(\.\d+)?", txt)) * 1.0
+    s += 3.0 if "part_tree" in txt.lower() else 0.0
+    s += 1.0 if ("Test Plan" in txt or "벤치" in txt) else 0.0
+    s -= 2.0 * sum(1 for h in q.INSTR_HINTS if h in txt)
+    s -= 0.2 * txt.count("  ")
+    return round(s, 2)
+
+TOKENS = q.NEED_SECTIONS + q.INSTR_HINTS + ["design brief", "TEST PLAN", "part_tree", "PART_TREE", "```", "```part_tree",
+          "12", "3.5", "7.", "x", "  ", "   ", " ", "\n", "벤치", "Top 5", "risks", "가나다"]
+
+def test_single_pass_matches_reference_on_random_texts():
+    rnd = random.Random(0)
+    for _ in range(3000):
+        txt = "".join(rnd.choice(TOKENS) + rnd.choice(["", " ", "\n"]) for _ in range(rnd.randint(0, 40)))
+        got = q.qa_score(txt)
+        assert {k: got[k] for k in ("pass", "sections", "part_tree", "dedup")} == _ref_qa(txt), txt
+        assert q.block_score(txt) == (_ref_block(txt) if txt else 0.0), txt
+
+def test_full_blueprint_passes():
+    txt = "\n".join(f"## {k}\nvalue 1" for k in q.NEED_SECTIONS) + '\n```part_tree {"id":"a"}```'
+    assert q.qa_score(txt)["pass"]
+    assert not q.qa_score(txt + "\nDesign Brief\nDesign Brief")["pass"]   # 중복 헤더
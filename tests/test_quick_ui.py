@@ -0,0 +1,36 @@
+import json, os, sys
+import pytest
+pytest.importorskip("gradio")
+from conftest import ROOT
+sys.path.insert(0, os.path.join(ROOT, "ai", "ui"))
+import quick_ui
+from session_index import SessionIndex
+
+@pytest.fixture
+def run(tmp_path, monkeypatch):
+    monkeypatch.setattr(quick_ui, "_IDX", SessionIndex(tmp_path / "index.sqlite", tmp_path))
+    p = tmp_path / "20250101_000000_dual_batch_v3" / "run.jsonl"; p.parent.mkdir()
+    p.write_text("".join(json.dumps({"topic": f"t{i}", "ov": {"out": f"ov{i}"}, "hf": {"out": f"hf{i}"},
+                                     "qa": {"ov": {"pass": True}, "hf": {"pass": i % 2 == 0}}, "elapsed_sec": i}) + "\n"
+                         for i in range(7)), encoding="utf-8")
+    return str(p)
+
+def test_read_detail(run):
+    assert quick_ui.read_detail(run, 3) == ("t2", "ov2", "hf2")
+    assert quick_ui.read_detail(run, 99) == ("", "", "")
+    assert quick_ui.read_detail(run, None) == ("", "", "")
+
+def test_table_src_pages_and_tail(run):
+    df, page, info = quick_ui.table_src(run, page=2, page_size=3)
+    assert page == 2 and list(df["#"]) == [4, 5, 6] and info == "page 2/3 · 7 records"
+    assert list(quick_ui.table_src(run, page=99, page_size=3)[0]["#"]) == [7]
+    assert quick_ui.table_src(run, page_size=3, tail=True)[1] == 3
+    assert quick_ui.table_src("", 1)[2] == "no file"
+
+def test_page_cache_invalidated_by_append(run):
+    quick_ui._page.cache_clear()
+    quick_ui.table_src(run, page=3, page_size=3); quick_ui.table_src(run, page=3, page_size=3)
+    assert quick_ui._page.cache_info().hits == 1
+    with open(run, "a", encoding="utf-8") as f: f.write(json.dumps({"topic": "t7"}) + "\n")
+    df, page, info = quick_ui.table_src(run, page=3, page_size=3)
+    assert list(df["topic"]) == ["t6", "t7"] and info.endswith("8 records")
@@ -0,0 +1,51 @@
+import json, os
+from session_index import SessionIndex
+
+def _line(i, hf_pass=True):
+    return json.dumps({"topic": f"topic {i}", "ov": {"key": "o", "out": f"ov{i}"}, "hf": {"key": "h", "out": f"hf{i}"},
+                       "qa": {"ov": {"pass": True}, "hf": {"pass": hf_pass}}, "elapsed_sec": i}) + "\n"
+
+def _session(root, name="20250101_000000_dual_batch_v3", n=3):
+    p = root / name / "run.jsonl"; p.parent.mkdir(parents=True)
+    p.write_text("".join(_line(i) for i in range(n)), encoding="utf-8")
+    return p
+
+def test_incremental_scan_and_partial_last_line(tmp_path):
+    ix = SessionIndex(tmp_path / "index.sqlite", tmp_path); p = _session(tmp_path)
+    assert ix.scan_file(p) == 3 and ix.scan_file(p) == 0
+    with open(p, "a", encoding="utf-8") as f: f.write(_line(3) + _line(4)[:20])   # 쓰는 중인 마지막 줄
+    assert ix.scan_file(p) == 1 and ix.count(p) == 4
+    with open(p, "a", encoding="utf-8") as f: f.write(_line(4)[20:] + "{broken\n" + _line(5))
+    assert ix.scan_file(p) == 2 and ix.count(p) == 6   # 깨진 줄은 건너뜀
+    assert [r["idx"] for r in ix.rows(p)] == list(range(6))
+    assert ix.read(p, 5)["topic"] == "topic 5" and ix.read(p, 6) is None
+
+def test_rewrite_reindexes_from_start(tmp_path):
+    ix = SessionIndex(tmp_path / "index.sqlite", tmp_path); p = _session(tmp_path, n=5)
+    ix.scan_file(p)
+    p.write_text(_line(10) + _line(11), encoding="utf-8")   # --resume 가 파일을 다시 씀(줄어듦)
+    assert ix.scan_file(p) == 2 and ix.count(p) == 2
+    assert [r["topic"] for r in ix.rows(p)] == ["topic 10", "topic 11"]
+    p.write_text("x" * 40 + "\n" + _line(20) + _line(21) + _line(22), encoding="utf-8")   # 더 길게 재작성
+    ix.scan_file(p)
+    assert [r["topic"] for r in ix.rows(p)] == ["topic 20", "topic 21", "topic 22"]
+
+def test_rows_paging_and_read_by_offset(tmp_path):
+    ix = SessionIndex(tmp_path / "index.sqlite", tmp_path); p = _session(tmp_path, n=12)
+    ix.scan_file(p)
+    assert [r["idx"] for r in ix.rows(p, 5, 4)] == [5, 6, 7, 8] and [r["idx"] for r in ix.rows(p, 10, 50)] == [10, 11]
+    assert ix.rows(p, 3, 1)[0] == {"idx": 3, "topic": "topic 3", "elapsed": 3, "ov_pass": 1, "hf_pass": 1}
+    assert ix.read(p, 7)["hf"]["out"] == "hf7"
+
+def test_scan_query_latest_and_removed_sessions(tmp_path):
+    ix = SessionIndex(tmp_path / "index.sqlite", tmp_path)
+    a = _session(tmp_path, "20250101_000000_dual_batch_v3", 2); b = _session(tmp_path, "20250102_000000_dual_batch_v3", 3)
+    with open(b, "a", encoding="utf-8") as f: f.write(_line(9, hf_pass=False))
+    os.utime(a, (1, 1))
+    assert ix.scan() == 6
+    assert ix.latest("dual_batch_v3", rescan=False) == b.resolve().as_posix()
+    assert [(r["name"], r["idx"]) for r in ix.query(hf_pass=0)] == [("20250102_000000_dual_batch_v3", 3)]
+    assert len(ix.query(topic="topic 1", session="20250101")) == 1
+    os.remove(b)
+    assert ix.scan() == 0 and [s["name"] for s in ix.sessions("dual_batch_v3")] == ["20250101_000000_dual_batch_v3"]
+    assert ix.query(hf_pass=0) == []
@@ -0,0 +1,58 @@
+import numpy as np
+from mesh3d import box, ring, write_stl
+import stl_io
+
+def test_weld_merges_shared_vertices():
+    t = box(2, 3, 4)
+    v, f = stl_io.weld(t)
+    assert len(t) == 12 and len(v) == 8 and f.shape == (12, 3)
+    assert np.allclose(v[f], t)
+    v2, _ = stl_io.weld(t + np.float32(3e-6), tol=1e-5)   # 격자 안쪽 흔들림은 같은 정점
+    assert len(v2) == 8
+
+def test_check_clean_box_and_ring():
+    for t, vol in ((box(2, 3, 4), 24.0), (ring(segments=64), None)):
+        r = stl_io.check(t)
+        assert stl_io.is_clean(r) and r["boundary_edges"] == 0 and r["flipped_edges"] == 0
+        if vol: assert abs(r["volume"] - vol) < 1e-4 and r["size"] == [2.0, 3.0, 4.0]
+
+def test_check_flags_defects():
+    t = box(2, 2, 2)
+    assert stl_io.check(t[1:])["boundary_edges"] == 3
+    assert stl_io.check(t[:, ::-1])["inverted"]
+    r = stl_io.check(np.concatenate([t, t[:1]]))
+    assert r["duplicate_faces"] == 1 and r["nonmanifold_edges"] == 3 and not stl_io.is_clean(r)
+
+def test_repair_fills_hole_dedups_and_reorients():
+    t = box(2, 3, 4)
+    bad = np.concatenate([t[1:], t[2:3]])[:, ::-1]   # 구멍 + 중복 면 + 전체 뒤집힘
+    fixed, steps = stl_io.repair(bad)
+    r = stl_io.check(fixed)
+    assert steps["holes_filled"] == 1 and steps["removed_duplicate"] == 1 and steps["flipped_all"]
+    assert stl_io.is_clean(r) and abs(r["volume"] - 24.0) < 1e-4
+
+def test_read_stl_binary_and_ascii(tmp_path):
+    t = box(1, 2, 3); p = tmp_path / "b.stl"
+    write_stl(p, t)
+    assert np.allclose(stl_io.triangles(p), t)
+    a = tmp_path / "a.stl"
+    a.write_text("solid x\n" + "".join("facet normal 0 0 0\nouter loop\n" + "".join(f"vertex {x} {y} {z}\n" for x, y, z in tri)
+                 + "endloop\nendfacet\n" for tri in t.tolist()) + "endsolid x\n")
+    assert np.allclose(stl_io.triangles(a), t)
+
+def test_repair_cached(tmp_path):
+    cache = tmp_path / "cache"
+    good = tmp_path / "good.stl"; write_stl(good, box(2, 2, 2))
+    out, rep = stl_io.repair_cached(good, cache)
+    assert out == str(good) and rep["clean"] and not rep["cached"]
+    assert stl_io.repair_cached(good, cache)[1]["cached"]
+    bad = tmp_path / "bad.stl"; write_stl(bad, box(2, 2, 2)[1:])
+    out, rep = stl_io.repair_cached(bad, cache)
+    assert not rep["clean"] and rep["after"]["watertight"] and out != str(bad)
+    out2, rep2 = stl_io.repair_cached(bad, cache)
+    assert out2 == out and rep2["cached"]
+    assert stl_io.repair_cached(out, cache)[1]["cached"]   # 수리본은 다시 수리하지 않음
+
+def test_first_occurrence_per_group():
+    codes = np.array([1, 1, 0, 2, 0, 1])
+    assert stl_io._first(codes, 3).tolist() == [2, 0, 3]
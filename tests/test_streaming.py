@@ -0,0 +1,55 @@
+import threading, time
+import pytest
+from streaming import Timed, pct, stream_ov
+
+def _slow(delays, pieces=None):
+    for i, d in enumerate(delays):
+        time.sleep(d); yield (pieces or [f"t{i}" for i in range(len(delays))])[i]
+
+def test_pct_nearest_rank():
+    assert pct([], 50) == 0.0 and pct([7], 95) == 7
+    xs = list(range(10, 0, -1))   # 정렬 안 된 입력
+    assert pct(xs, 0) == 1 and pct(xs, 50) == 5 and pct(xs[1:], 50) == 5 and pct(xs, 95) == 10 and pct(xs, 100) == 10
+
+def test_timed_ttft_and_gaps():
+    tm = Timed(_slow([0.15, 0.02, 0.02, 0.1]))
+    assert "".join(tm) == "t0t1t2t3"
+    s = tm.stats()
+    assert s["chunks"] == 4 and 0.14 <= s["ttft_sec"] < 0.3 and len(tm.gaps) == 3
+    assert 15 <= s["ms_per_chunk_p50"] < 60 and s["ms_per_chunk_p95"] >= 95   # 느린 마지막 조각은 p95 에만
+    assert s["total_sec"] >= 0.29 and "ms/tok(p50)" in tm.summary()
+
+def test_timed_records_total_on_early_stop():
+    tm = Timed(_slow([0.05, 0.05, 5.0]))
+    for i, _ in enumerate(tm):
+        if i == 1: break
+    assert tm.n == 2 and tm.total >= 0.1 and tm.stats()["total_sec"] > 0
+
+class _Pipe:
+    def __init__(self, pieces, fail=False): self.pieces = pieces; self.fail = fail; self.held = []
+    def generate(self, prompt, generation_config=None, streamer=None):
+        for p in self.pieces:
+            self.held.append(self.lock.locked() if getattr(self, "lock", None) else None)
+            streamer(p); time.sleep(0.01)
+        if self.fail: raise RuntimeError("device lost")
+
+def test_stream_ov_order_lock_and_errors():
+    p = _Pipe(["a", "b", "c"]); p.lock = threading.Lock()
+    assert list(stream_ov(p, "x", None, lock=p.lock)) == ["a", "b", "c"] and p.held == [True]*3
+    got = []
+    with pytest.raises(RuntimeError, match="device lost"):
+        for x in stream_ov(_Pipe(["a", "b"], fail=True), "x", None): got.append(x)
+    assert got == ["a", "b"]   # 실패 전 조각은 전달, 예외는 소비자에게 전파
+
+def test_stream_hf_matches_generate():
+    pytest.importorskip("torch"); tiny_hf = pytest.importorskip("tiny_hf")
+    from streaming import stream_hf
+    tok, model = tiny_hf.tokenizer(), tiny_hf.model()
+    prompt = tiny_hf.text(4)
+    enc = tok(prompt, return_tensors="pt")
+    ref = tok.decode(model.generate(**enc, max_new_tokens=8, do_sample=False, pad_token_id=0)[0, enc["input_ids"].shape[1]:], skip_special_tokens=True)
+    lock = threading.Lock()
+    tm = Timed(stream_hf(tok, model, "cpu", prompt, lock=lock, max_new_tokens=8, do_sample=False))
+    assert "".join(tm).split() == ref.split() and tm.stats()["chunks"] >= 1 and not lock.locked()
+    with pytest.raises(Exception):   # generate 예외는 스트림 소비자에게 전파(멈추지 않음)
+        list(stream_hf(tok, model, "cpu", prompt, max_new_tokens=4, no_such_kwarg=1))
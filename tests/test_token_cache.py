@@ -0,0 +1,41 @@
+import json, os
+import pytest
+pytest.importorskip("datasets"); pytest.importorskip("tokenizers")
+from tokenizers import Tokenizer, models, pre_tokenizers
+from transformers import PreTrainedTokenizerFast
+import token_cache as tc
+
+def _tok(extra=()):
+    words = ["[UNK]", "</s>", "User:", "Assistant:", "a", "b", "c", *extra]
+    t = Tokenizer(models.WordLevel({w: i for i, w in enumerate(words)}, unk_token="[UNK]"))
+    t.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    return PreTrainedTokenizerFast(tokenizer_object=t, unk_token="[UNK]", eos_token="</s>")
+
+def _log(p, recs):
+    p.write_text("".join(json.dumps(r) + "\n" for r in recs), encoding="utf-8")
+
+def test_format_and_hash():
+    assert tc.format_rec({"prompt": "a", "output": "b"}) == "User: a\nAssistant: b"
+    assert tc.format_rec({"prompt": "a", "output": ""}) is None
+    assert tc.tok_hash(_tok()) == tc.tok_hash(_tok()) != tc.tok_hash(_tok(["d"]))
+
+def test_update_reuses_unchanged_files(tmp_path):
+    a, b = tmp_path / "a.jsonl", tmp_path / "b.jsonl"
+    _log(a, [{"prompt": "a b", "output": "c"}, {"prompt": "a", "output": "b c a"}]); _log(b, [{"prompt": "c", "output": "c"}])
+    pat = [str(tmp_path / "*.jsonl")]; cache = tc.TokenCache(str(tmp_path / "cache"), _tok(), 16)
+    assert {k: v for k, v in cache.update(pat).items() if k != "sec"} == {"files": 2, "tokenized": 2, "reused": 0, "removed": 0}
+    ds = cache.dataset()
+    assert len(ds) == 3 and ds[0]["input_ids"] == [2, 4, 5, 3, 6, 1]
+    cache = tc.TokenCache(str(tmp_path / "cache"), _tok(), 16)   # 새 실행 = manifest 다시 읽음
+    assert cache.update(pat)["reused"] == 2
+    _log(b, [{"prompt": "c", "output": "a"}, {"prompt": "b", "output": "b"}]); os.utime(b, (1, 1))
+    os.remove(a)
+    st = cache.update(pat)
+    assert (st["tokenized"], st["reused"], st["removed"]) == (1, 0, 1) and len(cache.dataset()) == 2
+    assert len(tc.TokenCache(str(tmp_path / "cache"), _tok(), 8).man["files"]) == 0   # seq_len 이 다르면 다른 캐시
+
+def test_truncation_keeps_eos(tmp_path):
+    p = tmp_path / "x.jsonl"; _log(p, [{"prompt": " ".join("a" * 40), "output": "b"}])
+    cache = tc.TokenCache(str(tmp_path / "cache"), _tok(), 8); cache.update([str(p)])
+    ids = cache.dataset()[0]["input_ids"]
+    assert len(ids) == 8 and ids[-1] == 1
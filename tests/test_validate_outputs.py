@@ -0,0 +1,29 @@
+import json, os, subprocess, sys
+from conftest import ROOT
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+import validate_outputs as vo
+
+def _run(tmp_path):
+    p = tmp_path / "run.jsonl"
+    good = json.dumps({"topic": "t", "ov": {"out": "x"}, "hf": {"out": "y"}})
+    p.write_text("\n".join([good, "{broken", "", good, "[1, 2]", good]) + "\n", encoding="utf-8")
+    return p
+
+def test_validate_reports_unreadable_lines(tmp_path):
+    p = _run(tmp_path)
+    n, ok, bad = vo.validate(p, parquet=False, chunk=2)   # 청크 경계를 넘어도 줄 번호 유지
+    assert n == 3 and [ln for ln, _ in bad] == [2, 5]
+    assert bad[0][1].startswith("bad json") and bad[1][1] == "not an object: list"
+    md = p.with_suffix(".extqa.md").read_text(encoding="utf-8")
+    assert "|⚠ line 2: bad json" in md and "|⚠ line 5: not an object: list|0|" in md
+    assert len(p.with_suffix(".extqa.csv").read_text(encoding="utf-8").splitlines()) == 1 + 3
+
+def test_cli_fails_on_unreadable_lines(tmp_path):
+    p = _run(tmp_path)
+    r = subprocess.run([sys.executable, os.path.join(ROOT, "tools", "validate_outputs.py"), str(p), "--workers", "2",
+                        "--chunk", "1", "--no_parquet"], capture_output=True, text=True, encoding="utf-8")
+    assert r.returncode != 0 and f"{p}:2: bad json" in r.stdout and "2 unreadable line(s)" in r.stdout
+    p.write_text(json.dumps({"topic": "t"}) + "\n", encoding="utf-8")
+    r = subprocess.run([sys.executable, os.path.join(ROOT, "tools", "validate_outputs.py"), str(p), "--workers", "1",
+                        "--no_parquet"], capture_output=True, text=True, encoding="utf-8")
+    assert r.returncode == 0 and "(0/1 pass)" in r.stdout
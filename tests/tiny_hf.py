@@ -0,0 +1,25 @@
+# 테스트용 초소형 HF 모델/토크나이저(다운로드 없음): 단어 단위 WordLevel + 무작위 가중치 Llama
+import torch
+from tokenizers import Tokenizer, models, pre_tokenizers, decoders
+from transformers import PreTrainedTokenizerFast, LlamaConfig, LlamaForCausalLM
+
+SPECIAL = ["<pad>", "<s>", "</s>", "<unk>"]
+WORDS = [f"w{i}" for i in range(60)]
+
+def tokenizer():
+    t = Tokenizer(models.WordLevel({w: i for i, w in enumerate(SPECIAL + WORDS)}, unk_token="<unk>"))
+    t.pre_tokenizer = pre_tokenizers.WhitespaceSplit(); t.decoder = decoders.WordPiece(prefix="##")   # 단어 사이 공백
+    return PreTrainedTokenizerFast(tokenizer_object=t, pad_token="<pad>", bos_token="<s>", eos_token="</s>", unk_token="<unk>",
+                                   model_input_names=["input_ids", "attention_mask"])
+
+def model(seed=0):
+    torch.manual_seed(seed)
+    m = LlamaForCausalLM(LlamaConfig(vocab_size=len(SPECIAL)+len(WORDS), hidden_size=32, intermediate_size=64, num_hidden_layers=2,
+                                     num_attention_heads=4, num_key_value_heads=2, max_position_embeddings=256,
+                                     pad_token_id=0, bos_token_id=1, eos_token_id=2)).eval()
+    # 특수 토큰 생성 금지 → 항상 max_new_tokens 까지. eos_token_id 는 남겨 둠(EOS 조건이 있어야 HF 가 끝난 행을 pad 로 채움)
+    m.generation_config.suppress_tokens = list(range(len(SPECIAL)))
+    return m
+
+def text(n, start=0):
+    return " ".join(WORDS[(start+i) % len(WORDS)] for i in range(n))
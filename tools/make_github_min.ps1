@@ -10,8 +10,24 @@ $keep = @(
   "README_MIN.md","VERSION.txt","SCHEMA.md",
   "configs\models.txt",
   "prompts\sys_template.txt","prompts\usr_template.txt","prompts\prompts_topics.txt",
-  "ai\cli\batch_dual_v3.py","ai\cli\chat.py","ai\cli\genai_run.py",
-  "ai\ui\quick_ui.py",
+  "ai\cli\batch_dual_v3.py","ai\cli\chat.py","ai\cli\genai_run.py","ai\cli\qa_scorer.py",
+  "ai\ui\quick_ui.py","ai\ui\blueprint_batch_ui.py","ai\ui\dual_device_ui.py","ai\ui\hf_dual_quick_ui.py",
+  # batch_dual_v3 / UI / 스크립트가 import 하는 ai\cli 모듈(sys.path 로 불러옴 → 빠지면 import 실패). 추가한 요청별
+  "ai\cli\model_cache.py",                           # user-001/002 파이프라인·HF 모델 레지스트리
+  "ai\cli\genai_client.py",                          # user-003 genai_run 상주 서버 클라이언트
+  "ai\cli\hf_batcher.py",                            # user-004 HF 동적 배치
+  "ai\cli\streaming.py",                             # user-005 토큰 스트리밍
+  "ai\cli\cancel.py",                                # user-007 생성 중단
+  "ai\cli\result_cache.py",                          # user-008 결과 캐시 / --resume
+  "ai\cli\prefix_cache.py",                          # user-009 접두부 KV 재사용
+  "ai\cli\session_index.py",                         # user-013 세션 카탈로그(SQLite)
+  "ai\cli\blueprint_export.py",                      # user-015 증분 blueprint export
+  "ai\cli\part_tree.py",                             # user-016 part_tree 파서
+  "ai\cli\bom.py",                                   # user-017 BOM 엔진
+  "ai\cli\mesh3d.py",                                # user-021 파라메트릭 메시
+  "ai\cli\batch_mesh.py",                            # user-022 세션 일괄 메시
+  "ai\cli\model_store.py","configs\model_repos.txt", # user-025 모델 저장소
+  "tests\*.py",                                       # 리뷰 수정에서 추가된 pytest(qa.yml 에서 실행)
   "scripts\hf_pull_ov_models.py",
   "tools\make_github_min.ps1","tools\validate_outputs.py",
   "run_*.ps1","run_*.bat","run_gradio_local.ps1","run_gradio_local.bat",
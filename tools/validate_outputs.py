@@ -1,18 +1,99 @@
-﻿import json, re, sys, pathlib, csv
-p = pathlib.Path(sys.argv[1]) if len(sys.argv)>1 else None
-if not p or not p.exists(): sys.exit("usage: python tools/validate_outputs.py <run.jsonl>")
-NEED = ["Design Brief","Part Tree","Interfaces","Geometry","Manufacturing","Test Plan","Top 5 risks","Verification plan","Verification results","Final"]
-rows=[]
-for ln in p.read_text(encoding="utf-8").splitlines():
-    r=json.loads(ln)
-    txt=(r.get("ov",{}).get("out","")+"\n"+r.get("hf",{}).get("out",""))
-    found=[k for k in NEED if re.search(rf"{re.escape(k)}",txt,re.I)]
-    has_pt = "```" in txt and "part_tree" in txt
-    dedup = len(re.findall(r"Design Brief",txt,re.I))<=2
-    ok = (len(found)>=8) and has_pt and dedup
-    rows.append([r["topic"],int(ok),len(found),int(has_pt),int(dedup)])
-out = p.with_suffix(".extqa.md")
-with open(out,"w",encoding="utf-8") as f:
-    f.write("|topic|pass|sections|part_tree|dedup|\n|:-|:-:|:-:|:-:|:-:|\n")
-    for r in rows: f.write(f"|{r[0]}|{r[1]}|{r[2]}|{r[3]}|{r[4]}|\n")
-print(f"QA -> {out}")
+﻿import sys, pathlib, csv, glob, argparse, os
+from concurrent.futures import ProcessPoolExecutor
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]/"ai"/"cli"))
+from qa_scorer import score_run
+
+# run.jsonl → <run>.extqa.md / .extqa.csv (+ .extqa.parquet, pyarrow 있을 때)
+# 줄 단위 스트리밍 + 청크 프로세스 풀 채점, 행은 채점되는 대로 파일에 기록(메모리 일정).
+# 예) python tools/validate_outputs.py save/sessions/*/run.jsonl --combined save/qa_all.csv
+
+COLS = ["topic","pass","sections","part_tree","dedup","design_brief","numbers","num_density","ov_pass","hf_pass"]
+
+def row_of(s):
+    q=s["all"]   # ov+hf 출력 합본 기준
+    return [s["topic"],int(q["pass"]),q["sections"],int(q["part_tree"]),int(q["dedup"]),q["design_brief"],q["numbers"],q["num_density"],
+            int(s["ov"]["pass"]),int(s["hf"]["pass"])]
+
+class ParquetSink:
+    """pyarrow 가 있으면 batch 단위로 parquet 에 추가, 없으면 아무것도 안 함"""
+    def __init__(self, path, batch=2000):
+        try:
+            import pyarrow as pa, pyarrow.parquet as pq
+        except ImportError:
+            self.w=None; return
+        self.pa=pa; self.batch=batch; self.buf=[]
+        self.schema=pa.schema([("topic",pa.string()),("pass",pa.int8()),("sections",pa.int16()),("part_tree",pa.int8()),("dedup",pa.int8()),
+                               ("design_brief",pa.int32()),("numbers",pa.int32()),("num_density",pa.float32()),("ov_pass",pa.int8()),("hf_pass",pa.int8())])
+        self.w=pq.ParquetWriter(str(path), self.schema)
+    def add(self, row):
+        if self.w is None: return
+        self.buf.append(row)
+        if len(self.buf)>=self.batch: self.flush()
+    def flush(self):
+        if self.w is None or not self.buf: return
+        cols=list(zip(*self.buf)); self.buf=[]
+        self.w.write_table(self.pa.table({c:list(v) for c,v in zip(COLS,cols)}, schema=self.schema))
+    def close(self):
+        if self.w is None: return
+        self.flush(); self.w.close()
+
+def validate(p, ex=None, parquet=True, combined=None, chunk=256):
+    """-> (행 수, 통과 수, 읽을 수 없는 줄 [(줄 번호, 오류)]). 채점 결과를 md/csv/parquet 에 바로 씀.
+    깨진 줄은 md 에 실패 행(⚠)으로 남기고 csv/parquet(지표 열 고정)에는 넣지 않음"""
+    md=p.with_suffix(".extqa.md"); cp=p.with_suffix(".extqa.csv")
+    pq=ParquetSink(p.with_suffix(".extqa.parquet")) if parquet else None
+    n=ok=0; bad=[]
+    with open(md,"w",encoding="utf-8") as f, open(cp,"w",encoding="utf-8",newline="") as cf:
+        f.write("|topic|pass|sections|part_tree|dedup|\n|:-|:-:|:-:|:-:|:-:|\n")
+        w=csv.writer(cf); w.writerow(COLS)
+        for s in score_run(p, workers=None if ex else 1, chunk=chunk, ex=ex):
+            if "error" in s:
+                bad.append((s["line"], s["error"])); f.write(f"|⚠ line {s['line']}: {s['error']}|0|-|-|-|\n"); continue
+            r=row_of(s); n+=1; ok+=r[1]
+            f.write(f"|{r[0]}|{r[1]}|{r[2]}|{r[3]}|{r[4]}|\n")
+            w.writerow(r)
+            if pq: pq.add(r)
+            if combined: combined.writerow([str(p)]+r)
+    if pq: pq.close()
+    return n, ok, bad
+
+def expand(args):
+    out=[]
+    for a in args:
+        hits=sorted(glob.glob(a)) or [a]
+        for h in hits:
+            hp=pathlib.Path(h)
+            if hp.is_dir(): out+=sorted(hp.rglob("run.jsonl"))
+            elif hp.exists(): out.append(hp)
+    return out
+
+def main():
+    ap=argparse.ArgumentParser(description="run.jsonl QA → .extqa.md/.csv/.parquet")
+    ap.add_argument("paths", nargs="*", help="run.jsonl 파일/글롭/폴더(하위 run.jsonl 전부)")
+    ap.add_argument("--workers", type=int, default=0, help="채점 프로세스 수(0=코어 수, 1=단일 프로세스)")
+    ap.add_argument("--chunk", type=int, default=256, help="프로세스에 넘기는 줄 수")
+    ap.add_argument("--no_parquet", action="store_true")
+    ap.add_argument("--combined", default="", help="모든 파일 결과를 한 CSV 에(file 열 추가)")
+    a=ap.parse_args()
+    files=expand(a.paths)
+    if not files: sys.exit("usage: python tools/validate_outputs.py <run.jsonl|glob|dir> ...")
+    workers=a.workers or os.cpu_count() or 1
+    cf=open(a.combined,"w",encoding="utf-8",newline="") if a.combined else None
+    comb=csv.writer(cf) if cf else None
+    if comb: comb.writerow(["file"]+COLS)
+    ex=ProcessPoolExecutor(max_workers=workers) if workers>1 else None
+    n_bad=0
+    try:
+        for p in files:
+            n,ok,bad=validate(p, ex=ex, parquet=not a.no_parquet, combined=comb, chunk=a.chunk)
+            print(f"QA -> {p.with_suffix('.extqa.md')}  ({ok}/{n} pass" + (f", {len(bad)} unreadable line(s))" if bad else ")"))
+            for ln,err in bad[:20]: print(f"  ! {p}:{ln}: {err}")
+            if len(bad)>20: print(f"  ! ... {len(bad)-20} more")
+            n_bad+=len(bad)
+    finally:
+        if ex: ex.shutdown()
+        if cf: cf.close()
+    if n_bad: sys.exit(f"[validate] {n_bad} unreadable line(s)")   # 깨진 run.jsonl 은 조용히 넘기지 않음
+
+if __name__ == "__main__":   # 프로세스 풀(spawn) 재임포트 시 실행 방지
+    main()